@@ -0,0 +1,12 @@
+"""
+Offline benchmarks for Phantom PTT.
+
+Run from the repo root, e.g. `python -m benchmarks.bench_linux_mute`.
+The app modules live in src/ and import each other by bare name, so put that on the path.
+"""
+import os
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
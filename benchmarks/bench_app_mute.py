@@ -0,0 +1,116 @@
+"""
+Per-application muting ("mute_apps") against a server with many capture streams,
+through LinuxAudioBackend on a FakePulse:
+
+  - indexed: the backend's stream index, kept current by source_output events;
+             a press mutes the app's streams and nothing else
+  - listing: what a press costs without the index: list every stream, pick the
+             app's out by their properties, mute those
+
+For each stream count: press latency (mute and unmute alternating), round trips
+per press, the watcher's cost per new / change / remove event, and whether the
+index still matches a fresh listing after the churn.
+
+    python -m benchmarks.bench_app_mute [--streams 100,300,1000] [--presses N] [--latency S]
+"""
+import argparse
+import random
+import sys
+import time
+
+from benchmarks.bench_pipeline import percentiles
+from benchmarks.fake_pulse import FakeEvent, FakePulse
+from audio_manager import LinuxAudioBackend
+
+APP = "Discord"
+OTHER_APPS = ["firefox", "chromium", "obs", "zoom", "teams", "audacity", "pavucontrol",
+              "speech-dispatcher", "gnome-shell", "steam", "telegram", "signal"]
+
+
+def fill(pulse, count, rng):
+    # Two streams for the app (voice plus its noise suppressor), the rest others'
+    pulse.add_source_output(APP)
+    pulse.add_source_output(APP, binary="discord-krisp")
+    for i in range(count - 2):
+        pulse.add_source_output(f"{rng.choice(OTHER_APPS)}-{i % 40}")
+
+
+def mute_by_listing(pulse, streams, is_muted):
+    for stream in pulse.source_output_list():
+        if streams.match(stream) and bool(stream.mute) != is_muted:
+            pulse.source_output_mute(stream.index, is_muted)
+
+
+def press(pulse, fn, presses):
+    samples = []
+    calls = pulse.calls
+    for i in range(presses):
+        t0 = time.perf_counter_ns()
+        fn(i % 2 == 0)
+        samples.append(time.perf_counter_ns() - t0)
+    return percentiles(samples), (pulse.calls - calls) / presses
+
+
+def churn(pulse, backend, rounds, rng):
+    """Streams come and go and change; each event goes through the backend's handler."""
+    cost = {'new': [], 'change': [], 'remove': []}
+    for _ in range(rounds):
+        app = APP if rng.random() < 0.2 else rng.choice(OTHER_APPS)
+        index = pulse.add_source_output(app)
+        for t in ('new', 'change'):
+            t0 = time.perf_counter_ns()
+            backend._on_pulse_event(pulse, FakeEvent('source_output', t, index))
+            cost[t].append(time.perf_counter_ns() - t0)
+        # Someone else unmutes one of the app's streams; the change event re-mutes it
+        ours = [o for o in pulse._outputs.values() if backend.streams.match(o)]
+        if ours:
+            victim = rng.choice(ours)
+            victim.mute = False
+            backend._on_pulse_event(pulse, FakeEvent('source_output', 'change', victim.index))
+        gone = rng.choice(list(pulse._outputs))
+        pulse.remove_source_output(gone)
+        t0 = time.perf_counter_ns()
+        backend._on_pulse_event(pulse, FakeEvent('source_output', 'remove', gone))
+        cost['remove'].append(time.perf_counter_ns() - t0)
+    return {t: percentiles(samples) for t, samples in cost.items()}
+
+
+def consistent(pulse, streams):
+    fresh = {o.index for o in pulse.source_output_list() if streams.match(o)}
+    indexed = set(streams._app_of)
+    muted = all(o.mute == streams.desired for o in pulse._outputs.values() if o.index in fresh)
+    return fresh == indexed and muted
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--streams', default="100,300,1000", help="comma-separated stream counts")
+    parser.add_argument('--presses', type=int, default=400)
+    parser.add_argument('--churn', type=int, default=300, help="stream open/close rounds")
+    parser.add_argument('--latency', type=float, default=0.0002, help="fake pulse round trip in seconds")
+    args = parser.parse_args()
+
+    print(f"{'streams':>8} {'mode':<8} {'p50 us':>8} {'p99 us':>8} {'calls':>6}   "
+          f"{'new us':>7} {'change us':>9} {'remove us':>9}  consistent", file=sys.stderr)
+    for count in (int(n) for n in args.streams.split(',')):
+        rng = random.Random(count)
+        pulse = FakePulse(5, args.latency)
+        fill(pulse, count, rng)
+        backend = LinuxAudioBackend(pulse=pulse, mute_apps=[APP.lower()])
+        streams = backend.streams
+
+        indexed, indexed_calls = press(pulse, backend.set_mute, args.presses)
+        listing, listing_calls = press(pulse, lambda m: mute_by_listing(pulse, streams, m), args.presses)
+        backend.set_mute(True)
+        events = churn(pulse, backend, args.churn, rng)
+        ok = consistent(pulse, streams)
+
+        print(f"{count:>8} {'indexed':<8} {indexed['p50_us']:>8.0f} {indexed['p99_us']:>8.0f} "
+              f"{indexed_calls:>6.2f}   {events['new']['p50_us']:>7.0f} "
+              f"{events['change']['p50_us']:>9.0f} {events['remove']['p50_us']:>9.1f}  {ok}", file=sys.stderr)
+        print(f"{count:>8} {'listing':<8} {listing['p50_us']:>8.0f} {listing['p99_us']:>8.0f} "
+              f"{listing_calls:>6.2f}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
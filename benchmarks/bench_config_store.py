@@ -0,0 +1,58 @@
+"""
+Caller-side cost of saving the config on every step of a device-list scroll:
+a synchronous save_config per step against ConfigStore's write-behind, which
+coalesces the burst into one atomic write.
+
+    python -m benchmarks.bench_config_store [--steps N] [--delay S]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import config
+
+
+def scroll_sync(path, steps):
+    data = config.load_config(path)
+    times = []
+    for i in range(steps):
+        t0 = time.perf_counter()
+        data["device_id"] = f"dev-{i}"
+        config.save_config(data, path)
+        times.append(time.perf_counter() - t0)
+    return times, steps
+
+
+def scroll_store(path, steps, delay):
+    store = config.ConfigStore(path, delay=delay)
+    times = []
+    for i in range(steps):
+        t0 = time.perf_counter()
+        store.update(device_id=f"dev-{i}")
+        times.append(time.perf_counter() - t0)
+    time.sleep(delay * 2)
+    store.close()
+    assert config.load_config(path)["device_id"] == f"dev-{steps - 1}"
+    return times, store.writes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--steps', type=int, default=50)
+    parser.add_argument('--delay', type=float, default=0.5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "config.json")
+        print(f"{args.steps} device changes in a row")
+        print(f"{'mode':<14} {'p50 us':>8} {'max us':>8} {'total ms':>9} {'writes':>7}")
+        for name, (times, writes) in (("sync save", scroll_sync(path, args.steps)),
+                                      ("write-behind", scroll_store(path, args.steps, args.delay))):
+            print(f"{name:<14} {statistics.median(times) * 1e6:>8.0f} {max(times) * 1e6:>8.0f} "
+                  f"{sum(times) * 1e3:>9.2f} {writes:>7}")
+
+
+if __name__ == "__main__":
+    main()
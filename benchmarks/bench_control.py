@@ -0,0 +1,131 @@
+"""
+Control socket round trips and throughput, against a HeadlessPTT driving a
+FakePulse (no sound server or keyboard hook needed):
+
+  - ping / state / toggle: sequential round trip percentiles
+  - toggle -> mute applied: until the audio worker has muted the fake source
+  - pipelined: a batch of toggles written at once, commands/sec
+  - per-action process spawn, the cost every pactl call pays (/bin/true is the
+    floor), and the pttctl CLI for comparison
+
+    python -m benchmarks.bench_control [--count N] [--out results.json]
+"""
+import argparse
+import functools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from benchmarks import fake_keyboard
+from benchmarks.bench_pipeline import percentiles
+from benchmarks.fake_pulse import FakePulse
+import audio_manager
+import config
+import key_listener
+from pttctl import ControlClient
+
+
+def round_trips(client, line, count):
+    samples = []
+    for _ in range(count):
+        t0 = time.perf_counter_ns()
+        reply = client.request(line)
+        samples.append(time.perf_counter_ns() - t0)
+        if reply.startswith("err"):
+            raise RuntimeError(reply)
+    return percentiles(samples)
+
+
+def toggle_to_applied(client, worker, count):
+    samples = []
+    for _ in range(count):
+        applied = worker.applied
+        t0 = time.perf_counter_ns()
+        client.request("toggle")
+        while worker.applied == applied:
+            time.sleep(0)
+        samples.append(time.perf_counter_ns() - t0)
+    return percentiles(samples)
+
+
+def pipelined(client, count):
+    t0 = time.perf_counter()
+    client.sock.sendall(b"toggle\n" * count)
+    for _ in range(count):
+        client.read_line()
+    return count / (time.perf_counter() - t0)
+
+
+def spawn_cost(cmd, count):
+    samples = []
+    for _ in range(count):
+        t0 = time.perf_counter_ns()
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter_ns() - t0)
+    return percentiles(samples)
+
+
+def client_run(path, daemon, args, results):
+    client = ControlClient(path)
+    results['ping'] = round_trips(client, "ping", args.count)
+    results['state'] = round_trips(client, "state", args.count)
+    results['toggle'] = round_trips(client, "toggle", args.count)
+    daemon.audio.worker.wait_idle()
+    results['toggle_to_applied'] = toggle_to_applied(client, daemon.audio.worker, args.count // 4)
+    results['pipelined_per_sec'] = pipelined(client, args.count * 5)
+    client.close()
+
+    results['spawn_true'] = spawn_cost([shutil.which('true') or '/bin/true'], 50)
+    pttctl = os.path.join(os.path.dirname(audio_manager.__file__), 'pttctl.py')
+    results['spawn_pttctl'] = spawn_cost([sys.executable, pttctl, '--socket', path, 'toggle'], 20)
+    if shutil.which('pactl'):
+        results['spawn_pactl'] = spawn_cost(['pactl', 'info'], 20)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=2000)
+    parser.add_argument('--out', help="write JSON here")
+    args = parser.parse_args()
+
+    home = tempfile.mkdtemp()
+    os.environ['HOME'] = home
+    path = os.path.join(home, 'ptt.sock')
+    fake_keyboard.install(key_listener)
+    audio_manager.LinuxAudioBackend = functools.partial(
+        audio_manager.LinuxAudioBackend, pulse=FakePulse(5, 0.0002, wait=time.sleep))
+
+    app = QCoreApplication(sys.argv[:1])
+    from headless import HeadlessPTT
+    daemon = HeadlessPTT(app_config=dict(config.load_config(), control_socket=path))
+    daemon.start()
+
+    results = {}
+    thread = threading.Thread(target=client_run, args=(path, daemon, args, results))
+    thread.start()
+    # Binding events are delivered on this thread, as in the real daemon
+    tick = QTimer()
+    tick.start(50)
+    while thread.is_alive():
+        app.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents)
+    daemon.stop()
+
+    for name, r in results.items():
+        if isinstance(r, dict):
+            print(f"{name:<18} p50 {r['p50_us']:>8.0f}us  p99 {r['p99_us']:>8.0f}us", file=sys.stderr)
+        else:
+            print(f"{name:<18} {r:>8.0f} commands/s", file=sys.stderr)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Linux input paths, fed recorded evdev byte streams through pipes (no devices,
+no root):
+
+  - evdev:    EvdevListener, epoll + block reads decoded in place
+  - keyboard: the keyboard library's own reader (EventDevice.read_event per event,
+              AggregatedEventDevice's queue hop) and the per-key work its listen()
+              loop does, then the same PTTListener._on_key_event
+
+Reports events/sec decoded for a typing stream with PTT presses mixed in, and
+press latency: bytes written to the pipe -> binding_event emitted.
+
+    python -m benchmarks.bench_evdev [--events N] [--presses N]
+"""
+import argparse
+import os
+import statistics
+import struct
+import sys
+import threading
+import time
+
+from PyQt6.QtCore import QCoreApplication, Qt
+
+from benchmarks import fake_keyboard
+import key_listener
+from key_listener import PTTListener
+from evdev_listener import EvdevListener, EV_SYN, EV_KEY, EV_MSC, MSC_SCAN
+from latency import now_ns
+
+EVENT = struct.Struct('llHHi')
+TRIGGER = 82  # num 0
+TYPING = [30, 48, 46, 32, 18, 33, 34, 35, 23, 36, 37, 38, 57]
+
+
+def key_events(code, value, t):
+    sec, usec = int(t), int(t % 1 * 1e6)
+    return (EVENT.pack(sec, usec, EV_MSC, MSC_SCAN, 0x70000 + code) +
+            EVENT.pack(sec, usec, EV_KEY, code, value) +
+            EVENT.pack(sec, usec, EV_SYN, 0, 0))
+
+
+def typing_stream(events, trigger_every=50):
+    """Recorded-looking typing: scan, key, report per edge; a PTT tap every so often."""
+    chunks, count, t = [], 0, time.time()
+    i = 0
+    while count < events:
+        code = TRIGGER if i % trigger_every == 0 else TYPING[i % len(TYPING)]
+        chunks.append(key_events(code, 1, t) + key_events(code, 0, t))
+        count += 6
+        i += 1
+    return b''.join(chunks), count
+
+
+def keyboard_path(read_fd, listener, stop):
+    """What keyboard._nixkeyboard.listen does per event, with its real reader."""
+    from keyboard._nixcommon import EventDevice, AggregatedEventDevice
+    from keyboard._keyboard_event import KeyboardEvent, KEY_DOWN, KEY_UP
+    device = AggregatedEventDevice([EventDevice(f'/dev/fd/{read_fd}')])
+    to_name = {}
+    pressed_modifiers = set()
+    counter = {'events': 0}
+
+    def run():
+        while not stop.is_set():
+            t, type, code, value, device_id = device.read_event()
+            counter['events'] += 1
+            if type != EV_KEY:
+                continue
+            modifiers = tuple(sorted(pressed_modifiers))
+            names = to_name.get((code, modifiers)) or to_name.get((code, ())) or ['unknown']
+            listener._on_key_event(KeyboardEvent(event_type=KEY_DOWN if value else KEY_UP, scan_code=code,
+                                                 name=names[0], time=t, device=device_id,
+                                                 is_keypad=False, modifiers=modifiers))
+    threading.Thread(target=run, daemon=True).start()
+    return counter
+
+
+def measure(name, make, stream, count, presses):
+    read_fd, write_fd = os.pipe()
+    stop = threading.Event()
+    fired = []
+    listener, counter = make(read_fd, stop)
+    # Direct: called on the reader thread the moment the listener emits
+    listener.binding_event.connect(lambda binding, is_down, stamp: fired.append(now_ns()),
+                                   Qt.ConnectionType.DirectConnection)
+
+    t0 = time.perf_counter()
+    view = memoryview(stream)
+    while view:
+        view = view[os.write(write_fd, view[:65536]):]
+    while counter() < count:
+        time.sleep(0.0005)
+    throughput = count / (time.perf_counter() - t0)
+
+    latency = []
+    for _ in range(presses):
+        for value in (1, 0):
+            before = len(fired)
+            data = key_events(TRIGGER, value, time.time())
+            t0 = now_ns()
+            os.write(write_fd, data)
+            while len(fired) == before:
+                time.sleep(0)
+            latency.append(fired[-1] - t0)
+        time.sleep(0.002)
+
+    stop.set()
+    listener.stop_listening()
+    # write_fd stays open: closing it would end keyboard's reader thread with a traceback
+    print(f"{name:<10} {throughput:>12,.0f} events/s   press latency p50 "
+          f"{statistics.median(latency) / 1000:>7.1f} us  max {max(latency) / 1000:>7.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=300000)
+    parser.add_argument('--presses', type=int, default=200)
+    args = parser.parse_args()
+    app = QCoreApplication(sys.argv[:1])
+    stream, count = typing_stream(args.events)
+    print(f"{count} events ({len(stream) // 1024} KiB), 1 PTT tap per 50 keys")
+
+    def make_evdev(read_fd, stop):
+        listener = EvdevListener(devices=[read_fd], suppress=False)
+        listener.start_listening('num 0')
+        return listener, lambda: listener.events_read
+
+    def make_keyboard(read_fd, stop):
+        fake_keyboard.install(key_listener)  # scan codes for compiling 'num 0' only
+        listener = PTTListener()
+        listener.start_listening('num 0')
+        counter = keyboard_path(read_fd, listener, stop)
+        return listener, lambda: counter['events']
+
+    measure("evdev", make_evdev, stream, count, args.presses)
+    measure("keyboard", make_keyboard, stream, count, args.presses)
+
+
+if __name__ == "__main__":
+    main()
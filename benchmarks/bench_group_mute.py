@@ -0,0 +1,60 @@
+"""
+Time-to-last-unmute for a device group: one source, a group muted one by one,
+and the same group through LinuxAudioBackend.set_mute_group's fan-out.
+
+The stand-in pulse sleeps through its round trip (like a real blocking socket
+call, which releases the GIL), so the fan-out threads can overlap.
+
+    python -m benchmarks.bench_group_mute [--size N] [--latency SECONDS]
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.fake_pulse import FakePulse
+from audio_manager import LinuxAudioBackend
+
+
+def measure(fn, presses):
+    samples = []
+    for i in range(presses):
+        t0 = time.perf_counter_ns()
+        fn(i % 2 == 0)
+        samples.append(time.perf_counter_ns() - t0)
+    return statistics.median(samples) / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=4, help="sources in the group")
+    parser.add_argument('--latency', type=float, default=0.001, help="per-call round trip in seconds")
+    parser.add_argument('--presses', type=int, default=200)
+    args = parser.parse_args()
+
+    pulse = FakePulse(args.size + 1, args.latency, wait=time.sleep)
+    backend = LinuxAudioBackend(pulse=pulse, connect=lambda: pulse)
+    group = tuple(range(1, args.size + 1))
+    backend.set_device(group[0])
+    backend.prepare_group(group)
+
+    def sequential(is_muted):
+        for device_id in group:
+            backend.set_mute(is_muted, device_id)
+
+    def fanout(is_muted):
+        results = backend.set_mute_group(group, is_muted)
+        assert not any(results.values()), results
+
+    single = measure(backend.set_mute, args.presses)
+    loop = measure(sequential, args.presses)
+    grouped = measure(fanout, args.presses)
+    backend.close()
+
+    print(f"median time to last unmute, {args.size} sources, {args.latency * 1e6:.0f}us round trip")
+    print(f"  single source     {single:>8.0f}us")
+    print(f"  group, one by one {loop:>8.0f}us  ({loop / single:.1f}x single)")
+    print(f"  group, fan-out    {grouped:>8.0f}us  ({grouped / single:.1f}x single)")
+
+
+if __name__ == "__main__":
+    main()
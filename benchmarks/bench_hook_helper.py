@@ -0,0 +1,166 @@
+"""
+Key hook latency while the GUI process is busy: listener in the GUI process vs.
+in the helper process ("hook_process", with "hook_process_mutes").
+
+The GUI process is loaded the way a real one stalls: pure-Python work between
+event loop passes (slow paints, handlers) and long C calls that never release
+the GIL (a big sort, a full GC pass). A feeder thread presses and releases the
+trigger every few ms through a FakeKeyboard. For each event it reports:
+
+  - hook:  how long the fake OS callback took to return, i.e. how long the OS
+           holds back every key while it waits on the suppressing hook
+  - mute:  key event -> FakePulse mute applied
+
+    python -m benchmarks.bench_hook_helper [--events N] [--interval S] [--out results.json]
+"""
+import argparse
+import functools
+import gc
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from PyQt6.QtCore import QCoreApplication
+
+from benchmarks import fake_keyboard
+from benchmarks.bench_pipeline import Pipeline, percentiles
+from benchmarks.fake_pulse import FakePulse
+import audio_manager
+import key_listener
+from hook_helper import HookHelper
+from latency import recorder
+
+OUT_ENV = "PTT_BENCH_HOOK_OUT"
+EVENTS_ENV = "PTT_BENCH_HOOK_EVENTS"
+INTERVAL_ENV = "PTT_BENCH_HOOK_INTERVAL"
+
+
+def feed_loop(keyboard, events, interval):
+    """Alternating down/up on the trigger; returns each callback's duration in ns."""
+    while not keyboard._hooks:
+        time.sleep(0.01)
+    samples = []
+    for i in range(events):
+        t0 = time.perf_counter_ns()
+        keyboard.feed('num 0', 'down' if i % 2 == 0 else 'up')
+        samples.append(time.perf_counter_ns() - t0)
+        time.sleep(interval)
+    return samples
+
+
+def mute_summary():
+    hist = recorder.histogram('total')
+    return {'p50_us': hist.percentile(50) / 1000, 'p99_us': hist.percentile(99) / 1000,
+            'max_us': hist.max_ns / 1000, 'count': hist.total}
+
+
+def child_setup():
+    """Runs in the helper: fake keyboard and pulse, and a feeder that reports to a file."""
+    keyboard = fake_keyboard.install(key_listener)
+    audio_manager.LinuxAudioBackend = functools.partial(
+        audio_manager.LinuxAudioBackend, pulse=FakePulse(5, 0.0002, wait=time.sleep))
+
+    def run():
+        samples = feed_loop(keyboard, int(os.environ[EVENTS_ENV]), float(os.environ[INTERVAL_ENV]))
+        time.sleep(0.2)  # last mutes
+        with open(os.environ[OUT_ENV], 'w') as f:
+            json.dump({'hook_ns': samples, 'mute': mute_summary()}, f)
+    threading.Thread(target=run, daemon=True).start()
+
+
+class GuiLoad:
+    """Event loop passes with slow handlers and GIL-holding C calls in between."""
+
+    def __init__(self, app):
+        self.app = app
+        self.junk = [[i] for i in range(300_000)]       # for the GC pass
+        self.unsorted = [((i * 7919) % 1_000_003) / 3.0 for i in range(1_000_000)]
+
+    def step(self, i):
+        if i % 3 == 0:
+            end = time.perf_counter() + 0.02
+            while time.perf_counter() < end:
+                sum(range(200))                        # slow paint / handler
+        elif i % 3 == 1:
+            sorted(self.unsorted)                      # one C call, GIL held throughout
+        else:
+            gc.collect()
+        self.app.processEvents()
+
+    def run_until(self, done):
+        i = 0
+        while not done():
+            if self.app is not None:
+                self.step(i)
+            i += 1
+
+
+def run_in_process(app, events, interval, load):
+    pipeline = Pipeline(sources=5, latency=0.0002)
+    pipeline.listener.start_listening('num 0')
+    recorder.reset()
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault('hook', feed_loop(pipeline.keyboard, events, interval)))
+    thread.start()
+    if load:
+        load.run_until(lambda: not thread.is_alive())
+    else:
+        while thread.is_alive():
+            app.processEvents()
+            time.sleep(0.001)
+    thread.join()
+    pipeline.audio.worker.wait_idle()
+    pipeline.listener.stop_listening()
+    pipeline.audio.shutdown()
+    return {'hook': percentiles(result['hook']), 'mute': mute_summary()}
+
+
+def run_helper(app, events, interval, load):
+    out = os.path.join(tempfile.mkdtemp(), "helper.json")
+    os.environ[OUT_ENV] = out
+    os.environ[EVENTS_ENV] = str(events)
+    os.environ[INTERVAL_ENV] = str(interval)
+    helper = HookHelper(mutes=True, setup="benchmarks.bench_hook_helper:child_setup")
+    helper.start_listening('num 0')
+    helper.set_device(1)
+    done = lambda: os.path.exists(out) and os.path.getsize(out) > 0
+    if load:
+        load.run_until(done)
+    else:
+        while not done():
+            app.processEvents()
+            time.sleep(0.01)
+    time.sleep(0.05)
+    with open(out) as f:
+        data = json.load(f)
+    helper.close()
+    return {'hook': percentiles(data['hook_ns']), 'mute': data['mute']}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=400)
+    parser.add_argument('--interval', type=float, default=0.005, help="seconds between key events")
+    parser.add_argument('--out', help="write JSON here")
+    args = parser.parse_args()
+    app = QCoreApplication(sys.argv[:1])
+    load = GuiLoad(app)
+
+    results = {}
+    for name, run in (('in_process', run_in_process), ('helper', run_helper)):
+        for loaded in (False, True):
+            key = f"{name}{'_loaded' if loaded else ''}"
+            results[key] = r = run(app, args.events, args.interval, load if loaded else None)
+            print(f"{key:<18} hook p50 {r['hook']['p50_us']:>7.0f}us  p99 {r['hook']['p99_us']:>7.0f}us  "
+                  f"max {r['hook']['max_us']:>7.0f}us   mute p50 {r['mute']['p50_us']:>7.0f}us  "
+                  f"p99 {r['mute']['p99_us']:>7.0f}us", file=sys.stderr)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
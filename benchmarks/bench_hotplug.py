@@ -0,0 +1,130 @@
+"""
+Hot-plug: how long until a newly plugged source is in the device combo box,
+through the pulse event path (one source_info, one combo insert) against the
+old full rescan (source_list and a combo rebuild). Both wait on one server
+round trip, so they take about as long end to end; the difference is that the
+event path makes it on the watcher thread, and the GUI thread only spends the
+slot time on it, where the rescan blocks it throughout. Also times resolving
+the saved device by stable key against the old linear id comparison.
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_hotplug [--sources N] [--latency S] [--runs N]
+"""
+import argparse
+import functools
+import os
+import queue
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+# config resolves its path on import
+os.environ["HOME"] = tempfile.mkdtemp()
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QEventLoop, QTimer
+from PyQt6.QtWidgets import QApplication
+
+import audio_manager
+import key_listener
+from benchmarks import fake_keyboard
+from benchmarks.fake_pulse import FakePulse, FakeEvent
+
+
+def wait_for(app, condition, timeout=5.0):
+    # Block in the event loop, as the app does, rather than spin processEvents():
+    # a spinning GUI thread takes the CPU (and the GIL) from the watcher thread
+    # being timed, and on a single core that alone made the event path look
+    # slower than the rescan
+    end = time.perf_counter() + timeout
+    tick = QTimer()
+    tick.start(10)  # wakes the loop to check the timeout
+    while not condition():
+        if time.perf_counter() > end:
+            raise TimeoutError
+        app.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents)
+    tick.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sources', type=int, default=30)
+    parser.add_argument('--latency', type=float, default=0.002, help="seconds per server call")
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    fake_keyboard.install(key_listener)
+    pulse = FakePulse(args.sources, args.latency, wait=time.sleep)
+    audio_manager.LinuxAudioBackend = functools.partial(audio_manager.LinuxAudioBackend, pulse=pulse)
+    from ui.main_window import MainWindow
+    slot_times = []
+    on_device_event = MainWindow.on_device_event
+
+    def timed_slot(self, kind, device):
+        t0 = time.perf_counter()
+        on_device_event(self, kind, device)
+        if kind == 'add':
+            slot_times.append(time.perf_counter() - t0)
+    MainWindow.on_device_event = timed_slot
+    window = MainWindow()
+    combo = window.combo_dev
+    wait_for(app, lambda: combo.count() == args.sources)
+    backend = window.audio._backend()
+
+    # Stands in for the pulse watcher thread, which is already running when a
+    # source appears
+    events = queue.SimpleQueue()
+
+    def watcher():
+        while True:
+            backend._on_pulse_event(pulse, events.get())
+    threading.Thread(target=watcher, daemon=True).start()
+
+    hotplug, rescan = [], []
+    for i in range(args.runs):
+        # Event path: the watcher thread sees 'new' and feeds the registry
+        index = pulse.add_source(f"alsa_input.usb_headset_{i}", f"USB Headset {i}")
+        t0 = time.perf_counter()
+        events.put(FakeEvent('source', 'new', index))
+        wait_for(app, lambda: combo.findData(index) >= 0)
+        hotplug.append(time.perf_counter() - t0)
+
+        # Old path: enumerate everything and rebuild the combo
+        t0 = time.perf_counter()
+        devices = backend.get_input_devices()
+        combo.blockSignals(True)
+        combo.clear()
+        for dev in devices:
+            combo.addItem(dev['name'], dev['id'])
+        combo.blockSignals(False)
+        rescan.append(time.perf_counter() - t0)
+
+        pulse.remove_source(index)
+        backend._on_pulse_event(pulse, FakeEvent('source', 'remove', index))
+        wait_for(app, lambda: combo.findData(index) < 0)
+
+    devices = window.audio.devices.devices()
+    wanted = devices[-1]
+    n = 20000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        next(d for d in devices if str(d['id']) == str(wanted['id']))
+    linear = (time.perf_counter() - t0) / n
+    t0 = time.perf_counter()
+    for _ in range(n):
+        window.audio.devices.resolve(wanted['key'])
+    keyed = (time.perf_counter() - t0) / n
+
+    print(f"{args.sources} sources, {args.latency * 1000:.1f} ms per server call, {args.runs} plugs")
+    print(f"{'new source -> combo':<28} p50 {statistics.median(hotplug) * 1000:>7.2f} ms  max {max(hotplug) * 1000:>7.2f} ms")
+    print(f"{'  of which GUI thread':<28} p50 {statistics.median(slot_times) * 1000:>7.2f} ms  max {max(slot_times) * 1000:>7.2f} ms")
+    print(f"{'rescan + rebuild (GUI thr)':<28} p50 {statistics.median(rescan) * 1000:>7.2f} ms  max {max(rescan) * 1000:>7.2f} ms")
+    print(f"{'saved device, linear ids':<28} {linear * 1e6:>11.2f} us")
+    print(f"{'saved device, by key':<28} {keyed * 1e6:>11.2f} us")
+    window.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+LevelMeter on synthetic PCM (no sound server):
+
+  - accuracy:    RMS / peak of a known sine against the exact values
+  - throughput:  blocks/sec with an unpaced stream, and numpy/Python memory
+                 allocated per block in the steady state (tracemalloc)
+  - real time:   CPU the capture thread costs at the real block rate
+
+    python -m benchmarks.bench_level_meter [--blocks N] [--seconds S]
+"""
+import argparse
+import math
+import time
+import tracemalloc
+
+from benchmarks.fake_pcm import SyntheticStream
+from level_meter import LevelMeter, BLOCK, RATE
+
+
+def wait_blocks(meter, count, timeout=30):
+    end = time.perf_counter() + timeout
+    while meter.blocks < count and time.perf_counter() < end:
+        time.sleep(0.001)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--blocks', type=int, default=20000)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    # Accuracy: 0.5 amplitude sine, RMS = 0.5 / sqrt(2)
+    meter = LevelMeter(lambda: SyntheticStream('sine', 0.5, freq=500))
+    meter.start()
+    wait_blocks(meter, 60)
+    meter.stop()
+    print(f"sine 0.5: rms {meter.window_rms():.4f} (exact {0.5 / math.sqrt(2):.4f})")
+
+    # Throughput and allocations, driving process_block directly on warm buffers
+    meter = LevelMeter(lambda: SyntheticStream('noise', 0.8))
+    stream = SyntheticStream('noise', 0.8)
+    meter._fill(stream)
+    for _ in range(100):
+        meter.process_block()
+    tracemalloc.start()
+    snap0 = tracemalloc.take_snapshot()
+    t0 = time.perf_counter()
+    for _ in range(args.blocks):
+        meter.process_block()
+    elapsed = time.perf_counter() - t0
+    snap1 = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    grown = sum(stat.size_diff for stat in snap1.compare_to(snap0, 'filename') if stat.size_diff > 0)
+    print(f"process_block: {args.blocks / elapsed:,.0f} blocks/s "
+          f"({elapsed / args.blocks * 1e6:.1f} us per {BLOCK}-sample block), "
+          f"memory retained after {args.blocks} blocks: {grown} bytes")
+
+    # Real time: thread CPU at 50 blocks/s
+    meter = LevelMeter(lambda: SyntheticStream('noise', 0.3, realtime=True))
+    cpu0 = time.process_time()
+    meter.start()
+    time.sleep(args.seconds)
+    meter.stop()
+    cpu = time.process_time() - cpu0
+    print(f"real time {args.seconds:.0f} s at {RATE // BLOCK} blocks/s: {meter.blocks} blocks, "
+          f"process CPU {cpu / args.seconds * 100:.2f}%")
+
+
+if __name__ == "__main__":
+    main()
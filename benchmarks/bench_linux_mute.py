@@ -0,0 +1,65 @@
+"""
+Press-to-mute time of LinuxAudioBackend.set_mute with a cached source handle,
+against the old per-press source_list() scan.
+
+    python -m benchmarks.bench_linux_mute [--latency SECONDS] [--presses N]
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.fake_pulse import FakePulse
+from audio_manager import LinuxAudioBackend
+
+
+def legacy_set_mute(pulse, sink_source, is_muted):
+    # What set_mute did before the handle cache
+    for s in pulse.source_list():
+        if s.index == sink_source or sink_source == 'default':
+            pulse.mute(s, is_muted)
+            break
+
+
+def measure(fn, presses):
+    samples = []
+    for i in range(presses):
+        t0 = time.perf_counter_ns()
+        fn(i % 2 == 0)
+        samples.append(time.perf_counter_ns() - t0)
+    return samples
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        'median_us': statistics.median(samples) / 1000,
+        'p95_us': samples[int(len(samples) * 0.95) - 1] / 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type=float, default=0.0002, help="per-call round trip in seconds")
+    parser.add_argument('--presses', type=int, default=500)
+    args = parser.parse_args()
+
+    print("press-to-mute in microseconds")
+    print(f"{'sources':>8} {'scan med':>10} {'scan p95':>10} {'cached med':>11} {'cached p95':>11} {'speedup':>8}")
+    for count in (5, 50, 500):
+        # Target the last source so the scan has to walk the whole list
+        target = count - 1
+
+        pulse = FakePulse(count, args.latency)
+        scan = summarize(measure(lambda m: legacy_set_mute(pulse, target, m), args.presses))
+
+        backend = LinuxAudioBackend(pulse=FakePulse(count, args.latency))
+        backend.set_device(target)
+        cached = summarize(measure(backend.set_mute, args.presses))
+
+        print(f"{count:>8} {scan['median_us']:>10.1f} {scan['p95_us']:>10.1f} "
+              f"{cached['median_us']:>11.1f} {cached['p95_us']:>11.1f} "
+              f"{scan['median_us'] / cached['median_us']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Mute state tracking in LinuxAudioBackend and PTTListener:
+
+  - redundant:  releases while the mic is already muted, calls issued vs. skipped
+  - drift:      another client unmutes the source; time until the change event has
+                been reconciled and the source is muted again
+  - stuck key:  a trigger goes down and its up is lost; time from the key going
+                up in the OS until the listener releases it, also with other
+                keys typed meanwhile, and no release while it is really held
+
+    python -m benchmarks.bench_mute_state [--latency S] [--runs N]
+"""
+import argparse
+import logging
+import statistics
+import sys
+import threading
+import time
+
+from PyQt6.QtCore import QCoreApplication
+
+from benchmarks import fake_keyboard
+from benchmarks.fake_pulse import FakePulse, FakeEvent
+import key_listener
+from key_listener import PTTListener
+from audio_manager import AudioController, LinuxAudioBackend
+
+
+def wait_for(app, condition, timeout=5.0):
+    end = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > end:
+            raise TimeoutError
+        app.processEvents()
+        time.sleep(0.0002)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type=float, default=0.0005, help="fake pulse round trip in seconds")
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+    app = QCoreApplication(sys.argv[:1])
+    logging.disable(logging.WARNING)  # one "setting it back" per drift run
+
+    pulse = FakePulse(5, args.latency, wait=time.sleep)
+    backend = LinuxAudioBackend(pulse=pulse)
+    audio = AudioController(backend=backend)
+    audio.set_device(1)
+    source = pulse._by_index[1]
+
+    # Redundant: mic starts muted, a burst of releases (other bindings, stuck-key
+    # releases, startup) all ask for the state it is already in
+    audio.set_mute(True)
+    audio.worker.wait_idle()
+    calls, stats = pulse.calls, audio.mute_stats()
+    for _ in range(args.runs * 10):
+        audio.set_mute(True)
+        audio.worker.wait_idle()
+    after = audio.mute_stats()
+    print(f"{args.runs * 10} mutes on a muted source: {after['issued'] - stats['issued']} issued, "
+          f"{after['skipped'] - stats['skipped']} skipped, {pulse.calls - calls} server calls")
+
+    # Drift: someone else unmutes, the watcher thread sees the change event
+    drift = []
+    for _ in range(args.runs):
+        pulse.source_mute(1, False)
+        t0 = time.perf_counter()
+        threading.Thread(target=backend._on_pulse_event,
+                         args=(pulse, FakeEvent('source', 'change', 1))).start()
+        wait_for(app, lambda: source.mute)
+        drift.append(time.perf_counter() - t0)
+    print(f"outside unmute -> muted again: p50 {statistics.median(drift) * 1000:.2f} ms, "
+          f"max {max(drift) * 1000:.2f} ms, {audio.mute_stats()['drift_corrections']} corrections")
+
+    # Stuck key: down, a few repeats, then the up never reaches the hook
+    keyboard = fake_keyboard.install(key_listener)
+    listener = PTTListener()
+    released = []
+    listener.binding_event.connect(lambda binding, is_down, stamp: is_down or released.append(time.perf_counter()))
+    listener.start_listening('num 0')
+    timeout = (listener.stuck_release_ms + 2 * key_listener.STUCK_CHECK_MS) / 1000 + 1
+    for typing in (False, True):
+        stuck = []
+        for _ in range(max(1, args.runs // 5)):
+            keyboard.feed('num 0', 'down')
+            for _ in range(5):
+                time.sleep(0.03)
+                keyboard.feed('num 0', 'down')
+            keyboard.lose_up('num 0')
+            lost = time.perf_counter()
+            if typing:
+                for key in 'wasd':
+                    keyboard.feed(key, 'down')
+                    keyboard.feed(key, 'up')
+            count = len(released)
+            wait_for(app, lambda: len(released) > count, timeout=timeout)
+            stuck.append(released[-1] - lost)
+        print(f"lost key up{', then typing' if typing else ''} -> released: "
+              f"p50 {statistics.median(stuck) * 1000:.0f} ms, max {max(stuck) * 1000:.0f} ms "
+              f"(limit {listener.stuck_release_ms} + {2 * key_listener.STUCK_CHECK_MS} ms)")
+
+    # Really held, with other keys typed meanwhile: never released
+    count = len(released)
+    keyboard.feed('num 0', 'down')
+    time.sleep(0.03)
+    keyboard.feed('w', 'down')
+    keyboard.feed('w', 'up')
+    try:
+        wait_for(app, lambda: len(released) > count, timeout=timeout)
+    except TimeoutError:
+        pass
+    print(f"held, other key pressed -> released anyway: {len(released) > count} (should be False)")
+    keyboard.feed('num 0', 'up')
+    listener.stop_listening()
+
+    audio.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Listener -> controller -> backend pipeline benchmark, no hardware needed.
+
+Drives PTTListener with synthetic key streams through a FakeKeyboard and mutes a
+FakePulse through the real AudioController / LinuxAudioBackend. For every
+scenario it reports:
+
+  - throughput: toggles/sec with events fed back to back (coalescing allowed)
+  - press-to-mute latency percentiles, feeding one edge at a time
+  - CPU time per toggle (process-wide, fake pulse latency is slept, not spun)
+
+    python -m benchmarks.bench_pipeline [--sources N] [--latency SECONDS] [--out results.json]
+"""
+import argparse
+import json
+import platform
+import sys
+import threading
+import time
+
+from PyQt6.QtCore import QCoreApplication
+
+from benchmarks import fake_keyboard
+from benchmarks.fake_pulse import FakePulse
+import key_listener
+from key_listener import PTTListener
+from audio_manager import AudioController, LinuxAudioBackend
+from latency import now_ns
+
+
+# --- Scenarios: (hotkey or binding list, [(key name, 'down'|'up'), ...]) ---
+
+def single_taps(n=200):
+    return 'num 0', [e for _ in range(n) for e in (('num 0', 'down'), ('num 0', 'up'))]
+
+def held_key(n=50, repeats=30):
+    # OS auto-repeat sends extra 'down's while held
+    events = []
+    for _ in range(n):
+        events += [('num 0', 'down')] * (repeats + 1)
+        events.append(('num 0', 'up'))
+    return 'num 0', events
+
+def repeat_storm(n=5, repeats=2000):
+    return held_key(n, repeats)
+
+def modifier_chords(n=200):
+    events = []
+    for _ in range(n):
+        events += [('ctrl', 'down'), ('alt', 'down'), ('p', 'down'),
+                   ('p', 'up'), ('alt', 'up'), ('ctrl', 'up')]
+    return 'ctrl+alt+p', events
+
+def many_bindings(n=200, count=100):
+    # Same chord as modifier_chords but among `count` bindings: hook cost should not move
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    prefixes = ['', 'ctrl+', 'alt+', 'ctrl+alt+']
+    bindings = [{'hotkey': prefix + letter, 'action': 'ptt'}
+                for prefix in prefixes for letter in letters][:count]
+    return bindings, modifier_chords(n)[1]
+
+SCENARIOS = {
+    'single_taps': single_taps,
+    'held_key': held_key,
+    'repeat_storm': repeat_storm,
+    'modifier_chords': modifier_chords,
+    'many_bindings': many_bindings,
+}
+
+
+def percentiles(samples):
+    if not samples:
+        return None
+    samples = sorted(samples)
+    pick = lambda p: samples[min(len(samples) - 1, int(len(samples) * p / 100))] / 1000
+    return {'p50_us': pick(50), 'p95_us': pick(95), 'p99_us': pick(99), 'max_us': samples[-1] / 1000}
+
+
+class Pipeline:
+    """The same wiring MainWindow does, minus the widgets."""
+
+    def __init__(self, sources, latency):
+        # The listener's stuck-key timer wants an application, as in the real app
+        self.app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+        self.keyboard = fake_keyboard.install(key_listener)
+        self.pulse = FakePulse(sources, latency, wait=time.sleep)
+        self.done = threading.Event()
+        self.done_ns = 0
+        self.toggles = 0
+
+        self.audio = AudioController(on_mute_done=self._on_mute_done,
+                                     backend=LinuxAudioBackend(pulse=self.pulse))
+        self.audio.set_device(sources - 1)
+        self.listener = self._fresh_listener()
+
+    def _fresh_listener(self):
+        # New listener per run so its hook counters cover one scenario
+        listener = PTTListener()
+        listener.binding_event.connect(self._on_binding_event)
+        return listener
+
+    def _on_binding_event(self, binding, is_down, stamp):
+        self.toggles += 1
+        is_muted = binding.mute_state(is_down)
+        self.audio.set_mute(is_muted, stamp, binding.device_id)
+
+    def _on_mute_done(self, is_muted, error, results):
+        self.done_ns = now_ns()
+        self.done.set()
+
+    def run_throughput(self, hotkey, events):
+        self.listener = self._fresh_listener()
+        self.listener.start_listening(hotkey)
+        self.toggles = 0
+        calls, applied = self.pulse.calls, self.audio.worker.applied
+        cpu0, t0 = time.process_time_ns(), time.perf_counter_ns()
+        for name, event_type in events:
+            self.keyboard.feed(name, event_type)
+        self.audio.worker.wait_idle()
+        elapsed = time.perf_counter_ns() - t0
+        cpu = time.process_time_ns() - cpu0
+        self.listener.stop_listening()
+        return {
+            'events': len(events),
+            'toggles': self.toggles,
+            'elapsed_s': elapsed / 1e9,
+            'events_per_sec': len(events) / (elapsed / 1e9),
+            'toggles_per_sec': self.toggles / (elapsed / 1e9),
+            'cpu_us_per_toggle': cpu / 1000 / max(1, self.toggles),
+            'backend_calls': self.pulse.calls - calls,
+            'mutes_applied': self.audio.worker.applied - applied,
+            'hook': self.listener.hook_stats(),
+        }
+
+    def run_latency(self, hotkey, events):
+        self.listener.start_listening(hotkey)
+        samples = []
+        for name, event_type in events:
+            before = self.toggles
+            self.done.clear()
+            t0 = now_ns()
+            self.keyboard.feed(name, event_type)
+            if self.toggles != before:
+                if self.done.wait(1.0):
+                    samples.append(self.done_ns - t0)
+        self.listener.stop_listening()
+        return {'press_to_mute': percentiles(samples), 'samples': len(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sources', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.0002, help="fake pulse round trip in seconds")
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help="default: all")
+    parser.add_argument('--out', help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    pipeline = Pipeline(args.sources, args.latency)
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sources': args.sources,
+            'call_latency_s': args.latency,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'scenarios': {},
+    }
+    for name in args.scenario or SCENARIOS:
+        hotkey, events = SCENARIOS[name]()
+        result = pipeline.run_throughput(hotkey, events)
+        result.update(pipeline.run_latency(hotkey, events))
+        results['scenarios'][name] = result
+        lat = result['press_to_mute'] or {}
+        print(f"{name:<16} {result['toggles_per_sec']:>10.0f} toggles/s  "
+              f"p50 {lat.get('p50_us', 0):>7.0f}us  p99 {lat.get('p99_us', 0):>7.0f}us  "
+              f"cpu {result['cpu_us_per_toggle']:>6.1f}us/toggle  "
+              f"hook {result['hook']['hook_avg_us']:>5.1f}us  "
+              f"repeats dropped {result['hook']['dropped_repeats']}", file=sys.stderr)
+
+    pipeline.audio.shutdown()
+    text = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Press latency of a modifier chord (ctrl+alt+p) with and without pre-arming,
+through the real listener, AudioController and LinuxAudioBackend on a FakePulse.
+The modifiers go down `--lead` seconds before the trigger, as a hand does.
+
+  - warm:      the source handle is cached and current (the usual case)
+  - replugged: the mic was replugged before each chord; the remove event dropped
+               the cached handle, so the press has to look the source up again
+  - stale:     as replugged, but the event was missed: the cached handle points
+               at the old source, the mute fails and is retried after a lookup
+  - abandoned: modifiers pressed and released with no trigger; what a chord that
+               never fires costs (backend calls, pre-arms cancelled)
+
+For each: key-down -> mute applied percentiles, pre-arm hits / pre-arms,
+backend round trips per chord, and how long the fake OS hook call takes for a
+modifier event (where the pre-arm is queued).
+
+    python -m benchmarks.bench_prearm [--chords N] [--lead S] [--latency S] [--out results.json]
+"""
+import argparse
+import json
+import sys
+import time
+
+from PyQt6.QtCore import Qt
+
+from benchmarks.bench_pipeline import Pipeline, percentiles
+from latency import now_ns
+
+SOURCE = 1  # the bound mic, targeted by its stable name
+
+
+class PrearmPipeline(Pipeline):
+    def __init__(self, sources, latency, prearm):
+        self.prearm = prearm
+        super().__init__(sources, latency)
+        self.name = self.pulse._by_index[SOURCE].name
+        self.index = SOURCE
+
+    def _fresh_listener(self):
+        listener = super()._fresh_listener()
+        if self.prearm:
+            # As MainWindow wires it: straight from the hook thread
+            listener.chord_held.connect(
+                lambda bindings: self.audio.prearm([b.device_id for b in bindings]),
+                Qt.ConnectionType.DirectConnection)
+        return listener
+
+    def replug(self, tell_backend):
+        # Same name, new index, as the server does for a replugged mic; it comes
+        # back muted, as we left it (module-device-restore)
+        desc = self.pulse._by_index[self.index].description
+        self.pulse.remove_source(self.index)
+        self.index = self.pulse.add_source(self.name, desc)
+        self.pulse._by_index[self.index].mute = True
+        if tell_backend:
+            self.audio.backend._sources.pop(self.name, None)  # what the remove event does
+
+    def run_chords(self, scenario, chords, lead):
+        self.listener = self._fresh_listener()
+        self.listener.start_listening([{'hotkey': 'ctrl+alt+p', 'device_id': self.name}])
+        worker = self.audio.worker
+        # Cached and unmuted to start with
+        self.audio.backend.prearm([self.name])
+        self.audio.set_mute(False, None, self.name)
+        worker.wait_idle()
+        prearms, hits, cancels = worker.prearms, worker.prearm_hits, worker.prearm_cancels
+        calls = self.pulse.calls
+        samples = []
+        modifier_ns = []
+        for _ in range(chords):
+            if scenario in ('replugged', 'stale'):
+                self.replug(tell_backend=scenario == 'replugged')
+            self.keyboard.feed('ctrl', 'down')
+            t0 = time.perf_counter_ns()
+            self.keyboard.feed('alt', 'down')  # completes the chord
+            modifier_ns.append(time.perf_counter_ns() - t0)
+            time.sleep(lead)
+            if scenario != 'abandoned':
+                self.done.clear()
+                t0 = now_ns()
+                self.keyboard.feed('p', 'down')
+                if self.done.wait(1.0):
+                    samples.append(self.done_ns - t0)
+                worker.wait_idle()
+                self.keyboard.feed('p', 'up')
+                worker.wait_idle()
+            self.keyboard.feed('alt', 'up')
+            self.keyboard.feed('ctrl', 'up')
+            worker.wait_idle()
+            time.sleep(0.002)
+        self.listener.stop_listening()
+        return {
+            'press_to_mute': percentiles(samples),
+            'prearms': worker.prearms - prearms,
+            'prearm_hits': worker.prearm_hits - hits,
+            'prearm_cancels': worker.prearm_cancels - cancels,
+            'calls_per_chord': (self.pulse.calls - calls) / chords,
+            'modifier_hook': percentiles(modifier_ns),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--chords', type=int, default=200)
+    parser.add_argument('--lead', type=float, default=0.03, help="seconds from modifiers to trigger")
+    parser.add_argument('--latency', type=float, default=0.0005, help="fake pulse round trip in seconds")
+    parser.add_argument('--out', help="write JSON here")
+    args = parser.parse_args()
+
+    results = {}
+    for scenario in ('warm', 'replugged', 'stale', 'abandoned'):
+        for prearm in (False, True):
+            pipeline = PrearmPipeline(5, args.latency, prearm)
+            key = f"{scenario}{'_prearm' if prearm else ''}"
+            r = results[key] = pipeline.run_chords(scenario, args.chords, args.lead)
+            pipeline.audio.shutdown()
+            lat = r['press_to_mute'] or {}
+            print(f"{key:<20} p50 {lat.get('p50_us', 0):>7.0f}us  p99 {lat.get('p99_us', 0):>7.0f}us  "
+                  f"hits {r['prearm_hits']:>4}/{r['prearms']:<4} cancels {r['prearm_cancels']:>4}  "
+                  f"calls/chord {r['calls_per_chord']:.2f}  "
+                  f"modifier hook p50 {r['modifier_hook']['p50_us']:.1f}us", file=sys.stderr)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
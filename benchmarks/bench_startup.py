@@ -0,0 +1,144 @@
+"""
+Cold start budget check: time until the hotkey hook is armed, the window is
+shown and the device list is filled, each from interpreter start in a fresh
+process. One more run under `-X importtime` lists the slowest imports.
+Keyboard and PulseAudio are the in-process stand-ins, as in bench_startup_modes.
+
+    python -m benchmarks.bench_startup [--runs N] [--budget FILE] [--armed-ms MS ...]
+
+Exits non-zero when a median goes over its budget (benchmarks/startup_budget.json
+unless overridden), so it can gate a change.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks import SRC_DIR
+
+REPO_DIR = os.path.dirname(SRC_DIR)
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+METRICS = ("armed_ms", "shown_ms", "devices_ms")
+
+CHILD = r'''
+import time
+t0 = time.monotonic_ns()
+import functools, json, sys
+sys.path[:0] = [{src!r}, {repo!r}]
+
+import audio_manager
+import key_listener
+from benchmarks import fake_keyboard
+from benchmarks.fake_pulse import FakePulse
+fake_keyboard.install(key_listener)
+# A slow sound server connect is what the background backend is there to hide
+audio_manager.LinuxAudioBackend = functools.partial(
+    audio_manager.LinuxAudioBackend, pulse=FakePulse(50, {latency}), connect=lambda: FakePulse(50, 0))
+
+def ms(ns):
+    return (ns - t0) / 1e6
+
+if sys.argv[1] == "headless":
+    from PyQt6.QtCore import QCoreApplication
+    app = QCoreApplication(sys.argv[:1])
+    from headless import HeadlessPTT
+    daemon = HeadlessPTT()
+    daemon.start()
+    armed = daemon.armed_ns
+    shown = devices = time.monotonic_ns()
+else:
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication(sys.argv[:1])
+    from ui.main_window import MainWindow
+    window = MainWindow()
+    window.show()
+    app.processEvents()
+    armed = window.armed_ns
+    shown = time.monotonic_ns()
+    while window.combo_dev.count() == 0 and ms(time.monotonic_ns()) < 10000:
+        app.processEvents()
+        time.sleep(0.0005)
+    devices = time.monotonic_ns()
+
+print(json.dumps({{"armed_ms": ms(armed), "shown_ms": ms(shown), "devices_ms": ms(devices)}}))
+'''
+
+
+def run_child(mode, home, latency, importtime=False):
+    env = dict(os.environ, HOME=home, QT_QPA_PLATFORM="offscreen")
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", CHILD.format(src=SRC_DIR, repo=REPO_DIR, latency=latency), mode]
+    proc = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us)} from `-X importtime` output."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def load_budget(path, args):
+    budget = {}
+    if path and os.path.exists(path):
+        with open(path) as f:
+            budget = json.load(f)
+    for metric in METRICS:
+        value = getattr(args, metric)
+        if value is not None:
+            for mode in args.modes:
+                budget.setdefault(mode, {})[metric] = value
+    return budget
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--modes', nargs='+', default=["gui", "headless"])
+    parser.add_argument('--connect-latency', type=float, default=0.05,
+                        help="seconds the fake sound server takes per call on the backend connection")
+    parser.add_argument('--budget', default=BUDGET_FILE)
+    parser.add_argument('--top', type=int, default=12, help="slowest imports to list")
+    for metric in METRICS:
+        parser.add_argument('--' + metric.replace('_', '-'), dest=metric, type=float,
+                            help=f"override the {metric} budget for every mode")
+    args = parser.parse_args()
+    budget = load_budget(args.budget, args)
+
+    over = []
+    with tempfile.TemporaryDirectory() as home:
+        print(f"median of {args.runs} runs, ms from interpreter start")
+        print(f"{'mode':<10} {'armed':>8} {'shown':>8} {'devices':>8}")
+        for mode in args.modes:
+            runs = [run_child(mode, home, args.connect_latency)[0] for _ in range(args.runs)]
+            row = {m: statistics.median(r[m] for r in runs) for m in METRICS}
+            print(f"{mode:<10} {row['armed_ms']:>8.0f} {row['shown_ms']:>8.0f} {row['devices_ms']:>8.0f}")
+            for metric, limit in budget.get(mode, {}).items():
+                if row[metric] > limit:
+                    over.append(f"{mode} {metric} {row[metric]:.0f} > {limit:.0f}")
+
+        _, stderr = run_child(args.modes[0], home, args.connect_latency, importtime=True)
+    times = parse_importtime(stderr)
+    print(f"\nslowest imports ({args.modes[0]}, self time, under -X importtime)")
+    print(f"{'module':<40} {'self ms':>8} {'cumul ms':>9}")
+    for name, (self_us, cumulative_us) in sorted(times.items(), key=lambda kv: -kv[1][0])[:args.top]:
+        print(f"{name:<40} {self_us / 1000:>8.1f} {cumulative_us / 1000:>9.1f}")
+
+    if over:
+        print("\nOVER BUDGET: " + "; ".join(over))
+        sys.exit(1)
+    print("\nwithin budget")
+
+
+if __name__ == "__main__":
+    main()
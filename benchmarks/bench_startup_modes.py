@@ -0,0 +1,90 @@
+"""
+Startup time and resident memory of headless mode against the GUI, each in a
+fresh interpreter. Keyboard and PulseAudio are the in-process stand-ins, so
+this measures our own startup cost, not the sound server's.
+
+    python -m benchmarks.bench_startup_modes [--runs N]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import SRC_DIR
+
+REPO_DIR = os.path.dirname(SRC_DIR)
+
+CHILD = r'''
+import time
+t0 = time.perf_counter()
+import functools, json, os, sys
+sys.path[:0] = [{src!r}, {repo!r}]
+
+import audio_manager
+import key_listener
+from benchmarks import fake_keyboard
+from benchmarks.fake_pulse import FakePulse
+fake_keyboard.install(key_listener)
+audio_manager.LinuxAudioBackend = functools.partial(
+    audio_manager.LinuxAudioBackend, pulse=FakePulse(50, 0), connect=lambda: FakePulse(50, 0))
+
+if sys.argv[1] == "headless":
+    from PyQt6.QtCore import QCoreApplication
+    app = QCoreApplication(sys.argv[:1])
+    from headless import HeadlessPTT
+    daemon = HeadlessPTT()
+    daemon.start()
+else:
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication(sys.argv[:1])
+    from ui.main_window import MainWindow
+    window = MainWindow()
+    window.show()
+app.processEvents()
+armed = time.perf_counter() - t0
+
+rss_kb = 0
+with open("/proc/self/status") as f:
+    for line in f:
+        if line.startswith("VmRSS:"):
+            rss_kb = int(line.split()[1])
+print(json.dumps({{"armed_s": armed, "rss_kb": rss_kb, "modules": len(sys.modules)}}))
+'''
+
+
+def run_once(mode, home):
+    env = dict(os.environ, HOME=home, QT_QPA_PLATFORM="offscreen")
+    code = CHILD.format(src=SRC_DIR, repo=REPO_DIR)
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code, mode], env=env,
+                         capture_output=True, text=True, check=True).stdout
+    wall = time.perf_counter() - t0
+    result = json.loads(out.strip().splitlines()[-1])
+    result["process_s"] = wall
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        rows = {}
+        for mode in ("headless", "gui"):
+            runs = [run_once(mode, home) for _ in range(args.runs)]
+            rows[mode] = {key: statistics.median(r[key] for r in runs) for key in runs[0]}
+
+    print(f"median of {args.runs} runs (process_s includes interpreter start and exit)")
+    print(f"{'mode':<10} {'armed ms':>9} {'process ms':>11} {'RSS MB':>8} {'modules':>8}")
+    for mode, r in rows.items():
+        print(f"{mode:<10} {r['armed_s'] * 1000:>9.0f} {r['process_s'] * 1000:>11.0f} "
+              f"{r['rss_kb'] / 1024:>8.1f} {r['modules']:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Cost of publishing PTT state through the memory-mapped status file, against
+the obvious alternative of rewriting a small JSON file that consumers re-read:
+
+  - writer:  per-transition cost on the app side (StatusWriter.publish vs. an
+             atomic JSON rewrite)
+  - poll:    one consumer poll when nothing changed (changed()), a full read(),
+             and open + read + parse of the JSON file
+  - live:    a writer process publishing as fast as it can while this process
+             reads; every record read must be consistent (the device name is
+             written from the same counter as the transition count), and the
+             retries show how often a read caught a write in progress
+
+    python -m benchmarks.bench_status_file [--n N] [--live S]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import SRC_DIR
+from benchmarks.bench_pipeline import percentiles
+import status_file
+
+WRITER = r'''
+import sys, time
+sys.path.insert(0, {src!r})
+import status_file
+writer = status_file.StatusWriter({path!r})
+writer.open()
+end = time.monotonic() + {seconds}
+while time.monotonic() < end:
+    # transitions goes up by one per call; the name carries the same number
+    writer.publish(transmitting=not writer.transmitting, device=f"dev-{{writer.transitions + 1}}")
+writer.close()
+print(writer.transitions)
+'''
+
+
+def timed(fn, n):
+    samples = []
+    for i in range(n):
+        t0 = time.perf_counter_ns()
+        fn(i)
+        samples.append(time.perf_counter_ns() - t0)
+    return percentiles(samples)
+
+
+def json_write(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def json_read(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def live(path, seconds):
+    writer = subprocess.Popen([sys.executable, "-c", WRITER.format(src=SRC_DIR, path=path, seconds=seconds)],
+                              stdout=subprocess.PIPE, text=True)
+    while not os.path.exists(path) or os.path.getsize(path) < status_file.SIZE:
+        time.sleep(0.001)
+    time.sleep(0.05)  # let it map and write the header
+    reader = status_file.StatusReader(path)
+    reads = bad = missed = 0
+    while writer.poll() is None:
+        record = reader.read()
+        if record is None:
+            missed += 1
+            continue
+        reads += 1
+        if record["running"] and record["transitions"] and record["device"] != f"dev-{record['transitions']}":
+            bad += 1
+    published = int(writer.stdout.read())
+    reader.close()
+    return {"published": published, "reads": reads, "retries": reader.retries,
+            "gave_up": missed, "inconsistent": bad}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n', type=int, default=20000, help="samples per measurement")
+    parser.add_argument('--live', type=float, default=2.0, help="seconds of concurrent write/read")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "status")
+        json_path = os.path.join(tmp, "status.json")
+        writer = status_file.StatusWriter(path)
+        writer.open()
+        writer.publish(device="Fake Source 0")
+        state = {"transmitting": False, "device": "Fake Source 0", "binding": 0, "transitions": 0}
+        json_write(json_path, state)
+        reader = status_file.StatusReader(path)
+        reader.read()
+
+        def flip_json(i):
+            state["transmitting"] = i % 2 == 0
+            state["transitions"] += 1
+            json_write(json_path, state)
+
+        rows = [
+            ("writer  mmap publish", timed(lambda i: writer.publish(transmitting=i % 2 == 0, binding=0), args.n)),
+            ("writer  json rewrite", timed(flip_json, args.n)),
+            ("poll    mmap changed()", timed(lambda i: reader.changed(), args.n)),
+            ("poll    mmap read()", timed(lambda i: reader.read(), args.n)),
+            ("poll    json open+parse", timed(lambda i: json_read(json_path), args.n)),
+        ]
+        writer.close()
+        reader.close()
+        print(f"{'':<24} {'p50 us':>8} {'p99 us':>8} {'max us':>8}")
+        for name, p in rows:
+            print(f"{name:<24} {p['p50_us']:>8.2f} {p['p99_us']:>8.2f} {p['max_us']:>8.1f}")
+
+        r = live(os.path.join(tmp, "live"), args.live)
+        print(f"live {args.live:.0f}s: {r['published']} transitions published, {r['reads']} reads, "
+              f"{r['retries']} retries, {r['gave_up']} gave up, {r['inconsistent']} inconsistent")
+
+
+if __name__ == "__main__":
+    main()
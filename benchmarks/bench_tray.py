@@ -0,0 +1,129 @@
+"""
+Idle footprint of tray mode against the window, each in a fresh interpreter
+with the in-process keyboard and PulseAudio stand-ins:
+
+  - gui:          MainWindow shown, as `python src/main.py`
+  - tray:         --tray, window never opened
+  - tray_closed:  --tray, window opened for a second and closed again
+
+For each: resident memory once settled, threads, and wakeups per second while
+idle (context switches of all the process's threads, from /proc).
+
+    python -m benchmarks.bench_tray [--idle S] [--runs N]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks import SRC_DIR
+
+REPO_DIR = os.path.dirname(SRC_DIR)
+
+CHILD = r'''
+import functools, gc, glob, json, os, sys, time
+sys.path[:0] = [{src!r}, {repo!r}]
+
+import audio_manager
+import key_listener
+from benchmarks import fake_keyboard
+from benchmarks.fake_pulse import FakePulse
+fake_keyboard.install(key_listener)
+audio_manager.LinuxAudioBackend = functools.partial(
+    audio_manager.LinuxAudioBackend, pulse=FakePulse(50, 0), connect=lambda: FakePulse(50, 0))
+
+from PyQt6.QtWidgets import QApplication, QSystemTrayIcon
+from PyQt6.QtCore import QTimer, QEventLoop, QElapsedTimer
+# The offscreen platform has no tray; pretend it does so the window stays closed
+QSystemTrayIcon.isSystemTrayAvailable = staticmethod(lambda: True)
+
+def spin(app, seconds):
+    clock = QElapsedTimer()
+    clock.start()
+    while clock.elapsed() < seconds * 1000:
+        app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 50)
+        time.sleep(0.01)
+
+def switches():
+    total = 0
+    for path in glob.glob("/proc/self/task/*/status"):
+        try:
+            with open(path) as f:
+                for line in f:
+                    if "ctxt_switches" in line:
+                        total += int(line.split()[1])
+        except OSError:
+            pass  # thread exited
+    return total
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+
+mode = sys.argv[1]
+app = QApplication(sys.argv[:1])
+app.setQuitOnLastWindowClosed(False)
+if mode == "gui":
+    from ui.main_window import MainWindow
+    window = MainWindow()
+    window.show()
+else:
+    from ui.tray import TrayPTT
+    tray = TrayPTT()
+    tray.start()
+    if mode == "tray_closed":
+        tray.open_window()
+        spin(app, 1.0)
+        tray.window.close()
+spin(app, 1.0)
+gc.collect()
+rss = rss_kb()
+
+idle = float(sys.argv[2])
+result = {{"rss_kb": rss, "threads": len(os.listdir("/proc/self/task")), "modules": len(sys.modules)}}
+def done():
+    # Counted before quit(), which also closes the window
+    result["wakeups_per_s"] = (switches() - before) / idle
+    app.quit()
+QTimer.singleShot(int(idle * 1000), done)
+before = switches()
+app.exec()
+print(json.dumps(result))
+os._exit(0)
+'''
+
+
+def run_once(mode, home, idle):
+    env = dict(os.environ, HOME=home, QT_QPA_PLATFORM="offscreen")
+    code = CHILD.format(src=SRC_DIR, repo=REPO_DIR)
+    out = subprocess.run([sys.executable, "-c", code, mode, str(idle)], env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--idle', type=float, default=5.0, help="seconds of idle to count wakeups over")
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        rows = {}
+        for mode in ("gui", "tray", "tray_closed"):
+            runs = [run_once(mode, home, args.idle) for _ in range(args.runs)]
+            rows[mode] = {key: statistics.median(r[key] for r in runs) for key in runs[0]}
+
+    print(f"median of {args.runs} runs, {args.idle:.0f} s idle each")
+    print(f"{'mode':<12} {'RSS MB':>8} {'wakeups/s':>10} {'threads':>8} {'modules':>8}")
+    for mode, r in rows.items():
+        print(f"{mode:<12} {r['rss_kb'] / 1024:>8.1f} {r['wakeups_per_s']:>10.1f} "
+              f"{r['threads']:>8.0f} {r['modules']:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
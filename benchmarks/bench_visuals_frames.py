@@ -0,0 +1,127 @@
+"""
+GUI-thread time per VisualsWidget frame: frames drawn on the GUI thread (as
+before FrameRenderer) against the render thread, with the GUI idle and with it
+busy (30 ms handlers every 50 ms, standing in for slow slots).
+
+For each it reports the GUI thread's time per shown frame (frame_ready slot +
+paintEvent, or the timer tick + paintEvent inline), frames shown, frames the
+render thread dropped, and the render thread's own time per frame.
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_visuals_frames [--seconds S] [--size WxH]
+"""
+import argparse
+import statistics
+import sys
+import time
+
+import benchmarks  # noqa: F401  (puts src/ on the path)
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer, QElapsedTimer, QEventLoop
+
+from ui.visuals import VisualsWidget
+
+
+class TimedVisuals(VisualsWidget):
+    """Times what the GUI thread spends per frame."""
+
+    def __init__(self, inline=False):
+        super().__init__()
+        self.inline = inline
+        self.gui_ns = []
+        self.render_ns = []
+        self._tick_ns = 0
+        if inline:
+            self.tick = QTimer(self)
+            self.tick.timeout.connect(self._render_here)
+
+    def _reschedule(self):
+        if not self.inline:
+            return super()._reschedule()
+        fps = self._target_fps()
+        self.renderer.resize(self.width(), self.height(), self.devicePixelRatioF())
+        if fps:
+            self.tick.start(int(1000 / fps))
+        else:
+            self.tick.stop()
+
+    def _render_here(self):
+        # The old way: the frame is drawn on the GUI thread on each timer tick
+        t0 = time.perf_counter_ns()
+        self.renderer.render(time.monotonic())
+        self._tick_ns += time.perf_counter_ns() - t0
+
+    def _on_frame_ready(self):
+        t0 = time.perf_counter_ns()
+        super()._on_frame_ready()
+        self._tick_ns += time.perf_counter_ns() - t0
+
+    def paintEvent(self, event):
+        t0 = time.perf_counter_ns()
+        super().paintEvent(event)
+        self.gui_ns.append(time.perf_counter_ns() - t0 + self._tick_ns)
+        self._tick_ns = 0
+
+
+def busy_handler():
+    end = time.perf_counter() + 0.03
+    while time.perf_counter() < end:
+        pass
+
+
+def run(app, size, seconds, inline, busy):
+    widget = TimedVisuals(inline)
+    widget.resize(*size)
+    widget.show()
+    widget.activateWindow()
+    load = QTimer()
+    load.timeout.connect(busy_handler)
+    if busy:
+        load.start(50)
+    # Time the render thread too, by wrapping its per-frame call
+    renderer = widget.renderer
+    render = renderer.render
+    def timed_render(now):
+        t0 = time.perf_counter_ns()
+        render(now)
+        widget.render_ns.append(time.perf_counter_ns() - t0)
+    renderer.render = timed_render
+
+    clock = QElapsedTimer()
+    clock.start()
+    while clock.elapsed() < seconds * 1000:
+        app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 50)
+        time.sleep(0.001)
+    load.stop()
+    widget.hide()
+    shown = len(widget.gui_ns)
+    rendered = renderer.frames_rendered
+    widget.deleteLater()
+    return {
+        'gui_us_per_frame': statistics.median(widget.gui_ns[1:] or [0]) / 1000,
+        'gui_us_p99': sorted(widget.gui_ns)[int(shown * 0.99)] / 1000 if shown else 0,
+        'render_us_per_frame': statistics.median(widget.render_ns or [0]) / 1000,
+        'shown': shown,
+        'dropped': max(0, rendered - shown) if not inline else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--size', default='600x450')
+    args = parser.parse_args()
+    size = tuple(int(v) for v in args.size.split('x'))
+    app = QApplication(sys.argv[:1])
+
+    print(f"{args.size}, {args.seconds:.0f} s per run, GUI thread time per shown frame (median / p99)")
+    print(f"{'mode':<22} {'gui us':>8} {'p99 us':>8} {'render us':>10} {'shown':>6} {'dropped':>8}")
+    for inline in (True, False):
+        for busy in (False, True):
+            r = run(app, size, args.seconds, inline, busy)
+            name = f"{'gui thread' if inline else 'render thread'}{', busy' if busy else ''}"
+            print(f"{name:<22} {r['gui_us_per_frame']:>8.0f} {r['gui_us_p99']:>8.0f} "
+                  f"{r['render_us_per_frame']:>10.0f} {r['shown']:>6} {r['dropped']:>8}")
+
+
+if __name__ == "__main__":
+    main()
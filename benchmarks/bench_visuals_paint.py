@@ -0,0 +1,109 @@
+"""
+Paint time of VisualsWidget per frame: the old uncached paintEvent against the
+cached layers, for a frame drawn from scratch and for an animation frame that
+only redraws what moved (both now on FrameRenderer's thread), and the GUI
+thread's blit of a whole finished frame (on expose; animation frames only
+blit the dirty region). Renders offscreen into a QImage.
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_visuals_paint [--frames N]
+"""
+import argparse
+import math
+import statistics
+import time
+
+import benchmarks  # noqa: F401  (puts src/ on the path)
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QPointF
+from PyQt6.QtGui import QImage, QPainter, QColor, QPen, QBrush, QPolygonF, QRegion
+
+from ui.visuals import VisualsWidget
+
+SIZES = [(600, 450), (3840, 2160)]
+
+
+def legacy_paint(painter, w, h, grid_offset, angle_x):
+    # What paintEvent did before layer caching (minus the dead projection loop)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.fillRect(0, 0, w, h, QColor(20, 20, 20))
+    cx, cy = w / 2, h / 2
+    pen = QPen(QColor(255, 255, 255, 100))
+    pen.setWidthF(1.5)
+    painter.setPen(pen)
+    horizon_y = h * 0.3
+    for i in range(-10, 11):
+        painter.drawLine(int(cx), int(horizon_y), int(cx + i * 100), h)
+    painter.setPen(QPen(QColor(255, 255, 255, 50), 1))
+    for x in range(0, w, 100):
+        painter.drawLine(x, 0, x, h)
+    for y in range(0, h, 100):
+        y_pos = (y + grid_offset) % h
+        painter.drawLine(0, int(y_pos), w, int(y_pos))
+
+    points = [(-1, -1, -1), (1, -1, -1), (1, 1, -1), (-1, 1, -1),
+              (-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)]
+    rad = math.radians(angle_x)
+    cos_a, sin_a = math.cos(rad), math.sin(rad)
+    rotated = [(cx + x * 60, cy + (y * cos_a - z * sin_a) * 60) for x, y, z in points]
+    pen = QPen(QColor(240, 240, 240))
+    pen.setWidth(2)
+    painter.setPen(pen)
+    painter.setBrush(QBrush(QColor(255, 255, 255, 20)))
+    faces = [(0, 1, 2, 3), (4, 5, 6, 7), (0, 1, 5, 4), (2, 3, 7, 6), (1, 2, 6, 5), (0, 3, 7, 4)]
+    for face in faces:
+        poly = QPolygonF()
+        for idx in face:
+            poly.append(QPointF(*rotated[idx]))
+        painter.drawPolygon(poly)
+    painter.fillRect(0, 0, w, h, QColor(0, 100, 255, 90))
+
+
+def time_frames(fn, frames):
+    samples = []
+    for i in range(frames):
+        t0 = time.perf_counter_ns()
+        fn(i)
+        samples.append(time.perf_counter_ns() - t0)
+    return statistics.median(samples) / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=60)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    print(f"median paint time per frame in microseconds, {args.frames} frames")
+    print(f"{'size':>10} {'legacy':>10} {'cached full':>12} {'dirty frame':>12} {'full blit':>10}")
+    for w, h in SIZES:
+        image = QImage(w, h, QImage.Format.Format_ARGB32_Premultiplied)
+
+        def legacy(i):
+            painter = QPainter(image)
+            legacy_paint(painter, w, h, i % 100, (i * 2) % 360)
+            painter.end()
+
+        widget = VisualsWidget()
+        widget.resize(w, h)
+        renderer = widget.renderer
+        renderer.resize(w, h, 1.0)
+        renderer.render(time.monotonic())  # builds the static layer once
+
+        def full(i):
+            renderer._back_ys = None  # as if the image held nothing useful
+            renderer.render(time.monotonic())
+
+        def dirty(i):
+            # One 60 FPS frame apart so the dirty region is realistic
+            renderer.render(widget._t0 + 1 + i / 60)
+
+        def blit(i):
+            widget.render(image)
+
+        print(f"{w}x{h:<5} {time_frames(legacy, args.frames):>10.0f} "
+              f"{time_frames(full, args.frames):>12.0f} {time_frames(dirty, args.frames):>12.0f} "
+              f"{time_frames(blit, args.frames):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import time
+
+# Scan codes roughly matching a US layout, enough for the scenarios we replay
+SCAN_CODES = {
+    'esc': 1, '1': 2, '2': 3, '3': 4, '4': 5, '5': 6, '6': 7, '7': 8, '8': 9, '9': 10, '0': 11,
+    'q': 16, 'w': 17, 'e': 18, 'r': 19, 't': 20, 'y': 21, 'u': 22, 'i': 23, 'o': 24, 'p': 25,
+    'a': 30, 's': 31, 'd': 32, 'f': 33, 'g': 34, 'h': 35, 'j': 36, 'k': 37, 'l': 38,
+    'z': 44, 'x': 45, 'c': 46, 'v': 47, 'b': 48, 'n': 49, 'm': 50, 'space': 57,
+    'ctrl': 29, 'shift': 42, 'right shift': 54, 'alt': 56, 'windows': 125,
+    'num 0': 82, 'num 1': 79, 'num 2': 80, 'num 3': 81, 'f13': 183,
+}
+
+
+class FakeKeyEvent:
+    def __init__(self, event_type, name, scan_code):
+        self.event_type = event_type
+        self.name = name
+        self.scan_code = scan_code
+        self.time = time.time()
+        self.is_keypad = name.startswith('num ')
+
+
+class FakeKeyboard:
+    """
+    Stand-in for the `keyboard` module: the calls PTTListener makes, plus feed()
+    to inject a synthetic key event as if the OS hook had fired. `codes` replaces
+    the built-in layout (name -> list of scan codes, as a session trace records it).
+    """
+
+    def __init__(self, codes=None):
+        self.codes = codes
+        self._hooks = []
+        self._key_hooks = {}
+        self._pressed = set()
+        self.suppressed = 0
+
+    # --- keyboard module API ---
+    def key_to_scan_codes(self, key):
+        if self.codes is not None:
+            codes = self.codes.get(key.strip().lower())
+            if not codes:
+                raise ValueError(f"Key {key!r} is not mapped to any known key.")
+            return tuple(codes)
+        code = SCAN_CODES.get(key.strip().lower())
+        if code is None:
+            raise ValueError(f"Key {key!r} is not mapped to any known key.")
+        return (code,)
+
+    def hook(self, callback, suppress=False):
+        self._hooks.append(callback)
+        return (None, callback)
+
+    def hook_key(self, key, callback, suppress=False):
+        code = self.key_to_scan_codes(key)[0]
+        self._key_hooks.setdefault(code, []).append(callback)
+        return (code, callback)
+
+    def unhook(self, handle):
+        code, callback = handle
+        if code is None:
+            self._hooks.remove(callback)
+        else:
+            self._key_hooks.get(code, []).remove(callback)
+
+    def is_pressed(self, key):
+        if isinstance(key, int):
+            return key in self._pressed
+        return self.key_to_scan_codes(key)[0] in self._pressed
+
+    # --- driver side ---
+    def feed(self, name, event_type):
+        return self.feed_code(SCAN_CODES[name], event_type, name)
+
+    def feed_code(self, code, event_type, name=''):
+        if event_type == 'down':
+            self._pressed.add(code)
+        else:
+            self._pressed.discard(code)
+        event = FakeKeyEvent(event_type, name, code)
+        # Same contract as keyboard's blocking hooks: a falsy return swallows the event
+        for callback in self._hooks + self._key_hooks.get(code, []):
+            if not callback(event):
+                self.suppressed += 1
+                return False
+        return True
+
+    def lose_up(self, name):
+        """The key comes up in the OS but the hook never hears of it (lock screen, UAC)."""
+        self._pressed.discard(SCAN_CODES[name])
+
+
+def install(module, codes=None):
+    """Swaps `module.keyboard` (e.g. key_listener) for a fresh FakeKeyboard."""
+    fake = FakeKeyboard(codes)
+    module.keyboard = fake
+    return fake
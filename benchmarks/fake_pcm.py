@@ -0,0 +1,46 @@
+import time
+import numpy as np
+
+
+class SyntheticStream:
+    """
+    Stand-in capture stream for LevelMeter: s16le mono PCM of a sine, white noise
+    or silence, from a precomputed one-second loop. With `realtime` set, reads are
+    paced like a real capture at `rate`; otherwise they return as fast as asked.
+    """
+
+    def __init__(self, signal='sine', amplitude=0.5, rate=16000, freq=440, realtime=False):
+        t = np.arange(rate) / rate
+        if signal == 'sine':
+            wave = amplitude * np.sin(2 * np.pi * freq * t)
+        elif signal == 'noise':
+            wave = np.random.default_rng(0).uniform(-amplitude, amplitude, rate)
+        else:
+            wave = np.zeros(rate)
+        self.data = (wave * 32767).astype('<i2').tobytes()
+        self.rate = rate
+        self.realtime = realtime
+        self.pos = 0
+        self.closed = False
+        self.bytes_read = 0
+        self._t0 = time.perf_counter()
+
+    def readinto(self, buffer):
+        if self.closed:
+            raise ValueError("read from closed stream")
+        n = min(len(buffer), len(self.data) - self.pos)
+        buffer[:n] = self.data[self.pos:self.pos + n]
+        self.pos = (self.pos + n) % len(self.data)
+        self.bytes_read += n
+        if self.realtime:
+            due = self._t0 + self.bytes_read / 2 / self.rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return n
+
+    def interrupt(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
@@ -0,0 +1,137 @@
+import time
+
+
+def spin(seconds):
+    # time.sleep() can't do sub-millisecond waits reliably, busy-wait instead
+    if seconds <= 0:
+        return
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class FakeSource:
+    def __init__(self, index, name, description, mute=False):
+        self.index = index
+        self.name = name
+        self.description = description
+        self.mute = mute
+
+
+class FakeSourceOutput:
+    """An application's capture stream."""
+    def __init__(self, index, source, proplist, mute=False):
+        self.index = index
+        self.source = source
+        self.proplist = proplist
+        self.mute = mute
+
+
+class FakeServerInfo:
+    def __init__(self, default_source_name):
+        self.default_source_name = default_source_name
+
+
+class FakeEvent:
+    def __init__(self, facility, t, index):
+        self.facility = facility
+        self.t = t
+        self.index = index
+
+
+class FakePulse:
+    """
+    In-process stand-in for pulsectl.Pulse.
+
+    Every call costs `call_latency` seconds (the socket round trip), and list calls
+    rebuild one object per entry the way pulsectl parses the server reply.
+    `wait` is how that latency is spent: spin() is precise but burns CPU, pass
+    time.sleep when measuring CPU time of our own code.
+    """
+
+    def __init__(self, source_count=5, call_latency=0.0002, wait=spin):
+        self.call_latency = call_latency
+        self.wait = wait
+        self.calls = 0
+        self._sources = [
+            FakeSource(i, f"alsa_input.fake_{i}", f"Fake Source {i}")
+            for i in range(source_count)
+        ]
+        self._by_index = {s.index: s for s in self._sources}
+        self._next_index = source_count  # the server never reuses an index
+        self.default_source_name = self._sources[0].name if self._sources else None
+        self._outputs = {}
+        self._next_output = 0  # stream indexes are counted separately from sources
+
+    def add_source(self, name, description):
+        """Plugs a source in; returns its index (new, like the server's)."""
+        index = self._next_index
+        self._next_index += 1
+        source = FakeSource(index, name, description)
+        self._sources.append(source)
+        self._by_index[index] = source
+        return index
+
+    def remove_source(self, index):
+        self._sources.remove(self._by_index.pop(index))
+
+    def add_source_output(self, app, binary=None, source=0):
+        """An application opens a capture stream; returns its index."""
+        index = self._next_output
+        self._next_output += 1
+        proplist = {'application.name': app, 'application.process.binary': binary or app.lower()}
+        self._outputs[index] = FakeSourceOutput(index, source, proplist)
+        return index
+
+    def remove_source_output(self, index):
+        del self._outputs[index]
+
+    def _call(self):
+        self.calls += 1
+        if self.call_latency > 0:
+            self.wait(self.call_latency)
+
+    def _copy(self, s):
+        return FakeSource(s.index, s.name, s.description, s.mute)
+
+    def source_list(self):
+        self._call()
+        return [self._copy(s) for s in self._sources]
+
+    def source_info(self, index):
+        self._call()
+        return self._copy(self._by_index[index])
+
+    def get_source_by_name(self, name):
+        self._call()
+        for s in self._sources:
+            if s.name == name:
+                return self._copy(s)
+        raise KeyError(name)
+
+    def server_info(self):
+        self._call()
+        return FakeServerInfo(self.default_source_name)
+
+    def source_mute(self, index, mute=True):
+        self._call()
+        self._by_index[index].mute = mute
+
+    def mute(self, obj, mute=True):
+        self.source_mute(obj.index, mute)
+        obj.mute = mute
+
+    def _copy_output(self, o):
+        return FakeSourceOutput(o.index, o.source, dict(o.proplist), o.mute)
+
+    def source_output_list(self):
+        self._call()
+        return [self._copy_output(o) for o in self._outputs.values()]
+
+    def source_output_info(self, index):
+        self._call()
+        return self._copy_output(self._outputs[index])
+
+    def source_output_mute(self, index, mute=True):
+        self._call()
+        self._outputs[index].mute = mute
@@ -0,0 +1,166 @@
+"""
+Replays a session trace (`main.py --trace FILE`) through the current code.
+
+The recorded key events are fed to a fresh PTTListener through a FakeKeyboard
+that uses the trace's own key codes, and mute a FakePulse through the real
+AudioController / LinuxAudioBackend, so two builds can be compared on the same
+real-world session. Bindings are replayed against the selected device: the
+recorded device ids and groups belong to the recording machine.
+
+Reports press-to-mute percentiles of the replay next to the signal and backend
+latencies recorded in the session.
+
+    python -m benchmarks.replay_trace TRACE [--speed 1] [--latency S] [--out results.json]
+    python -m benchmarks.replay_trace --synthesize TRACE [--presses N]
+
+--speed 1 keeps the recorded timing, 2 plays twice as fast, 0 back to back.
+--synthesize records a sample trace by driving the fake pipeline with trace on.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from benchmarks import fake_keyboard
+from benchmarks.bench_pipeline import Pipeline, percentiles
+import key_listener
+import session_trace
+from latency import now_ns
+from session_trace import KEY, SIGNAL, MUTE, META
+
+
+class Replay(Pipeline):
+    def __init__(self, latency):
+        super().__init__(sources=5, latency=latency)
+        self.samples = []
+        self.keys = 0
+        self.arms = 0
+
+    def arm(self, info):
+        self.listener.stop_listening()
+        self.keyboard = fake_keyboard.install(key_listener, info['key_codes'])
+        self.listener = self._fresh_listener()
+        bindings = [dict(b, device_id=None, group=None) for b in info['bindings']]
+        self.listener.start_listening(bindings)
+        self.arms += 1
+
+    def key(self, code, down):
+        before = self.toggles
+        self.done.clear()
+        t0 = time.monotonic_ns()
+        self.keyboard.feed_code(code, 'down' if down else 'up')
+        self.keys += 1
+        if self.toggles != before and self.done.wait(1.0):
+            self.samples.append(self.done_ns - t0)
+
+    def run(self, path, speed):
+        recorded = {'signal': [], 'backend': []}
+        start = time.perf_counter_ns()
+        for t, kind, flags, code, arg in session_trace.read_trace(path):
+            if kind == META:
+                self.arm(arg)
+            elif kind == KEY:
+                if speed > 0:
+                    delay = (start + t / speed - time.perf_counter_ns()) / 1e9
+                    if delay > 0:
+                        time.sleep(delay)
+                self.key(code, flags)
+            elif kind == SIGNAL:
+                recorded['signal'].append(arg)
+            elif kind == MUTE:
+                recorded['backend'].append(arg)
+        self.audio.worker.wait_idle()
+        self.listener.stop_listening()
+        return {
+            'keys': self.keys,
+            'arms': self.arms,
+            'toggles': self.toggles,
+            'replay_press_to_mute': percentiles(self.samples),
+            'recorded_signal': percentiles(recorded['signal']),
+            'recorded_backend': percentiles(recorded['backend']),
+            'hook': self.listener.hook_stats(),
+        }
+
+
+def synthesize(path, presses, latency):
+    """A few minutes of PTT compressed: taps, holds with auto-repeat and chords."""
+    rng = random.Random(1)
+    session_trace.start(path)
+    pipeline = Pipeline(sources=5, latency=latency)
+    # What MainWindow.on_binding_event adds to the trace
+    pipeline.listener.binding_event.connect(
+        lambda binding, is_down, stamp: session_trace.active.signal(binding.index, is_down, now_ns() - stamp))
+    pipeline.listener.start_listening([{'hotkey': 'num 0'}, {'hotkey': 'ctrl+alt+p', 'action': 'ptm'}])
+    feed = pipeline.keyboard.feed
+    for _ in range(presses):
+        if rng.random() < 0.7:
+            feed('num 0', 'down')
+            for _ in range(rng.randrange(0, 10)):
+                time.sleep(0.01)
+                feed('num 0', 'down')
+            time.sleep(rng.uniform(0.005, 0.02))
+            feed('num 0', 'up')
+        else:
+            for name in ('ctrl', 'alt', 'p'):
+                feed(name, 'down')
+            time.sleep(rng.uniform(0.005, 0.02))
+            for name in ('p', 'alt', 'ctrl'):
+                feed(name, 'up')
+        feed('a', 'down')  # typing in between: not bound, not recorded
+        feed('a', 'up')
+        time.sleep(rng.uniform(0.01, 0.05))
+    pipeline.audio.worker.wait_idle()
+    pipeline.listener.stop_listening()
+    pipeline.audio.shutdown()
+    session_trace.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('trace')
+    parser.add_argument('--speed', type=float, default=1.0, help="0 = as fast as possible")
+    parser.add_argument('--latency', type=float, default=0.0002, help="fake pulse round trip in seconds")
+    parser.add_argument('--out', help="write JSON here instead of stdout")
+    parser.add_argument('--synthesize', action='store_true', help="record a sample trace to TRACE instead")
+    parser.add_argument('--presses', type=int, default=100)
+    args = parser.parse_args()
+
+    if args.synthesize:
+        synthesize(args.trace, args.presses, args.latency)
+        info = session_trace.describe(args.trace)
+        print(f"{args.trace}: {info['keys']} keys, {info['signals']} signals, "
+              f"{info['mutes']} mutes over {info['duration_s']:.1f} s", file=sys.stderr)
+        return
+
+    replay = Replay(args.latency)
+    result = replay.run(args.trace, args.speed)
+    replay.audio.shutdown()
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'trace': args.trace,
+            'speed': args.speed,
+            'call_latency_s': args.latency,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'replay': result,
+    }
+    lat = result['replay_press_to_mute'] or {}
+    sig = result['recorded_signal'] or {}
+    print(f"{result['keys']} keys -> {result['toggles']} toggles  "
+          f"replay p50 {lat.get('p50_us', 0):.0f}us p99 {lat.get('p99_us', 0):.0f}us  "
+          f"recorded signal p50 {sig.get('p50_us', 0):.0f}us p99 {sig.get('p99_us', 0):.0f}us",
+          file=sys.stderr)
+    text = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import os
+import sys
+import atexit
+import logging
+import threading
+import queue
+from collections import deque
+
+# Logging for the app: emitters only put the record on a queue (no I/O on the
+# GUI, hook or audio threads), a listener thread writes it to size-rotated files.
+# The last RING_SIZE records are also kept in memory, so they can be dumped on
+# demand or next to a crash even when the file is behind or unwritable.
+LOG_PATH = os.path.expanduser("~/.phantom_ptt_debug.log")
+DUMP_PATH = os.path.expanduser("~/.phantom_ptt_recent.log")
+MAX_BYTES = 1024 * 1024
+BACKUPS = 3
+RING_SIZE = 500
+FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_formatter = logging.Formatter(FORMAT)
+
+_writer = None
+_records = None
+_ring = None
+
+
+class _Enqueue(logging.Handler):
+    """
+    Hands records to the writer thread. Unlike logging.handlers.QueueHandler it
+    doesn't format and copy each record: merging the message and rendering the
+    traceback in place is all the writer needs (the args can't change under it
+    and the frames aren't kept alive).
+    """
+
+    def __init__(self, records):
+        super().__init__()
+        self.records = records
+
+    def emit(self, record):
+        try:
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info:
+                if not record.exc_text:
+                    record.exc_text = _formatter.formatException(record.exc_info)
+                record.exc_info = None
+            self.records.put(record)
+        except Exception:
+            self.handleError(record)
+
+
+class RingHandler(logging.Handler):
+    """Keeps the last `size` records; formatting waits until a dump."""
+
+    def __init__(self, size=RING_SIZE):
+        super().__init__()
+        self.records = deque(maxlen=size)
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def lines(self):
+        return [self.format(r) for r in list(self.records)]
+
+
+def setup(path=LOG_PATH, level=logging.INFO, ring_size=RING_SIZE):
+    """Installs the queue handler on the root logger; later calls only change the level."""
+    global _writer, _records, _ring
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _writer is not None:
+        return
+    _ring = RingHandler(ring_size)
+    _ring.setFormatter(_formatter)
+    _records = queue.SimpleQueue()
+    _writer = threading.Thread(target=_write_loop, args=(_records, path), name="log-writer", daemon=True)
+    _writer.start()
+    # The ring sits on the emitting side so a dump sees records the writer hasn't reached
+    root.handlers = [_Enqueue(_records), _ring]
+
+    # PyQt aborts on an exception in a slot only while the hook is the default
+    # one; _on_crash keeps that, it just logs first
+    sys.excepthook = _on_crash(sys.excepthook)
+    threading.excepthook = _on_thread_crash(threading.excepthook)
+    atexit.register(shutdown)
+
+def set_level(name):
+    """Level from the config ("DEBUG", "INFO", ...); unknown names are ignored."""
+    level = logging.getLevelName(str(name).upper())
+    if isinstance(level, int):
+        logging.getLogger().setLevel(level)
+
+def dump_recent(path=DUMP_PATH):
+    """Writes the in-memory records to `path`; returns the path, or None if there is no ring."""
+    if _ring is None:
+        return None
+    with open(path, 'w') as f:
+        f.write("\n".join(_ring.lines()) + "\n")
+    return path
+
+def shutdown():
+    """Writes out whatever is still queued and stops the writer thread."""
+    global _writer
+    writer, _writer = _writer, None
+    if writer is not None:
+        _records.put(None)
+        writer.join()
+
+def _write_loop(records, path):
+    # logging.handlers pulls in socket and pickle; import it here, off the startup path
+    from logging.handlers import RotatingFileHandler
+    try:
+        handler = RotatingFileHandler(path, maxBytes=MAX_BYTES, backupCount=BACKUPS, delay=True)
+        handler.setFormatter(_formatter)
+    except OSError as e:
+        print(f"Logging to {path} failed: {e}")
+        handler = None
+    while True:
+        record = records.get()
+        if record is None:
+            break
+        if handler is not None:
+            handler.handle(record)
+    if handler is not None:
+        handler.close()
+
+def _on_crash(previous):
+    def hook(exc_type, exc, tb):
+        if issubclass(exc_type, (KeyboardInterrupt, SystemExit)):
+            # Ctrl+C landing in a slot: not a crash, but the app still has to stop
+            previous(exc_type, exc, tb)
+            _quit_app()
+            return
+        logging.critical("Unhandled exception", exc_info=(exc_type, exc, tb))
+        _dump_quietly()
+        previous(exc_type, exc, tb)
+        if _qt_app() is not None:
+            # What PyQt does itself with the default hook: a slot that raised
+            # leaves the app half-updated, so don't carry on
+            shutdown()
+            os.abort()
+    return hook
+
+def _qt_app():
+    # Only if Qt is already loaded; the hook must not pull it in
+    qt = sys.modules.get("PyQt6.QtCore")
+    return qt.QCoreApplication.instance() if qt is not None else None
+
+def _quit_app():
+    app = _qt_app()
+    if app is not None:
+        app.quit()
+
+def _on_thread_crash(previous):
+    def hook(args):
+        logging.critical("Unhandled exception in thread %s", args.thread.name if args.thread else '?',
+                         exc_info=(args.exc_type, args.exc_value, args.exc_traceback))
+        _dump_quietly()
+        previous(args)
+    return hook
+
+def _dump_quietly():
+    try:
+        dump_recent()
+    except OSError:
+        pass
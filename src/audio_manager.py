@@ -1,48 +1,405 @@
 import sys
+import shutil
 import platform
+import logging
+import threading
+from collections import deque
+from latency import now_ns, recorder
+from device_registry import DeviceRegistry
+import session_trace
+
+# How long shutdown() waits for the worker to apply the last mutes
+SHUTDOWN_TIMEOUT = 1.0
+
+class MuteWorker:
+    """
+    Single background thread that applies mute commands for AudioController.
+
+    Commands go into a mailbox with one slot per target device: a newer command
+    overwrites one that has not been picked up yet, so only the latest desired state
+    reaches the backend and a burst of taps costs a handful of backend calls instead
+    of one per edge.
+
+    Other backend work (device enumeration, switching devices) can be queued with
+    call(); tasks run in order, one at a time, and pending mutes always go first:
+    a press during a slow enumeration waits for at most the task in progress.
+
+    prearm() leaves one more slot: targets a press is probably about to mute, for
+    prearm_fn to get ready. It runs after any pending mutes, and a newer prearm()
+    replaces it, so an abandoned chord costs nothing once cancelled.
+    """
+
+    def __init__(self, apply_fn, on_done=None, thread_init=None, prearm_fn=None):
+        self.apply_fn = apply_fn
+        self.on_done = on_done
+        self.thread_init = thread_init
+        self.prearm_fn = prearm_fn
+        self._cond = threading.Condition()
+        # device_id -> (is_muted, stamp_ns, queued_ns); None is the selected device
+        self._pending = {}
+        # (fn, callback) jobs from call()
+        self._tasks = deque()
+        # Targets to pre-arm, not picked up yet; and the ones pre-armed for the
+        # next press, for the hit counts
+        self._prearm = None
+        self._armed = ()
+        self._busy = False
+        self._running = True
+        # Counters, read without the lock (good enough for stats)
+        self.submitted = 0
+        self.coalesced = 0
+        self.applied = 0
+        self.prearms = 0
+        self.prearm_hits = 0
+        self.prearm_cancels = 0
+        self._thread = threading.Thread(target=self._run, name="audio-mute", daemon=True)
+        self._thread.start()
+
+    def submit(self, is_muted, stamp_ns=None, device_id=None):
+        # stamp_ns: when the key event that caused this was seen, for latency stats
+        with self._cond:
+            if device_id in self._pending:
+                self.coalesced += 1
+            if self._armed and device_id in self._armed:
+                self.prearm_hits += 1
+                self._armed = ()
+            self._pending[device_id] = (is_muted, stamp_ns, now_ns())
+            self.submitted += 1
+            self._cond.notify_all()
+
+    def prearm(self, targets):
+        """Targets the next press will likely mute; empty cancels. Cheap, any thread."""
+        targets = tuple(targets)
+        with self._cond:
+            if self._armed:
+                self.prearm_cancels += 1
+            self._armed = targets
+            self._prearm = targets or None
+            if targets:
+                self.prearms += 1
+                self._cond.notify_all()
+
+    def call(self, fn, callback=None):
+        """Runs fn() on the worker thread; callback(result, error) is called from there too."""
+        with self._cond:
+            self._tasks.append((fn, callback))
+            self._cond.notify_all()
+
+    def wait_idle(self, timeout=None):
+        """Blocks until every submitted command has been applied."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._pending and not self._tasks and not self._busy, timeout)
+
+    def _apply(self, device_id, is_muted, stamp_ns, queued_ns):
+        error = None
+        results = None
+        start = now_ns()
+        try:
+            results = self.apply_fn(is_muted, device_id)
+        except Exception as e:
+            error = str(e)
+            logging.error("set_mute(%s, %s) failed: %s", is_muted, device_id, e)
+        if results:
+            # Group mute: per-source outcome, surface the failures as the error
+            failed = {d: err for d, err in results.items() if err}
+            if failed:
+                error = ", ".join(f"{d}: {err}" for d, err in failed.items())
+                logging.error("Group set_mute(%s) failed for %s", is_muted, error)
+        end = now_ns()
+        self.applied += 1
+
+        recorder.record('queue', start - queued_ns)
+        recorder.record('backend', end - start)
+        trace = session_trace.active
+        if trace is not None:
+            target = 0 if device_id is None else (len(device_id) if isinstance(device_id, tuple) else 1)
+            trace.mute(target, is_muted, error is not None, end - start)
+        if stamp_ns is not None:
+            recorder.record('total', end - stamp_ns)
+
+        if self.on_done:
+            try:
+                self.on_done(is_muted, error, results)
+            except Exception as e:
+                logging.error("Mute completion callback failed: %s", e)
+
+    def _run_task(self, fn, callback):
+        result = error = None
+        try:
+            result = fn()
+        except Exception as e:
+            error = str(e)
+            logging.error("Audio task failed: %s", e, exc_info=True)
+        if callback:
+            try:
+                callback(result, error)
+            except Exception as e:
+                logging.error("Audio task callback failed: %s", e)
+
+    def stop(self):
+        """Mutes already submitted are still applied; tasks and a pre-arm are dropped."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def join(self, timeout=None):
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _run(self):
+        if self.thread_init:
+            try:
+                self.thread_init()
+            except Exception as e:
+                logging.error("Audio worker init failed: %s", e)
+
+        while True:
+            with self._cond:
+                while not self._pending and not self._tasks and not self._prearm and self._running:
+                    self._cond.wait()
+                running = self._running
+                batch, self._pending = self._pending, {}
+                prearm, self._prearm = self._prearm, None
+                # One task per round, and only with no mute or pre-arm waiting;
+                # the next round checks for new ones first
+                task = self._tasks.popleft() if self._tasks and not batch and not prearm else None
+                if not running:
+                    # Quitting: a release queued just now must still reach the mic
+                    prearm = task = None
+                self._busy = True
+
+            for device_id, (is_muted, stamp_ns, queued_ns) in batch.items():
+                self._apply(device_id, is_muted, stamp_ns, queued_ns)
+
+            if prearm:
+                # A press already applied makes the pre-arm moot for its target
+                prearm = tuple(t for t in prearm if t not in batch)
+            if prearm and self.prearm_fn:
+                try:
+                    self.prearm_fn(prearm)
+                except Exception as e:
+                    logging.error("Pre-arm of %s failed: %s", prearm, e)
+
+            if task:
+                self._run_task(*task)
+
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+            if not running:
+                return
+
+def _flatten(targets):
+    # set_mute targets (a device id, None or a group tuple) -> device ids, once each
+    ids = []
+    for target in targets:
+        for device_id in (target if isinstance(target, tuple) else (target,)):
+            if device_id not in ids:
+                ids.append(device_id)
+    return ids
 
 class AudioController:
-    def __init__(self):
+    def __init__(self, on_mute_done=None, backend=None, mute_apps=None):
         self.os_type = platform.system().lower()
-        self.backend = None
-        
+        # An explicit backend skips platform detection (benchmarks, stand-ins)
+        self.backend = backend
+        # Applications whose capture streams to mute instead of the device (Linux)
+        self.mute_apps = mute_apps
+        # Backend clients (pulsectl, COM) are not thread safe; the mute worker and
+        # the GUI-thread calls below take turns through this lock.
+        self._lock = threading.Lock()
+        # Set once the worker has built the backend (or failed to)
+        self.ready = threading.Event()
+        # Filled by get_input_devices / refresh_devices, kept current by backends
+        # that report hot-plug events
+        self.devices = DeviceRegistry()
+
+        # The backend is created on the worker thread, so connecting to the sound
+        # server never holds up startup. Sync calls below wait for it; the GUI uses
+        # the *_async variants instead.
+        # on_mute_done(is_muted, error, results) is called from the worker thread;
+        # results is {device_id: error or None} for group mutes, else None
+        self.worker = MuteWorker(self._apply_mute, on_mute_done, self._init_backend, self._prearm)
+
+    def _init_backend(self):
+        try:
+            if self.backend is None:
+                self.backend = self._create_backend()
+            if self.backend:
+                recorder.backend = type(self.backend).__name__
+                thread_init = getattr(self.backend, 'thread_init', None)
+                if thread_init:
+                    thread_init()
+                watch = getattr(self.backend, 'watch_devices', None)
+                if watch:
+                    watch(self.devices)
+                if hasattr(self.backend, 'on_drift'):
+                    self.backend.on_drift = self._on_drift
+        except Exception as e:
+            logging.error("Audio backend failed to start: %s", e, exc_info=True)
+        finally:
+            self.ready.set()
+
+    def _create_backend(self):
+        if self.mute_apps and "linux" not in self.os_type:
+            logging.warning("mute_apps only works on Linux, muting the device instead")
         if "windows" in self.os_type:
-            self.backend = WindowsAudioBackend()
+            return WindowsAudioBackend()
         elif "linux" in self.os_type:
-            self.backend = LinuxAudioBackend()
+            if self.mute_apps:
+                return LinuxAudioBackend(mute_apps=self.mute_apps)
+            return LinuxAudioBackend()
         elif "darwin" in self.os_type: # macOS
-            self.backend = MacAudioBackend()
-        else:
-            print(f"Unsupported OS: {self.os_type}")
+            return MacAudioBackend()
+        print(f"Unsupported OS: {self.os_type}")
+        return None
+
+    def _backend(self):
+        self.ready.wait()
+        return self.backend
+
+    def run_async(self, fn, callback=None):
+        """Runs fn(backend) on the audio worker; callback(result, error) from that thread."""
+        def task():
+            backend = self._backend()
+            if backend is None:
+                raise RuntimeError("No Backend")
+            with self._lock:
+                return fn(backend)
+        self.worker.call(task, callback)
+
+    def get_input_devices_async(self, callback):
+        self.run_async(lambda backend: backend.get_input_devices(), callback)
+
+    def refresh_devices(self, callback=None):
+        """Full enumeration on the worker into `devices`; callback(devices, error)."""
+        def done(devices, error):
+            if error is None:
+                self.devices.replace(devices)
+            if callback:
+                callback(devices, error)
+        self.run_async(lambda backend: backend.get_input_devices(), done)
+
+    def set_device_async(self, device_id, callback):
+        self.run_async(lambda backend: backend.set_device(device_id), callback)
 
     def get_input_devices(self):
-        if self.backend:
-            return self.backend.get_input_devices()
+        if self._backend():
+            with self._lock:
+                devices = self.backend.get_input_devices()
+            self.devices.replace(devices)
+            return devices
         return []
 
     def load_default_device(self):
-        if self.backend:
-            return self.backend.load_default_device()
+        if self._backend():
+            with self._lock:
+                return self.backend.load_default_device()
         return False, "No Backend"
 
     def set_device(self, device_id):
-        if self.backend:
-            return self.backend.set_device(device_id)
+        if self._backend():
+            with self._lock:
+                return self.backend.set_device(device_id)
         return False, "No Backend"
         
-    def set_mute(self, is_muted):
-        if self.backend:
-            self.backend.set_mute(is_muted)
+    def set_mute(self, is_muted, stamp_ns=None, device_id=None):
+        # Non-blocking: the worker applies the newest requested state per device.
+        # device_id None means the device picked with set_device(), a tuple of ids
+        # is a group muted in one go.
+        if self.worker:
+            self.worker.submit(is_muted, stamp_ns, device_id)
+
+    def prearm(self, targets):
+        """
+        A chord's modifiers are held: the worker gets these targets (as set_mute
+        takes them) ready, so the trigger press only has to issue the mute. An
+        empty list cancels. Cheap enough for the hook thread.
+        """
+        self.worker.prearm(targets)
+
+    def _prearm(self, targets):
+        prearm = getattr(self.backend, 'prearm', None)
+        if prearm is None:
+            return
+        with self._lock:
+            prearm(targets)
+
+    def prepare_group(self, device_ids):
+        # Queued on the worker, the backend may not be up yet
+        device_ids = tuple(device_ids)
+        def prepare(backend):
+            if hasattr(backend, 'prepare_group'):
+                backend.prepare_group(device_ids)
+        self.run_async(prepare)
+
+    def _apply_mute(self, is_muted, device_id=None):
+        if self.backend is None:
+            return None
+        with self._lock:
+            if not isinstance(device_id, tuple):
+                return self.backend.set_mute(is_muted, device_id)
+            group_mute = getattr(self.backend, 'set_mute_group', None)
+            if group_mute:
+                return group_mute(device_id, is_muted)
+            # Backends without a fan-out path just go one by one
+            results = {}
+            for d in device_id:
+                try:
+                    self.backend.set_mute(is_muted, d)
+                    results[d] = None
+                except Exception as e:
+                    results[d] = str(e)
+            return results
 
     def is_muted(self):
-        if self.backend:
-            return self.backend.is_muted()
+        if self._backend():
+            with self._lock:
+                return self.backend.is_muted()
         return False
 
+    def level_stream(self, device_id):
+        """Opener for a PCM capture of the device, for LevelMeter; None if the backend has none."""
+        opener = getattr(self.backend, 'level_stream', None)
+        return opener(device_id) if opener else None
+
+    def _on_drift(self, device_ids):
+        # From the backend's event thread. The fix-up goes through the worker so it
+        # can't interleave with a mute we are applying at the same time.
+        self.run_async(lambda backend: backend.reconcile(device_ids))
+
+    def mute_stats(self):
+        stats = {
+            'submitted': self.worker.submitted,
+            'coalesced': self.worker.coalesced,
+            'applied': self.worker.applied,
+        }
+        if self.worker.prearms:
+            stats.update(prearms=self.worker.prearms, prearm_hits=self.worker.prearm_hits,
+                         prearm_cancels=self.worker.prearm_cancels)
+        backend_stats = getattr(self.backend, 'mute_stats', None)
+        if backend_stats:
+            stats.update(backend_stats())
+        return stats
+
+    def shutdown(self):
+        self.worker.stop()
+        # Let it apply the last mutes before the backend goes
+        self.worker.join(SHUTDOWN_TIMEOUT)
+        close = getattr(self.backend, 'close', None)
+        if close:
+            close()
+
 # --- Windows Backend ---
 class WindowsAudioBackend:
     def __init__(self):
         self.interface = None
+        self.volume = None
+        # Id of the selected endpoint, so a dead `volume` can be activated again
+        self.device_id = None
+        # Endpoints activated for bindings that target a device other than the selected one
+        self._volumes = {}
         try:
             from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
             from comtypes import CLSCTX_ALL
@@ -52,6 +409,11 @@ class WindowsAudioBackend:
         except ImportError:
             print("Pycaw/Comtypes not found.")
 
+    def thread_init(self):
+        # COM has to be initialised on every thread that touches the endpoint
+        import comtypes
+        comtypes.CoInitialize()
+
     def get_input_devices(self):
         results = []
         try:
@@ -96,59 +458,100 @@ class WindowsAudioBackend:
         return self.set_device('default')
 
     def set_device(self, device_id):
-        import logging
         try:
-            if device_id == 'default':
-                # GetMicrophone() gets the default capture device
-                device = self.AudioUtilities.GetMicrophone()
-            else:
-                # Find by ID
-                devices = self.AudioUtilities.GetAllDevices()
-                device = next((d for d in devices if d.id == device_id), None)
-                
-            if not device:
+            self.volume = self._activate(device_id)
+            if not self.volume:
                 return False, "Device not found"
+            self.device_id = device_id
+            return True, "Device Loaded"
+        except Exception as e:
+            logging.error("WinLoadErr Detail: %s", e, exc_info=True)
+            return False, f"WinLoadErr: {e}"
+
+    def _activate(self, device_id):
+        if device_id == 'default':
+            # GetMicrophone() gets the default capture device
+            device = self.AudioUtilities.GetMicrophone()
+        else:
+            # Find by ID
+            devices = self.AudioUtilities.GetAllDevices()
+            device = next((d for d in devices if d.id == device_id), None)
             
-            # Try to activate
-            # ERROR HANDLING: user reported 'AudioDevice' has no Activate
-            try:
-                # OPTION 1: Explicit Activate (Standard Pycaw)
-                self.interface = device.Activate(
+        if not device:
+            return None
+        
+        # Try to activate
+        # ERROR HANDLING: user reported 'AudioDevice' has no Activate
+        try:
+            # OPTION 1: Explicit Activate (Standard Pycaw)
+            interface = device.Activate(
+                self.IAudioEndpointVolume._iid_, self.CLSCTX_ALL, None)
+        except AttributeError as ae:
+            logging.error("Device Activate Error: %s. Properties: %s", ae, dir(device))
+            
+            # OPTION 2: Use existing EndpointVolume if available (Pycaw wrapper often initializes it)
+            if hasattr(device, 'EndpointVolume'):
+                logging.info("Using device.EndpointVolume directly")
+                # This is likely the IAudioEndpointVolume pointer already
+                interface = device.EndpointVolume
+            
+            # OPTION 3: Access underlying COM object _dev
+            elif hasattr(device, '_dev'):
+                 logging.info("Attempting activation on raw _dev")
+                 interface = device._dev.Activate(
                     self.IAudioEndpointVolume._iid_, self.CLSCTX_ALL, None)
-            except AttributeError as ae:
-                logging.error(f"Device Activate Error: {ae}. Properties: {dir(device)}")
-                
-                # OPTION 2: Use existing EndpointVolume if available (Pycaw wrapper often initializes it)
-                if hasattr(device, 'EndpointVolume'):
-                    logging.info("Using device.EndpointVolume directly")
-                    # This is likely the IAudioEndpointVolume pointer already
-                    self.interface = device.EndpointVolume
-                
-                # OPTION 3: Access underlying COM object _dev
-                elif hasattr(device, '_dev'):
-                     logging.info("Attempting activation on raw _dev")
-                     self.interface = device._dev.Activate(
-                        self.IAudioEndpointVolume._iid_, self.CLSCTX_ALL, None)
-                else:
-                    raise ae
+            else:
+                raise ae
+
+        # Cast using comtypes native
+        import comtypes
+        try:
+            return interface.QueryInterface(self.IAudioEndpointVolume)
+        except Exception:
+            # If it's already the interface (Option 2), query might fail or be redundant.
+            # If interface is already the object, just use it.
+            return interface
+
+    def _volume_for(self, device_id):
+        if device_id is None:
+            return self.volume
+        volume = self._volumes.get(device_id)
+        if volume is None:
+            volume = self._volumes[device_id] = self._activate(device_id)
+        return volume
 
-            # Cast using comtypes native
-            import comtypes
+    def set_mute(self, is_muted, device_id=None):
+        volume = self._volume_for(device_id)
+        if volume:
+            volume.SetMute(1 if is_muted else 0, None)
+
+    def prearm(self, targets):
+        # Activate the endpoints now and touch them, so a dead one is replaced
+        # before the press rather than failing it
+        for device_id in _flatten(targets):
             try:
-                self.volume = self.interface.QueryInterface(self.IAudioEndpointVolume)
-            except Exception:
-                # If it's already the interface (Option 2), query might fail or be redundant.
-                # If self.interface is already the object, just use it.
-                self.volume = self.interface
-            
-            return True, "Device Loaded"
-        except Exception as e:
-            logging.error(f"WinLoadErr Detail: {e}", exc_info=True)
-            return False, f"WinLoadErr: {e}"
+                volume = self._volume_for(device_id)
+                if volume:
+                    volume.GetMute()
+            except Exception as e:
+                logging.error("Pre-arm of endpoint %s failed (%s), re-activating",
+                              device_id if device_id is not None else self.device_id, e)
+                self._reactivate(device_id)
 
-    def set_mute(self, is_muted):
-        if self.volume:
-            self.volume.SetMute(1 if is_muted else 0, None)
+    def _reactivate(self, device_id):
+        # The selected endpoint keeps its old handle if it can't be activated
+        # again: set_mute has nothing else to use. Others are retried on the press.
+        try:
+            if device_id is None:
+                if self.device_id is not None:
+                    self.volume = self._activate(self.device_id) or self.volume
+            else:
+                self._volumes[device_id] = self._activate(device_id)
+        except Exception as e:
+            logging.error("Re-activating endpoint %s failed: %s",
+                          device_id if device_id is not None else self.device_id, e)
+            if device_id is not None:
+                self._volumes.pop(device_id, None)
     
     def is_muted(self):
         if self.volume:
@@ -157,22 +560,68 @@ class WindowsAudioBackend:
 
 # --- Linux Backend ---
 class LinuxAudioBackend:
-    def __init__(self):
-        self.pulse = None
+    def __init__(self, pulse=None, connect=None, mute_apps=None):
+        # `pulse` lets benchmarks pass a stand-in client; normally we open our own.
+        # `connect` opens extra connections for group fan-out.
+        # `mute_apps` switches to muting only those applications' capture streams;
+        # device ids and groups are ignored then.
+        self.pulse = pulse
+        self.connect = connect
         self.sink_source = None
-        try:
-            import pulsectl
-            self.pulse = pulsectl.Pulse('phantom-ptt')
-        except ImportError:
-            print("pulsectl not installed. Install with `pip install pulsectl`")
+        self.fanout = None
+        self.registry = None
+        # device id -> mute state we last asked for. The cached handles below carry
+        # the server's state, so a mute that changes nothing is skipped, and a change
+        # event that disagrees with this is someone else touching the mic.
+        self._desired = {}
+        # on_drift(device_ids) is called from the event thread when that happens;
+        # AudioController queues reconcile() for them on its worker
+        self.on_drift = None
+        self.mute_issued = 0
+        self.mute_skipped = 0
+        self.drift_corrections = 0
+        # device id -> resolved source handle for set_mute. Kept fresh by the event
+        # watcher so a PTT press never has to walk source_list().
+        self._sources = {}
+        self.streams = None
+        if mute_apps:
+            from pulse_streams import CaptureStreams
+            self.streams = CaptureStreams(mute_apps)
+        self.events = None
+        if self.pulse is None:
+            try:
+                import pulsectl
+                self.pulse = pulsectl.Pulse('phantom-ptt')
+                self.connect = lambda: pulsectl.Pulse('phantom-ptt-fanout')
+            except ImportError:
+                print("pulsectl not installed. Install with `pip install pulsectl`")
+                return
+
+            from pulse_events import PulseEventWatcher
+            facilities = ('source', 'server') + (('source_output',) if self.streams else ())
+            self.events = PulseEventWatcher(facilities)
+            self.events.add_handler(self._on_pulse_event)
+            self.events.start()
+        if self.streams is not None:
+            # After the watcher is up, so no stream opened meanwhile is missed
+            self.streams.load(self.pulse)
+            logging.info("Muting capture streams of %s: %s", sorted(self.streams.apps), self.streams.summary())
 
     def get_input_devices(self):
         if not self.pulse: return []
         results = []
         for source in self.pulse.source_list():
-            results.append({'id': source.index, 'name': source.description})
+            results.append(self._device(source))
         return results
 
+    def _device(self, source):
+        # The index is what the server hands out this session; the name is stable
+        return {'id': source.index, 'name': source.description, 'key': source.name}
+
+    def watch_devices(self, registry):
+        """Source add/remove/change events go straight into `registry`, no rescans."""
+        self.registry = registry
+
     def load_default_device(self):
         if not self.pulse: return False, "No PulseAudio"
         # Pick the server default?
@@ -180,27 +629,223 @@ class LinuxAudioBackend:
 
     def set_device(self, device_id):
         if not self.pulse: return False, "No PulseAudio"
-        # We store the ID to mute later
+        # We store the ID and resolve the source once, set_mute reuses the handle
         self.sink_source = device_id
+        if self._resolve_source(device_id) is None:
+            return False, f"Linux Device {device_id} not found"
         return True, f"Linux Device {device_id}"
 
-    def set_mute(self, is_muted):
-        if self.pulse and self.sink_source is not None:
-             # Find source by ID and mute
-             # This is a bit slow to do every keypress (searching list), but okay for Python
-             # Optimization: Store source object?
-             for s in self.pulse.source_list():
-                 if s.index == self.sink_source or self.sink_source == 'default':
-                      self.pulse.mute(s, is_muted)
-                      break
+    def _lookup_source(self, pulse, device_id):
+        if device_id == 'default':
+            # The server's real default, not the '@DEFAULT_SOURCE@' alias
+            return pulse.get_source_by_name(pulse.server_info().default_source_name)
+        if isinstance(device_id, str):
+            # Stable source name, e.g. from a group in the config
+            return pulse.get_source_by_name(device_id)
+        return pulse.source_info(device_id)
+
+    def _resolve_source(self, device_id, pulse=None):
+        try:
+            source = self._sources[device_id] = self._lookup_source(pulse or self.pulse, device_id)
+            return source
+        except Exception as e:
+            logging.error("Could not resolve source %s: %s", device_id, e)
+            self._sources.pop(device_id, None)
+            return None
+
+    def _on_pulse_event(self, pulse, ev):
+        # Runs on the watcher thread with the watcher's own connection
+        if ev.facility == 'source_output':
+            if self.streams is not None:
+                self.streams.apply_event(pulse, ev)
+        elif ev.facility == 'server':
+            # Default source may have been switched
+            if 'default' in self._sources:
+                self._sources['default'] = self._lookup_source(pulse, 'default')
+        elif ev.facility == 'source':
+            source = None if ev.t == 'remove' else pulse.source_info(ev.index)
+            drifted = []
+            for device_id, cached in list(self._sources.items()):
+                if cached.index != ev.index:
+                    continue
+                if source is None:
+                    self._sources.pop(device_id, None)
+                else:
+                    self._sources[device_id] = source
+                    desired = self._desired.get(device_id)
+                    if desired is not None and bool(source.mute) != desired:
+                        drifted.append(device_id)
+            if drifted and self.on_drift:
+                self.on_drift(drifted)
+            if self.registry is not None:
+                if source is None:
+                    self.registry.remove(ev.index)
+                else:
+                    self.registry.add(self._device(source))
+
+    def set_mute(self, is_muted, device_id=None):
+        if self.streams is not None:
+            if self.pulse:
+                self.streams.mute(self.pulse, is_muted)
+            return
+        if device_id is None:
+            device_id = self.sink_source
+        if not self.pulse or device_id is None:
+            return
+        source = self._sources.get(device_id) or self._resolve_source(device_id)
+        if source is None:
+            return
+        self._desired[device_id] = is_muted
+        if bool(source.mute) == is_muted:
+            self.mute_skipped += 1
+            return
+        try:
+            self.pulse.source_mute(source.index, is_muted)
+        except Exception as e:
+            # Handle went stale before the remove event arrived; resolve once and retry
+            logging.info("Cached source %s failed (%s), re-resolving", source.index, e)
+            source = self._resolve_source(device_id)
+            if source is None:
+                return
+            self.pulse.source_mute(source.index, is_muted)
+        source.mute = is_muted
+        self.mute_issued += 1
+
+    def prearm(self, targets):
+        """
+        Re-reads the targets' sources: the connection is proven alive, the handle
+        is current (a stale one would fail the press and cost a re-resolve) and
+        so is the mute state the skip check compares against.
+        """
+        if not self.pulse or self.streams is not None:
+            return  # the stream index is kept current by events already
+        for target in targets:
+            if isinstance(target, tuple) and len(target) > 1:
+                if self.fanout is None or self.fanout.size < len(target) - 1:
+                    self.prepare_group(target)
+        for device_id in _flatten(targets):
+            if device_id is None:
+                device_id = self.sink_source
+            if device_id is not None:
+                self._resolve_source(device_id)
+
+    def prepare_group(self, device_ids):
+        """Resolves the group's sources and opens the fan-out connections up front."""
+        needed = len(device_ids) - 1
+        if self.connect and needed > 0 and (self.fanout is None or self.fanout.size < needed):
+            from pulse_fanout import PulseFanout
+            if self.fanout:
+                self.fanout.stop()
+            self.fanout = PulseFanout(self.connect, needed)
+        for device_id in device_ids:
+            if device_id not in self._sources:
+                self._resolve_source(device_id)
+
+    def _mute_on(self, pulse, device_id, is_muted):
+        # Runs on the fan-out threads too: touches only its own source, and
+        # returns whether it issued a call for set_mute_group to count
+        source = self._sources.get(device_id) or self._resolve_source(device_id, pulse)
+        if source is None:
+            raise LookupError(f"source {device_id} not found")
+        if bool(source.mute) == is_muted:
+            return False
+        pulse.source_mute(source.index, is_muted)
+        source.mute = is_muted
+        return True
+
+    def set_mute_group(self, device_ids, is_muted):
+        """
+        Mutes several sources at once. The first goes out on our own connection while
+        the rest run on the fan-out threads, so the group costs about one round trip.
+        Returns {device_id: None or error string}.
+        """
+        if not self.pulse:
+            return {device_id: "No PulseAudio" for device_id in device_ids}
+        if self.streams is not None:
+            self.set_mute(is_muted)  # apps, not sources
+            return {device_id: None for device_id in device_ids}
+        if len(device_ids) > 1 and (self.fanout is None or self.fanout.size < len(device_ids) - 1):
+            self.prepare_group(device_ids)
+        # Here, before any of it goes out: a change event racing the mutes is
+        # compared against the new state
+        for device_id in device_ids:
+            self._desired[device_id] = is_muted
+
+        futures = []
+        if self.fanout:
+            futures = [(d, self.fanout.submit(self._mute_on, d, is_muted)) for d in device_ids[1:]]
+        else:
+            futures = [(d, None) for d in device_ids[1:]]
+
+        results = {}
+        for device_id, future in [(device_ids[0], None)] + futures:
+            try:
+                if future is None:
+                    issued = self._mute_on(self.pulse, device_id, is_muted)
+                else:
+                    issued = future.result()
+            except Exception as e:
+                results[device_id] = str(e)
+                continue
+            # Counted here, on the caller's thread, not on the fan-out threads
+            if issued:
+                self.mute_issued += 1
+            else:
+                self.mute_skipped += 1
+            results[device_id] = None
+        return results
+
+    def level_stream(self, device_id):
+        if shutil.which('parec') is None:
+            return None
+        def open_stream():
+            # Runs on the meter's thread, numpy comes in with level_meter
+            from level_meter import ParecStream
+            return ParecStream(device_id)
+        return open_stream
+
+    def reconcile(self, device_ids):
+        """Re-reads the sources and puts back the mute state we last asked for."""
+        for device_id in device_ids:
+            desired = self._desired.get(device_id)
+            if desired is None:
+                continue
+            source = self._resolve_source(device_id)
+            if source is None or bool(source.mute) == desired:
+                continue
+            logging.warning("Source %s was %s from outside, setting it back",
+                            device_id, 'muted' if source.mute else 'unmuted')
+            self.pulse.source_mute(source.index, desired)
+            source.mute = desired
+            self.drift_corrections += 1
 
     def is_muted(self):
-        return False # TODO
+        if self.streams is not None:
+            return bool(self.streams.desired)
+        source = self._sources.get(self.sink_source) if self.sink_source is not None else None
+        return bool(source.mute) if source is not None else False
+
+    def mute_stats(self):
+        if self.streams is not None:
+            return {'app_streams': len(self.streams), 'issued': self.streams.issued,
+                    'skipped': self.streams.skipped, 'drift_corrections': self.streams.corrected}
+        return {'issued': self.mute_issued, 'skipped': self.mute_skipped,
+                'drift_corrections': self.drift_corrections}
+
+    def close(self):
+        if self.events:
+            self.events.stop()
+        if self.fanout:
+            self.fanout.stop()
 
 # --- Mac Backend ---
 class MacAudioBackend:
     def __init__(self):
-        pass
+        # Last state we set; osascript is a process spawn, so don't repeat it.
+        # Nothing tells us about outside changes here.
+        self._muted = None
+        self.mute_issued = 0
+        self.mute_skipped = 0
         
     def get_input_devices(self):
         return [{'id': 'default', 'name': 'Default System Input'}]
@@ -211,10 +856,19 @@ class MacAudioBackend:
     def set_device(self, device_id):
         return True, "Mac Input Selected"
 
-    def set_mute(self, is_muted):
+    def set_mute(self, is_muted, device_id=None):
+        # Only the system input volume is reachable from osascript
+        if self._muted == is_muted:
+            self.mute_skipped += 1
+            return
         import subprocess
         vol = 0 if is_muted else 100
         subprocess.run(f"osascript -e 'set volume input volume {vol}'", shell=True)
+        self._muted = is_muted
+        self.mute_issued += 1
     
     def is_muted(self):
-        return False
+        return bool(self._muted)
+
+    def mute_stats(self):
+        return {'issued': self.mute_issued, 'skipped': self.mute_skipped}
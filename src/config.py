@@ -1,6 +1,11 @@
 import json
 import os
 import platform
+import threading
+import time
+import tempfile
+import atexit
+import logging
 
 # Determine robust path
 if platform.system() == "Windows":
@@ -10,30 +15,202 @@ else:
 
 CONFIG_FILE = os.path.join(base_dir, ".phantom_ptt_config.json")
 
+# Each binding: "hotkey" (e.g. "ctrl+alt+p"), "action" ("ptt" opens the mic while
+# held, "ptm" mutes it while held) and optional "device_id" (None = selected device)
+# or "group" (a name from "groups", muted together).
+DEFAULT_BINDING = {"hotkey": "num 0", "action": "ptt", "device_id": None}
+
+# Bump when the layout changes and add a step to _MIGRATIONS. Files already at
+# this version are loaded as-is, with no migration pass.
+SCHEMA_VERSION = 2
+
 DEFAULT_CONFIG = {
-    "hotkey": "num 0",
-    "device_id": None
+    "version": SCHEMA_VERSION,
+    "bindings": [DEFAULT_BINDING],
+    "groups": {},  # name -> list of device ids
+    "device_id": None,
+    "device_key": None,  # stable name of the device, device_id can change between sessions
+    "low_power": False,  # slower animation, for laptops / always-on setups
+    "stuck_release_ms": 500,  # release a held hotkey the OS has reported up this long, its key-up lost; 0 = off
+    "listener": "keyboard",  # or "evdev" on Linux: reads /dev/input directly, no root
+    "evdev_devices": None,  # event node paths for "evdev", None = every keyboard
+    "log_level": "INFO",  # DEBUG for more detail in ~/.phantom_ptt_debug.log
+    "hook_process": False,  # run the key hook in a helper process, away from GUI stalls
+    "hook_process_mutes": False,  # with hook_process: the helper applies the mutes too
+    "control_socket": True,  # local socket for src/pttctl.py and scripts; a path, or false for none
+    # Check the mic's source while a hotkey's modifiers are held, before the trigger.
+    # Saves ~0.6-1.2 ms on a press after a replug or a missed device event, nothing
+    # when the source is already cached, and makes each modifier key event ~60-80 us
+    # slower inside the system-wide key hook
+    "prearm": False,
+    "mute_apps": [],  # Linux: mute only these apps' mic streams (e.g. ["discord"]), not the device
+    "status_file": True  # live PTT state in a memory-mapped file for overlays; a path, or false for none
 }
 
-def load_config():
+def _from_v1(data):
+    # Configs from before multi-binding support carry a single "hotkey"
+    if "bindings" not in data and "hotkey" in data:
+        data["bindings"] = [dict(DEFAULT_BINDING, hotkey=data.pop("hotkey"))]
+    data.pop("hotkey", None)
+    return data
+
+# version -> step that upgrades a file from that version to the next one
+_MIGRATIONS = {1: _from_v1}
+
+def _migrate(data):
+    version = data.get("version", 1)
+    while version < SCHEMA_VERSION:
+        data = _MIGRATIONS[version](data)
+        version += 1
+    data["version"] = version
+    return data
+
+def _defaults():
+    config = DEFAULT_CONFIG.copy()
+    config["bindings"] = [dict(b) for b in DEFAULT_CONFIG["bindings"]]
+    config["groups"] = {}
+    return config
+
+def load_config(path=None):
     """Box loads the configuration from file, or returns default if not found."""
-    if not os.path.exists(CONFIG_FILE):
-        return DEFAULT_CONFIG.copy()
+    path = path or CONFIG_FILE
+    if not os.path.exists(path):
+        return _defaults()
     
     try:
-        with open(CONFIG_FILE, 'r') as f:
+        with open(path, 'r') as f:
             data = json.load(f)
+            if data.get("version") != SCHEMA_VERSION:
+                data = _migrate(data)
             # Merge with default to ensure all keys exist
-            config = DEFAULT_CONFIG.copy()
+            config = _defaults()
             config.update(data)
             return config
     except Exception as e:
-        return DEFAULT_CONFIG.copy()
+        return _defaults()
+
+def _file_mode(path):
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except OSError:
+        pass
+    # New file: 0666 less the umask. Reading it from /proc avoids os.umask(),
+    # which sets it process-wide while other threads may be creating files.
+    umask = 0o022
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    umask = int(line.split()[1], 8)
+                    break
+    except OSError:
+        pass
+    return 0o666 & ~umask
+
+def _write_atomic(path, text):
+    # Write a sibling temp file and rename it over the config, so a crash
+    # mid-write leaves the old file rather than half a new one. The temp name is
+    # unique: a second instance (GUI plus --headless) saving at the same time
+    # must not write into ours.
+    directory, name = os.path.split(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile('w', dir=directory, prefix=name + ".", suffix=".tmp",
+                                     delete=False) as f:
+        try:
+            # The temp file is created 0600; give it the mode the config has (or
+            # would get from a plain open()), so saving doesn't change it
+            os.chmod(f.name, _file_mode(path))
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    try:
+        os.replace(f.name, path)
+    except BaseException:
+        os.unlink(f.name)
+        raise
 
-def save_config(config):
+def save_config(config, path=None):
     """Saves the configuration to file."""
     try:
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=4)
+        _write_atomic(path or CONFIG_FILE, json.dumps(config, indent=4))
     except Exception as e:
         print(f"Error saving config: {e}")
+
+class ConfigStore:
+    """
+    In-memory config with write-behind saves.
+
+    update() changes `data` and returns straight away; a background thread writes
+    the file once `delay` seconds after the first unsaved change, so a burst of
+    changes (scrolling through the device list) costs one write. The snapshot is
+    serialised on the caller's thread, so the writer never reads `data` while the
+    GUI is changing it. flush() writes any pending change now; it also runs at exit.
+    """
+
+    def __init__(self, path=None, delay=0.5, data=None):
+        self.path = path or CONFIG_FILE
+        self.delay = delay
+        self.data = data if data is not None else load_config(self.path)
+        self.writes = 0
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._pending = None      # serialised snapshot not yet on disk
+        self._deadline = None
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="config-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def update(self, **changes):
+        self.data.update(changes)
+        self.save()
+
+    def save(self):
+        """Schedules a write of the current `data`."""
+        text = json.dumps(self.data, indent=4)
+        with self._cond:
+            self._pending = text
+            if self._deadline is None:
+                self._deadline = time.monotonic() + self.delay
+                self._cond.notify_all()
+
+    def flush(self):
+        # Taking the snapshot and writing it under one lock keeps an older
+        # snapshot from landing on disk after a newer one
+        with self._write_lock:
+            with self._cond:
+                text, self._pending, self._deadline = self._pending, None, None
+            if text is not None:
+                self._write(text)
+
+    def close(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self.flush()
+
+    def _write(self, text):
+        try:
+            _write_atomic(self.path, text)
+            self.writes += 1
+        except Exception as e:
+            logging.error("Error saving config: %s", e)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and self._deadline is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+            self.flush()
@@ -0,0 +1,293 @@
+import os
+import json
+import socket
+import logging
+import selectors
+import threading
+
+# Local control socket: scripts (Stream Deck, automation) drive PTT through the
+# running app instead of shelling out to pactl. Unix domain socket, one line per
+# request and one line per response, pipelining allowed:
+#
+#   press [N]      binding N (default 0) goes down, as if its hotkey was pressed;
+#                  held only while this connection stays open, like a held key
+#   release [N]    ... and up
+#   toggle [N]     down and latched (stays down after disconnecting), or up if
+#                  the socket has it down
+#   state          -> ok {"muted": ..., "device": ..., "bindings": [...]}
+#   device KEY     switch to the device with that key (or id)
+#   subscribe      state changes arrive as `event {...}` lines from then on
+#   ping           -> ok
+#
+# Responses are `ok`, `ok <json>` or `err <message>`.
+SOCKET_NAME = "phantom-ptt.sock"
+MAX_LINE = 4096
+MAX_PENDING_OUT = 256 * 1024  # a subscriber that stops reading is dropped past this
+
+
+def default_path():
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return os.path.join(runtime, SOCKET_NAME)
+    return os.path.expanduser("~/." + SOCKET_NAME.replace("-", "_"))
+
+
+class _Conn:
+    def __init__(self, sock):
+        self.sock = sock
+        self.inbuf = bytearray()
+        self.out = bytearray()
+        self.held = set()  # bindings this connection pressed and hasn't released
+        self.subscribed = False
+        self.writing = False
+
+
+class ControlServer:
+    """
+    Serves the control socket on its own thread.
+
+    Commands go through the listener's fire(), so they take exactly the path a
+    hotkey does (binding_event -> the owner's slot -> AudioController). `state`
+    returns the owner's state dict; `select_device(key)` returns an error string
+    or None. publish(**state) sends an event to subscribers, from any thread.
+    """
+
+    def __init__(self, listener, state, select_device=None, path=None):
+        self.listener = listener
+        self.state = state
+        self.select_device = select_device
+        self.path = path or default_path()
+        self.commands = 0
+        self._latched = set()  # bindings toggled down, not tied to a connection
+        self._conns = {}
+        self._lock = threading.Lock()
+        self._sel = None
+        self._sock = None
+        self._wake_r = self._wake_w = None
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        """Binds the socket; False (and logged) if it can't."""
+        if not hasattr(socket, 'AF_UNIX'):
+            logging.info("Control socket not available on this platform")
+            return False
+        try:
+            self._sock = self._bind()
+        except OSError as e:
+            logging.error("Control socket %s: %s", self.path, e)
+            return False
+        self._sock.setblocking(False)
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._sel = selectors.DefaultSelector()
+        self._sel.register(self._sock, selectors.EVENT_READ)
+        self._sel.register(self._wake_r, selectors.EVENT_READ)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="control-socket", daemon=True)
+        self._thread.start()
+        logging.info("Control socket on %s", self.path)
+        return True
+
+    def _bind(self):
+        if os.path.exists(self.path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+                raise OSError("another instance is listening there")
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(self.path)  # left over from a crash
+            finally:
+                probe.close()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.bind(self.path)
+            # Only this user may drive the mic. Not via umask: that is process-wide
+            # and the log and config writer threads create files too. Nobody can
+            # connect before listen(), so there is no window before the chmod.
+            os.chmod(self.path, 0o600)
+            sock.listen(16)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def close(self):
+        if not self._running:
+            return
+        self._running = False
+        self._wake()
+        self._thread.join(1.0)
+        for conn in list(self._conns.values()):
+            conn.sock.close()
+        self._conns.clear()
+        self._sel.close()
+        self._sock.close()
+        self._wake_r.close()
+        self._wake_w.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def publish(self, **state):
+        line = b"event " + json.dumps(state).encode() + b"\n"
+        with self._lock:
+            for conn in self._conns.values():
+                if conn.subscribed:
+                    conn.out += line
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b"\0")
+        except (OSError, AttributeError):
+            pass  # buffer full: a wake-up is already pending
+
+    # --- server thread ---
+    def _run(self):
+        while self._running:
+            for key, mask in self._sel.select():
+                obj = key.fileobj
+                if obj is self._sock:
+                    self._accept()
+                elif obj is self._wake_r:
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                else:
+                    conn = self._conns.get(obj)
+                    if conn is None:
+                        continue
+                    if mask & selectors.EVENT_READ:
+                        self._read(conn)
+            self._flush_all()
+
+    def _accept(self):
+        try:
+            sock, _ = self._sock.accept()
+        except BlockingIOError:
+            return
+        sock.setblocking(False)
+        conn = _Conn(sock)
+        with self._lock:
+            self._conns[sock] = conn
+        self._sel.register(sock, selectors.EVENT_READ)
+
+    def _drop(self, conn):
+        with self._lock:
+            self._conns.pop(conn.sock, None)
+        try:
+            self._sel.unregister(conn.sock)
+        except (KeyError, ValueError):
+            pass
+        conn.sock.close()
+        # A client that goes away (crashed script, closed Stream Deck) mid-press
+        # must not leave the mic open
+        held, conn.held = conn.held, set()
+        for index in sorted(held):
+            if not self._is_down(index):
+                self.listener.fire(index, False)
+
+    def _is_down(self, index):
+        # Held by another connection, or latched by a toggle
+        if index in self._latched:
+            return True
+        return any(index in c.held for c in list(self._conns.values()))
+
+    def _read(self, conn):
+        try:
+            data = conn.sock.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(conn)
+            return
+        conn.inbuf += data
+        replies = []
+        while True:
+            end = conn.inbuf.find(b"\n")
+            if end < 0:
+                break
+            line = bytes(conn.inbuf[:end]).strip()
+            del conn.inbuf[:end + 1]
+            if line:
+                replies.append(self._handle(conn, line.decode(errors='replace')))
+        if len(conn.inbuf) > MAX_LINE:
+            replies.append("err line too long")
+            conn.inbuf.clear()
+        if replies:
+            with self._lock:
+                conn.out += ("\n".join(replies) + "\n").encode()
+
+    def _flush_all(self):
+        with self._lock:
+            conns = [c for c in self._conns.values() if c.out or c.writing]
+        for conn in conns:
+            with self._lock:
+                try:
+                    sent = conn.sock.send(conn.out) if conn.out else 0
+                except BlockingIOError:
+                    sent = 0
+                except OSError:
+                    sent = -1
+                if sent > 0:
+                    del conn.out[:sent]
+                pending = len(conn.out)
+            if sent < 0 or pending > MAX_PENDING_OUT:
+                self._drop(conn)
+                continue
+            # Watch for writability only while something is left over
+            if bool(pending) != conn.writing:
+                conn.writing = bool(pending)
+                events = selectors.EVENT_READ | (selectors.EVENT_WRITE if pending else 0)
+                self._sel.modify(conn.sock, events)
+
+    def _handle(self, conn, line):
+        self.commands += 1
+        verb, _, arg = line.partition(" ")
+        verb = verb.lower()
+        arg = arg.strip()
+        try:
+            if verb in ("press", "release", "toggle"):
+                index = int(arg) if arg else 0
+                if verb == "toggle":
+                    is_down = not self._is_down(index)
+                else:
+                    is_down = verb == "press"
+                if not self.listener.fire(index, is_down):
+                    return f"err no binding {index}"
+                if not is_down:
+                    # Up for everyone: release and toggle both end any hold
+                    self._latched.discard(index)
+                    for c in list(self._conns.values()):
+                        c.held.discard(index)
+                elif verb == "toggle":
+                    self._latched.add(index)
+                else:
+                    conn.held.add(index)
+                return "ok down" if is_down else "ok up"
+            if verb == "state":
+                return "ok " + json.dumps(self.state())
+            if verb == "device":
+                if not arg:
+                    return "err device needs a key or id"
+                if self.select_device is None:
+                    return "err device switching not supported"
+                error = self.select_device(arg)
+                return f"err {error}" if error else "ok"
+            if verb == "subscribe":
+                conn.subscribed = True
+                return "ok " + json.dumps(self.state())
+            if verb == "ping":
+                return "ok"
+        except ValueError as e:
+            return f"err {e}"
+        except Exception as e:
+            logging.error("Control command %r failed: %s", line, e, exc_info=True)
+            return f"err {e}"
+        return f"err unknown command {verb!r}"
@@ -0,0 +1,96 @@
+import threading
+import logging
+
+
+class DeviceRegistry:
+    """
+    Input devices indexed by id and by stable key.
+
+    Devices are the dicts the backends return: 'id' (what set_device takes; the
+    source index on Linux, which changes when the server restarts), 'name' (for
+    display) and 'key' (a name that survives restarts and replugs; the pulse source
+    name, the Windows endpoint id). Backends that have no better key use the id.
+
+    replace() loads a full enumeration, add()/remove() apply single hot-plug events.
+    Listeners are called as listener(kind, device) with kind 'reset' (device is the
+    full list), 'add', 'update' or 'remove', from whichever thread made the change.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_id = {}
+        self._by_key = {}
+        self.listeners = []
+
+    # Copied on change, so _notify can run on another thread meanwhile
+    def subscribe(self, listener):
+        self.listeners = self.listeners + [listener]
+
+    def unsubscribe(self, listener):
+        self.listeners = [l for l in self.listeners if l is not listener]
+
+    def _notify(self, kind, device):
+        for listener in self.listeners:
+            try:
+                listener(kind, device)
+            except Exception as e:
+                logging.error("Device listener failed on %s: %s", kind, e)
+
+    def _index(self, device):
+        device.setdefault('key', device['id'])
+        self._by_id[device['id']] = device
+        self._by_key[device['key']] = device
+
+    def replace(self, devices):
+        with self._lock:
+            self._by_id.clear()
+            self._by_key.clear()
+            for device in devices:
+                self._index(device)
+            devices = list(self._by_id.values())
+        self._notify('reset', devices)
+
+    def add(self, device):
+        device.setdefault('key', device['id'])
+        with self._lock:
+            old = self._by_id.get(device['id'])
+            if old == device:
+                # Volume and mute changes arrive as change events too
+                return
+            kind = 'add' if old is None else 'update'
+            if old is not None and self._by_key.get(old['key']) is old:
+                del self._by_key[old['key']]
+            self._index(device)
+        self._notify(kind, device)
+
+    def remove(self, device_id):
+        with self._lock:
+            device = self._by_id.pop(device_id, None)
+            if device is None:
+                return
+            if self._by_key.get(device['key']) is device:
+                del self._by_key[device['key']]
+        self._notify('remove', device)
+
+    def by_id(self, device_id):
+        return self._by_id.get(device_id)
+
+    def by_key(self, key):
+        return self._by_key.get(key)
+
+    def resolve(self, key=None, device_id=None):
+        """Saved selection -> device: stable key first, then the (maybe stale) id."""
+        device = self._by_key.get(key) if key is not None else None
+        if device is None and device_id is not None:
+            device = self._by_id.get(device_id)
+            if device is None:
+                # Ids read back from JSON may have changed type (int source indexes)
+                device = next((d for d in self.devices() if str(d['id']) == str(device_id)), None)
+        return device
+
+    def devices(self):
+        with self._lock:
+            return list(self._by_id.values())
+
+    def __len__(self):
+        return len(self._by_id)
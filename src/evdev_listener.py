@@ -0,0 +1,347 @@
+import os
+import select
+import struct
+import fcntl
+import time
+import threading
+import logging
+from key_listener import PTTListener
+
+# --- linux/input.h ---
+EV_SYN, EV_KEY, EV_MSC = 0x00, 0x01, 0x04
+EV_REP = 0x14
+KEY_MAX = 0x2ff
+# struct input_event: struct timeval (two native longs), __u16 type, __u16 code, __s32 value
+TIME_SIZE = struct.calcsize('ll')
+EVENT_SIZE = TIME_SIZE + 8
+# Events pulled per read(); a key press is 3 (MSC_SCAN, EV_KEY, SYN_REPORT)
+READ_EVENTS = 64
+# uinput is non-blocking: tries (1 ms apart) before a run of events is dropped
+FORWARD_TRIES = 5
+
+def _ioc(direction, kind, nr, size):
+    return (direction << 30) | (size << 16) | (ord(kind) << 8) | nr
+
+EVIOCGRAB = _ioc(1, 'E', 0x90, 4)
+EVIOCGKEY = _ioc(2, 'E', 0x18, KEY_MAX // 8 + 1)
+UI_DEV_CREATE = _ioc(0, 'U', 1, 0)
+UI_DEV_DESTROY = _ioc(0, 'U', 2, 0)
+UI_DEV_SETUP = _ioc(1, 'U', 3, 92)  # struct uinput_setup
+UI_SET_EVBIT = _ioc(1, 'U', 100, 4)
+UI_SET_KEYBIT = _ioc(1, 'U', 101, 4)
+UI_SET_MSCBIT = _ioc(1, 'U', 104, 4)
+MSC_SCAN = 0x04
+BUS_VIRTUAL = 0x06
+UINPUT_NAME = b"phantom-ptt passthrough"
+
+# Key names as the keyboard library spells them -> evdev KEY_* codes
+# (from linux/input-event-codes.h). Modifiers list both sides.
+KEY_CODES = {
+    'esc': (1,), 'backspace': (14,), 'tab': (15,), 'enter': (28,), 'space': (57,),
+    'caps lock': (58,), 'num lock': (69,), 'scroll lock': (70,), 'print screen': (99,),
+    'pause': (119,), 'menu': (127,), 'insert': (110,), 'delete': (111,), 'home': (102,),
+    'end': (107,), 'page up': (104,), 'page down': (109,),
+    'up': (103,), 'down': (108,), 'left': (105,), 'right': (106,),
+    'ctrl': (29, 97), 'left ctrl': (29,), 'right ctrl': (97,),
+    'shift': (42, 54), 'left shift': (42,), 'right shift': (54,),
+    'alt': (56, 100), 'left alt': (56,), 'right alt': (100,), 'alt gr': (100,),
+    'windows': (125, 126), 'left windows': (125,), 'right windows': (126,),
+    'num 0': (82,), 'num 1': (79,), 'num 2': (80,), 'num 3': (81,), 'num 4': (75,),
+    'num 5': (76,), 'num 6': (77,), 'num 7': (71,), 'num 8': (72,), 'num 9': (73,),
+    'num .': (83,), 'num enter': (96,), 'num +': (78,), 'num -': (74,), 'num *': (55,), 'num /': (98,),
+    '-': (12,), '=': (13,), '[': (26,), ']': (27,), ';': (39,), "'": (40,), '`': (41,),
+    '\\': (43,), ',': (51,), '.': (52,), '/': (53,),
+}
+KEY_CODES.update({c: (code,) for c, code in zip('1234567890', range(2, 12))})
+KEY_CODES.update({c: (code,) for c, code in zip('qwertyuiop', range(16, 26))})
+KEY_CODES.update({c: (code,) for c, code in zip('asdfghjkl', range(30, 39))})
+KEY_CODES.update({c: (code,) for c, code in zip('zxcvbnm', range(44, 51))})
+KEY_CODES.update({f'f{n}': (58 + n,) for n in range(1, 11)})
+KEY_CODES.update({'f11': (87,), 'f12': (88,)})
+KEY_CODES.update({f'f{n}': (170 + n,) for n in range(13, 25)})
+
+def key_to_codes(name):
+    codes = KEY_CODES.get(name.strip().lower())
+    if codes is None:
+        raise ValueError(f"Key {name!r} is not mapped to any evdev key code.")
+    return codes
+
+def find_keyboards():
+    """/dev/input/event* nodes of devices that look like keyboards (keys plus autorepeat)."""
+    paths = []
+    try:
+        with open('/proc/bus/input/devices') as f:
+            blocks = f.read().split('\n\n')
+    except OSError:
+        return paths
+    for block in blocks:
+        name, handlers, ev_bits = '', [], 0
+        for line in block.splitlines():
+            if line.startswith('N: Name='):
+                name = line[8:].strip('"')
+            elif line.startswith('H: Handlers='):
+                handlers = line[12:].split()
+            elif line.startswith('B: EV='):
+                ev_bits = int(line[6:], 16)
+        if name.encode() == UINPUT_NAME or 'kbd' not in handlers:
+            continue
+        if ev_bits & (1 << EV_KEY) and ev_bits & (1 << EV_REP):
+            paths += ['/dev/input/' + h for h in handlers if h.startswith('event')]
+    return paths
+
+
+class _KeyEvent:
+    # The attributes PTTListener._on_key_event reads; one instance per listener, reused
+    __slots__ = ('scan_code', 'event_type', 'time')
+
+
+class _Device:
+    def __init__(self, fd, path, owned):
+        self.fd = fd
+        self.path = path
+        self.owned = owned  # opened by us, closed by us
+        self.grabbed = False
+        self.buf = bytearray(EVENT_SIZE * READ_EVENTS)
+        self.view = memoryview(self.buf)
+        # Typed views over the same bytes: fields are read in place, nothing is unpacked
+        self.shorts = self.view.cast('H')
+        self.ints = self.view.cast('i')
+        self.longs = self.view.cast('l')
+        # Bytes of a partial event left over from the last read (pipes, not evdev)
+        self.filled = 0
+
+
+class EvdevListener(PTTListener):
+    """
+    PTTListener reading /dev/input event nodes directly, for Linux.
+
+    One thread waits on all devices with epoll and reads events in blocks into a
+    fixed buffer; type, code and value are read through typed memoryviews, and only
+    EV_KEY events for bound keys ever reach Python objects. No root needed, just
+    read access to the event nodes (the `input` group).
+
+    Suppression grabs the devices (EVIOCGRAB) and writes every event except the
+    bound triggers back out through a uinput device, raw bytes, in runs. Without
+    write access to /dev/uinput the devices are read without grabbing and the
+    trigger key is not suppressed.
+
+    `devices` are event node paths or already open file descriptors (pipes with
+    recorded event streams work too); None finds the keyboards.
+    """
+
+    def __init__(self, devices=None, suppress=True):
+        super().__init__()
+        self.device_paths = devices
+        self.suppress = suppress
+        self._devices = {}
+        self._epoll = None
+        self._uinput = None
+        self._wake = None
+        self._thread = None
+        self._event = _KeyEvent()
+        self.events_read = 0
+        self.forward_dropped = 0
+
+    def start_listening(self, bindings):
+        self.stop_listening()
+        if isinstance(bindings, str):
+            bindings = [bindings] if bindings else []
+        try:
+            self._open_devices()
+            if not self._prepare(bindings, key_to_codes, self._is_pressed):
+                self._close_devices()
+                return
+            if self.suppress:
+                self._grab()
+            self._wake = os.pipe()
+            self._epoll.register(self._wake[0], select.EPOLLIN)
+            self._thread = threading.Thread(target=self._run, name="evdev-listener", daemon=True)
+            self._thread.start()
+        except Exception as e:
+            logging.error("Error opening input devices: %s", e)
+            self.stop_listening()
+            raise
+
+    def stop_listening(self):
+        if self._thread:
+            os.write(self._wake[1], b'x')
+            self._thread.join(1.0)
+            self._thread = None
+        self._close_devices()
+        super().stop_listening()
+
+    def _open_devices(self):
+        sources = self.device_paths if self.device_paths is not None else find_keyboards()
+        if not sources:
+            raise OSError("no keyboard event devices found (is the user in the 'input' group?)")
+        self._epoll = select.epoll()
+        for source in sources:
+            if isinstance(source, int):
+                dev = _Device(source, f"fd {source}", False)
+            else:
+                dev = _Device(os.open(source, os.O_RDONLY | os.O_NONBLOCK), source, True)
+            self._devices[dev.fd] = dev
+            self._epoll.register(dev.fd, select.EPOLLIN)
+
+    def _close_devices(self):
+        self._ungrab()
+        for dev in self._devices.values():
+            if dev.owned:
+                os.close(dev.fd)
+        self._devices = {}
+        if self._uinput is not None:
+            try:
+                fcntl.ioctl(self._uinput, UI_DEV_DESTROY)
+            except OSError:
+                pass
+            os.close(self._uinput)
+            self._uinput = None
+        if self._wake:
+            for fd in self._wake:
+                os.close(fd)
+            self._wake = None
+        if self._epoll:
+            self._epoll.close()
+            self._epoll = None
+
+    def _is_pressed(self, code):
+        state = bytearray(KEY_MAX // 8 + 1)
+        for dev in self._devices.values():
+            try:
+                fcntl.ioctl(dev.fd, EVIOCGKEY, state)
+            except OSError:
+                continue  # pipes have no key state
+            if state[code // 8] & (1 << (code % 8)):
+                return True
+        return False
+
+    def _ungrab(self):
+        for dev in self._devices.values():
+            if dev.grabbed:
+                dev.grabbed = False
+                try:
+                    fcntl.ioctl(dev.fd, EVIOCGRAB, 0)
+                except OSError:
+                    pass
+
+    def _grab(self):
+        try:
+            self._uinput = self._create_uinput()
+        except OSError as e:
+            logging.warning("No uinput (%s), trigger keys will not be suppressed", e)
+            return
+        for dev in self._devices.values():
+            try:
+                fcntl.ioctl(dev.fd, EVIOCGRAB, 1)
+                dev.grabbed = True
+            except OSError as e:
+                logging.warning("Could not grab %s: %s", dev.path, e)
+
+    def _create_uinput(self):
+        fd = os.open('/dev/uinput', os.O_WRONLY | os.O_NONBLOCK)
+        try:
+            for ev in (EV_SYN, EV_KEY, EV_MSC):
+                fcntl.ioctl(fd, UI_SET_EVBIT, ev)
+            for code in range(1, KEY_MAX + 1):
+                fcntl.ioctl(fd, UI_SET_KEYBIT, code)
+            fcntl.ioctl(fd, UI_SET_MSCBIT, MSC_SCAN)
+            # struct uinput_setup: input_id {bustype, vendor, product, version}, name[80], ff_effects_max
+            setup = struct.pack('HHHH80sI', BUS_VIRTUAL, 0, 0, 1, UINPUT_NAME, 0)
+            fcntl.ioctl(fd, UI_DEV_SETUP, setup)
+            fcntl.ioctl(fd, UI_DEV_CREATE)
+        except OSError:
+            os.close(fd)
+            raise
+        return fd
+
+    def _run(self):
+        # While the devices are grabbed, this thread is the only way keys reach the
+        # desktop. Whatever happens here, it must not leave them grabbed.
+        wake_fd = self._wake[0]
+        try:
+            while True:
+                for fd, mask in self._epoll.poll():
+                    if fd == wake_fd:
+                        return
+                    dev = self._devices.get(fd)
+                    if dev is None:
+                        continue
+                    try:
+                        alive = self._read(dev)
+                    except Exception as e:
+                        # Keep listening, but give the keyboards back: no suppression
+                        logging.error("Evdev listener failed on %s, releasing the grab: %s", dev.path, e,
+                                      exc_info=True)
+                        self._ungrab()
+                        continue
+                    if not alive:
+                        # Unplugged, or the end of a recorded stream
+                        self._epoll.unregister(fd)
+        except Exception as e:
+            logging.error("Evdev listener stopped: %s", e, exc_info=True)
+        finally:
+            self._ungrab()
+
+    def _read(self, dev):
+        try:
+            n = os.readv(dev.fd, [dev.view[dev.filled:]])
+        except BlockingIOError:
+            return True
+        except OSError as e:
+            logging.error("Input device %s gone: %s", dev.path, e)
+            return False
+        if n == 0:
+            return False
+        total = dev.filled + n
+        count = total // EVENT_SIZE
+        self._decode(dev, count)
+        dev.filled = total - count * EVENT_SIZE
+        if dev.filled:
+            dev.buf[:dev.filled] = dev.buf[count * EVENT_SIZE:total]
+        return True
+
+    def _decode(self, dev, count):
+        shorts, ints, longs = dev.shorts, dev.ints, dev.longs
+        table, mod_bits = self._table, self._mod_bits
+        on_key = self._on_key_event
+        event = self._event
+        forward = dev.grabbed and self._uinput is not None
+        type_at = TIME_SIZE // 2        # in shorts
+        value_at = TIME_SIZE // 4 + 1   # in ints
+        shorts_per, ints_per, longs_per = EVENT_SIZE // 2, EVENT_SIZE // 4, EVENT_SIZE // (TIME_SIZE // 2)
+        start = 0
+        self.events_read += count
+        for i in range(count):
+            h = i * shorts_per + type_at
+            if shorts[h] != EV_KEY:
+                continue
+            code = shorts[h + 1]
+            if code not in table and code not in mod_bits:
+                continue
+            event.scan_code = code
+            event.event_type = 'down' if ints[i * ints_per + value_at] else 'up'
+            t = i * longs_per
+            event.time = longs[t] + longs[t + 1] / 1e6
+            if not on_key(event) and forward:
+                # Swallowed: pass on everything before it, skip this one
+                if start < i:
+                    self._forward(dev.view[start * EVENT_SIZE:i * EVENT_SIZE])
+                start = i + 1
+        if forward and start < count:
+            self._forward(dev.view[start * EVENT_SIZE:count * EVENT_SIZE])
+
+    def _forward(self, data):
+        # Whole events only; uinput takes them one write at a time
+        tries = 0
+        while data:
+            try:
+                n = os.write(self._uinput, data)
+            except BlockingIOError:
+                tries += 1
+                if tries >= FORWARD_TRIES:
+                    self.forward_dropped += len(data) // EVENT_SIZE
+                    logging.warning("uinput full, dropped %s input events", len(data) // EVENT_SIZE)
+                    return
+                time.sleep(0.001)
+                continue
+            data = data[n:]
@@ -0,0 +1,257 @@
+import signal
+import socket
+import logging
+from PyQt6.QtCore import QCoreApplication, QObject, QSocketNotifier, Qt, pyqtSlot
+from audio_manager import AudioController
+from key_listener import create_listener, STUCK_RELEASE_MS
+import config
+import app_log
+from latency import now_ns, recorder
+import session_trace
+import status_file
+
+class HeadlessPTT(QObject):
+    """
+    PTT itself: config, listener, audio controller, control socket and status
+    file. Runs on its own on a QCoreApplication loop (--headless), under a tray
+    icon (TrayPTT), or under MainWindow, which shows it and edits it through
+    `view` but leaves the PTT work here.
+    """
+
+    def __init__(self, app_config=None, config_store=None):
+        super().__init__()
+        self.started_ns = now_ns()
+        self.armed_ns = None
+        self.arm_error = None
+
+        # A ConfigStore writes changes behind (tray mode); otherwise they are saved directly
+        self.config_store = config_store
+        self.app_config = config_store.data if config_store else (app_config or config.load_config())
+        app_log.set_level(self.app_config.get("log_level", "INFO"))
+        self.bindings = self.app_config.get("bindings") or [dict(config.DEFAULT_BINDING)]
+        self.groups = {name: tuple(ids) for name, ids in self.app_config.get("groups", {}).items()}
+
+        self.audio = AudioController(on_mute_done=self.on_mute_done,
+                                     mute_apps=self.app_config.get("mute_apps"))
+        self.listener = create_listener(self.app_config.get("listener", "keyboard"),
+                                        self.app_config.get("evdev_devices"),
+                                        self.app_config.get("hook_process", False),
+                                        self.app_config.get("hook_process_mutes", False),
+                                        self.app_config.get("mute_apps"))
+        self.listener.binding_event.connect(self.on_binding_event)
+        # The helper process arms in the background and says how it went here
+        self.arm_reply = getattr(self.listener, 'armed', None)
+        if self.arm_reply is not None:
+            self.arm_reply.connect(self.on_armed)
+        self.listener.stuck_release_ms = self.app_config.get("stuck_release_ms", STUCK_RELEASE_MS)
+        self.helper_mutes = getattr(self.listener, 'applies_mutes', False)
+        if self.helper_mutes:
+            self.listener.groups = self.groups
+            self.listener.prearm = self.app_config.get("prearm", False)
+            self.listener.mute_done.connect(self.on_mute_done)
+        elif self.app_config.get("prearm", False):
+            self.listener.chord_held.connect(self.on_chord_held, Qt.ConnectionType.DirectConnection)
+        self.muted = None
+        self.last_binding = None
+        self.device_id = None
+        self.device_name = None
+        self.control = None
+        self.status = None
+        # MainWindow showing this core's state, while one is open
+        self.view = None
+
+    def start(self):
+        """Arms the hotkeys, then the device and services; False if arming failed."""
+        # Hook first; the backend is still connecting on its own thread meanwhile
+        if not self.arm():
+            return False
+        self.start_services()
+        self._activate_saved_device()
+        return True
+
+    def arm(self):
+        """
+        (Re)installs the hotkey hook for `bindings`; False with `arm_error` set if
+        it failed. The helper process answers later, through on_armed.
+        """
+        try:
+            self.listener.start_listening(self.bindings)
+        except Exception as e:
+            self.on_armed(e)
+            return False
+        for binding in self.listener.bindings:
+            if binding.group in self.groups:
+                self.audio.prepare_group(self.groups[binding.group])
+        if self.arm_reply is None:
+            self.on_armed(None)
+        return True
+
+    @pyqtSlot(object)
+    def on_armed(self, error):
+        self.arm_error = error
+        if error is None:
+            self.armed_ns = now_ns()
+            hotkeys = ", ".join(b.hotkey for b in self.listener.bindings)
+            logging.info("Armed in %.1f ms: %s", (self.armed_ns - self.started_ns) / 1e6, hotkeys)
+            print(f"SYSTEM ARMED - READY ({hotkeys})")
+        else:
+            logging.error("Could not arm hotkeys: %s", error)
+            print(f"KEY ERROR: {error}")
+        if self.view is not None:
+            self.view._show_armed(error)
+
+    def start_services(self):
+        """Status file and control socket; each is skipped (and logged) if it can't start."""
+        self.status = status_file.create_writer(self.app_config.get("status_file", True))
+        control = self.app_config.get("control_socket", True)
+        if control:
+            from control_server import ControlServer
+            self.control = ControlServer(self.listener, self.control_state, self.select_remote_device,
+                                         control if isinstance(control, str) else None)
+            if not self.control.start():
+                self.control = None
+
+    def _activate_saved_device(self):
+        # Saved device if it is still there, else the first one (as the GUI does)
+        devices = self.audio.get_input_devices()
+        device = self.audio.devices.resolve(self.app_config.get("device_key"), self.app_config.get("device_id"))
+        if device is None and devices:
+            device = devices[0]
+        if device is None:
+            success, msg = self.audio.load_default_device()
+        else:
+            success, msg = self.audio.set_device(device['id'])
+        if success:
+            if device:
+                self.device_active(device['id'], device['name'])
+            logging.info("Headless device: %s", device['name'] if device else msg)
+        else:
+            logging.error("Failed to set device: %s", msg)
+            print(f"Device Error: {msg}")
+
+    @pyqtSlot(object, bool, object)
+    def on_binding_event(self, binding, is_down, stamp):
+        latency = now_ns() - stamp
+        recorder.record('signal', latency)
+        if session_trace.active is not None:
+            session_trace.active.signal(binding.index, is_down, latency)
+        is_muted = binding.mute_state(is_down)
+        self.muted = is_muted
+        self.last_binding = binding.index
+        if self.control:
+            self.control.publish(muted=is_muted, binding=binding.index)
+        if self.helper_mutes:
+            # The helper only reports failures; publish now, on_mute_done rolls back
+            if self.status:
+                self.status.publish(transmitting=not is_muted, binding=binding.index)
+            return
+        # The status file says what the mic is, not what was asked: on_mute_done writes it
+        self.audio.set_mute(is_muted, stamp, binding.target(self.groups))
+
+    def on_chord_held(self, bindings):
+        # Hook thread: the modifiers are down, the trigger probably follows
+        self.audio.prearm([b.target(self.groups) for b in bindings])
+
+    def on_mute_done(self, is_muted, error, results):
+        # Worker thread; logging and the status writer are thread safe
+        if error:
+            logging.error("Mute Error: %s", error)
+            if self.control:
+                self.control.publish(muted=is_muted, error=error)
+        if self.status and (error or not self.helper_mutes):
+            # A failed mute left the mic as it was: open if we were closing it
+            transmitting = is_muted if error else not is_muted
+            self.status.publish(transmitting=transmitting, binding=self.last_binding)
+        view = self.view
+        if view is not None:
+            try:
+                view.mute_done.emit(is_muted, error, results)
+            except RuntimeError:
+                pass  # window deleted meanwhile
+
+    def device_active(self, dev_id, name, save=False):
+        """Records the device now in use, from the startup pick, the window or the socket."""
+        self.device_id = dev_id
+        self.device_name = name
+        if self.helper_mutes:
+            self.listener.set_device(dev_id)
+        if self.control:
+            self.control.publish(device=name)
+        if self.status:
+            self.status.publish(device=name)
+        if save:
+            device = self.audio.devices.by_id(dev_id)
+            changes = {"device_id": dev_id, "device_key": device['key'] if device else None}
+            if self.config_store:
+                self.config_store.update(**changes)
+            else:
+                self.app_config.update(changes)
+                config.save_config(self.app_config)
+
+    def control_state(self):
+        return {"muted": self.muted, "device": self.device_name,
+                "bindings": [b.hotkey for b in self.listener.bindings]}
+
+    def select_remote_device(self, key):
+        device = self.audio.devices.resolve(key, key)
+        if device is None:
+            return f"no device {key!r}"
+        view = self.view
+        if view is not None:
+            # The window's combo box makes the switch, so it shows it too
+            try:
+                view.remote_device.emit(device['id'])
+                return None
+            except RuntimeError:
+                pass
+        def done(result, error):
+            success, msg = result if result else (False, error)
+            if not success:
+                logging.error("Failed to set device: %s", msg)
+                return
+            self.device_active(device['id'], device['name'], save=True)
+        self.audio.set_device_async(device['id'], done)
+        return None
+
+    def stop(self):
+        if self.control:
+            self.control.close()
+        if self.status:
+            self.status.close()
+        self.listener.close()
+        self.audio.shutdown()
+        if self.config_store:
+            self.config_store.close()
+        session_trace.stop()
+        mutes = ", ".join(f"{k} {v}" for k, v in self.audio.mute_stats().items())
+        logging.info("PTT latency on exit:\n" + recorder.format_table() +
+                     f"\nmutes: {mutes}, stuck keys released {self.listener.stuck_releases}")
+
+def handle_signals(app):
+    """Ctrl+C and SIGTERM quit `app`. Keep the returned object alive while it runs."""
+    signal.signal(signal.SIGINT, lambda *args: app.quit())
+    signal.signal(signal.SIGTERM, lambda *args: app.quit())
+    if hasattr(signal, 'SIGUSR1'):
+        # `kill -USR1 <pid>` writes the recent log records to app_log.DUMP_PATH
+        signal.signal(signal.SIGUSR1, lambda *args: app_log.dump_recent())
+    # Qt's loop never hands control back to Python on its own, so a signal would
+    # only be noticed on the next Qt event. The wakeup fd makes that event,
+    # instead of a timer waking the process all the time.
+    rsock, wsock = socket.socketpair()
+    rsock.setblocking(False)
+    wsock.setblocking(False)
+    signal.set_wakeup_fd(wsock.fileno())
+    notifier = QSocketNotifier(rsock.fileno(), QSocketNotifier.Type.Read)
+    notifier.activated.connect(lambda: rsock.recv(64))
+    return notifier, rsock, wsock
+
+def run(argv):
+    app = QCoreApplication(argv)
+    daemon = HeadlessPTT()
+    if not daemon.start():
+        return 1
+
+    signals = handle_signals(app)
+    code = app.exec()
+    daemon.stop()
+    return code
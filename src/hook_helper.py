@@ -0,0 +1,365 @@
+import json
+import socket
+import struct
+import threading
+import logging
+import importlib
+import multiprocessing
+from PyQt6.QtCore import QObject, Qt, QTimer, pyqtSignal
+from key_listener import Binding, STUCK_RELEASE_MS
+
+# Runs the key hook (and optionally the mute path) in a helper process, so
+# nothing the GUI process does - a slow paint, a blocking pulse call, a GC
+# pass - can hold the GIL while the OS waits on the suppressing hook.
+#
+# The two sides talk over a socketpair. Every message is a <kind u8, flag u8,
+# length u16> header and `length` bytes. Key events are fixed binary packets;
+# everything else (arming, device changes, stats) is JSON and off the hot path.
+# The flag is a key event's up/down; on ARM it is a request id that ARMED or
+# FAILED echo, so an answer to an arm that has since been replaced is dropped.
+# Nothing the GUI does waits on the helper: it pushes its stats every
+# STATS_INTERVAL and the GUI side keeps the last ones.
+HEADER = struct.Struct('<BBH')
+EVENT = struct.Struct('<BBHHQ')  # header + binding index, monotonic stamp ns
+EVENT_DATA = struct.Struct('<HQ')
+EVENT_LEN = EVENT_DATA.size
+
+# GUI -> helper
+ARM, DISARM, DEVICE, STOP, FIRE = 1, 2, 3, 4, 5
+# helper -> GUI
+BINDING, ARMED, FAILED, MUTE_FAILED, STATS = 1, 2, 3, 4, 5
+
+ARM_TIMEOUT = 10.0      # first arm includes the helper's start-up
+STATS_INTERVAL = 1.0
+RESTART_DELAYS = (0.1, 0.5, 1.0, 2.0, 5.0)
+HELPER_LOG = "~/.phantom_ptt_hook.log"
+
+
+def _send(sock, lock, kind, flag=0, data=None):
+    payload = json.dumps(data).encode() if data is not None else b''
+    with lock:
+        sock.sendall(HEADER.pack(kind, flag, len(payload)) + payload)
+
+def _recv_exact(sock, size):
+    buf = bytearray(size)
+    view = memoryview(buf)
+    got = 0
+    while got < size:
+        n = sock.recv_into(view[got:])
+        if not n:
+            return None
+        got += n
+    return buf
+
+def _recv(sock):
+    """(kind, flag, payload bytes), or None once the other side is gone."""
+    try:
+        header = _recv_exact(sock, HEADER.size)
+        if header is None:
+            return None
+        kind, flag, length = HEADER.unpack(header)
+        payload = _recv_exact(sock, length) if length else b''
+    except OSError:
+        return None
+    if payload is None:
+        return None
+    return kind, flag, payload
+
+
+class HookHelper(QObject):
+    """
+    Drop-in for PTTListener that runs the real listener in a helper process.
+
+    binding_event carries the GUI process's own Binding objects, and stamps from
+    the helper's monotonic clock, which is system-wide, so latencies measured
+    against it still hold. With `mutes` the helper also applies the mutes with its
+    own AudioController (applies_mutes tells the owner not to): tell it the
+    device with set_device(). Errors come back on mute_done.
+
+    Unlike PTTListener, start_listening() doesn't wait for the hook: `armed`
+    carries the outcome later, None or the error.
+
+    If the helper dies it is started again and re-armed, with a growing delay
+    while it keeps dying.
+    """
+    binding_event = pyqtSignal(object, bool, object)
+    armed = pyqtSignal(object)
+    mute_done = pyqtSignal(bool, object, object)
+    # Never emitted here: with `mutes` the helper pre-arms its own AudioController
+    # (set `prearm`), without them the GUI process doesn't see chords early enough
+    chord_held = pyqtSignal(object)
+
+    def __init__(self, backend="keyboard", devices=None, mutes=False, setup=None, mute_apps=None):
+        super().__init__()
+        self.backend = backend
+        self.devices = devices
+        self.applies_mutes = mutes
+        self.mute_apps = mute_apps
+        # "module:function" called in the helper before it builds its listener;
+        # benchmarks use it to swap in fakes
+        self.setup = setup
+        self.bindings = []
+        self.groups = {}
+        self.prearm = False
+        self.key_codes = {}
+        self.stuck_release_ms = STUCK_RELEASE_MS
+        self.restarts = 0
+        self._stats = {}
+        self._arm_data = None
+        self._arm_id = 0
+        self._pending_arm = None
+        self._device = None
+        self._device_set = False
+        self._lock = threading.Lock()
+        self._stopping = False
+        self._failures = 0
+        # Started now: it boots while the GUI is being built
+        self._spawn()
+
+    def _spawn(self):
+        ours, theirs = socket.socketpair()
+        ctx = multiprocessing.get_context('spawn')
+        self.process = ctx.Process(target=_helper_main, name="ptt-hook", daemon=True,
+                                   args=(theirs, self.backend, self.devices, self.applies_mutes, self.setup,
+                                         self.mute_apps))
+        self.process.start()
+        theirs.close()
+        self.sock = ours
+        threading.Thread(target=self._read_loop, args=(ours,), name="hook-helper-reader", daemon=True).start()
+
+    def _send(self, kind, data=None, flag=0):
+        try:
+            _send(self.sock, self._lock, kind, flag, data)
+        except OSError:
+            pass  # the reader sees it go and restarts it
+
+    def start_listening(self, bindings):
+        """
+        PTTListener.start_listening without the wait: a bad hotkey still raises
+        here, the helper's answer comes on `armed`.
+        """
+        if isinstance(bindings, str):
+            bindings = [bindings] if bindings else []
+        parsed = [Binding.from_config(b) for b in bindings]
+        for i, b in enumerate(parsed):
+            b.index = i
+        data = {'bindings': [b.to_config() for b in parsed], 'groups': self.groups,
+                'stuck_release_ms': self.stuck_release_ms, 'prearm': self.prearm}
+        # Before the reply: the helper may fire one right after arming
+        self.bindings = parsed
+        self._arm_data = data
+        arm_id = self._send_arm()
+        QTimer.singleShot(int(ARM_TIMEOUT * 1000), lambda: self._arm_timed_out(arm_id))
+
+    def _send_arm(self):
+        self._arm_id = (self._arm_id + 1) % 256
+        self._pending_arm = self._arm_id
+        self._send(ARM, self._arm_data, self._arm_id)
+        return self._arm_id
+
+    def _arm_timed_out(self, arm_id):
+        if self._pending_arm == arm_id:
+            self._pending_arm = None
+            self.armed.emit(TimeoutError("Key hook helper did not answer"))
+
+    def stop_listening(self):
+        self.bindings = []
+        self._arm_data = None
+        self._pending_arm = None
+        self._send(DISARM)
+
+    def fire(self, index, is_down):
+        """PTTListener.fire, in the helper: comes back as a binding_event like a key would."""
+        if not 0 <= index < len(self.bindings):
+            return False
+        self._send(FIRE, {'index': index, 'is_down': is_down})
+        return True
+
+    def set_device(self, device_id):
+        """Device the helper mutes (None = the default); only with applies_mutes."""
+        self._device, self._device_set = device_id, True
+        self._send(DEVICE, {'device_id': device_id})
+
+    def hook_stats(self):
+        """The helper's last pushed numbers, up to STATS_INTERVAL old."""
+        return dict(self._stats, restarts=self.restarts)
+
+    @property
+    def stuck_releases(self):
+        return self._stats.get('stuck_releases', 0)
+
+    def close(self):
+        self._stopping = True
+        self._send(STOP)
+        self.process.join(1.0)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.sock.close()
+
+    def _read_loop(self, sock):
+        bindings_event = self.binding_event
+        while True:
+            message = _recv(sock)
+            if message is None:
+                break
+            kind, flag, payload = message
+            if kind == BINDING:
+                index, stamp = EVENT_DATA.unpack(payload)
+                bindings = self.bindings
+                if index < len(bindings):
+                    bindings_event.emit(bindings[index], bool(flag), stamp)
+            elif kind == MUTE_FAILED:
+                data = json.loads(payload)
+                self.mute_done.emit(data['is_muted'], data['error'], None)
+            elif kind == STATS:
+                self._failures = 0
+                self._stats = json.loads(payload)
+            elif kind in (ARMED, FAILED):
+                if flag != self._pending_arm:
+                    continue  # answers an arm that has been replaced or dropped
+                self._pending_arm = None
+                data = json.loads(payload)
+                if kind == ARMED:
+                    self._failures = 0
+                    self.key_codes = data.get('key_codes', {})
+                    self.armed.emit(None)
+                else:
+                    self.bindings = []
+                    self._arm_data = None
+                    self.armed.emit(RuntimeError(data))
+        sock.close()
+        if not self._stopping:
+            self._restart()
+
+    def _restart(self):
+        delay = RESTART_DELAYS[min(self._failures, len(RESTART_DELAYS) - 1)]
+        self._failures += 1
+        self.restarts += 1
+        self.process.join(1.0)
+        logging.warning("Key hook helper exited (code %s), restarting in %.1f s",
+                        self.process.exitcode, delay)
+        threading.Event().wait(delay)
+        if self._stopping:
+            return
+        self._spawn()
+        # Re-arm; the answer comes on `armed` like the first one
+        if self._device_set:
+            self._send(DEVICE, {'device_id': self._device})
+        if self._arm_data is not None:
+            self._send_arm()
+
+
+class _Helper(QObject):
+    """The helper process side: a listener, maybe an AudioController, and the socket."""
+    command = pyqtSignal(int, int, object)
+
+    def __init__(self, sock, backend, devices, mutes, mute_apps=None):
+        super().__init__()
+        from key_listener import create_listener
+        self.sock = sock
+        self._lock = threading.Lock()
+        self.groups = {}
+        self.prearm = False
+        self.listener = create_listener(backend, devices)
+        # Straight from the hook thread: one pack and one send, no event loop hop
+        self.listener.binding_event.connect(self.on_binding_event, Qt.ConnectionType.DirectConnection)
+        self.audio = None
+        if mutes:
+            from audio_manager import AudioController
+            self.audio = AudioController(on_mute_done=self.on_mute_done, mute_apps=mute_apps)
+            self.listener.chord_held.connect(self.on_chord_held, Qt.ConnectionType.DirectConnection)
+        # Commands are read on a thread and handled on the Qt thread, like the GUI's slots
+        self.command.connect(self.on_command)
+        self.stats_timer = QTimer()
+        self.stats_timer.timeout.connect(self.push_stats)
+        self.stats_timer.start(int(STATS_INTERVAL * 1000))
+
+    def on_binding_event(self, binding, is_down, stamp):
+        packet = EVENT.pack(BINDING, is_down, EVENT_LEN, binding.index, stamp)
+        try:
+            with self._lock:
+                self.sock.sendall(packet)
+        except OSError:
+            pass  # GUI gone; the reader quits us
+        if self.audio is not None:
+            self.audio.set_mute(binding.mute_state(is_down), stamp, binding.target(self.groups))
+
+    def on_chord_held(self, bindings):
+        if self.prearm:
+            self.audio.prearm([b.target(self.groups) for b in bindings])
+
+    def on_mute_done(self, is_muted, error, results):
+        if error:
+            self.reply(MUTE_FAILED, {'is_muted': is_muted, 'error': str(error)})
+
+    def reply(self, kind, data, flag=0):
+        try:
+            _send(self.sock, self._lock, kind, flag, data)
+        except OSError:
+            pass
+
+    def push_stats(self):
+        stats = self.listener.hook_stats()
+        if self.audio is not None:
+            stats['mutes'] = self.audio.mute_stats()
+        self.reply(STATS, stats)
+
+    def read_commands(self):
+        while True:
+            message = _recv(self.sock)
+            if message is None:
+                self.command.emit(STOP, 0, None)
+                return
+            kind, flag, payload = message
+            self.command.emit(kind, flag, json.loads(payload) if payload else None)
+
+    def on_command(self, kind, flag, data):
+        if kind == ARM:
+            self.listener.stuck_release_ms = data['stuck_release_ms']
+            self.groups = {name: tuple(ids) for name, ids in data['groups'].items()}
+            self.prearm = data.get('prearm', False)
+            try:
+                self.listener.start_listening(data['bindings'])
+            except Exception as e:
+                self.reply(FAILED, str(e), flag)
+                return
+            if self.audio is not None:
+                for binding in self.listener.bindings:
+                    if binding.group in self.groups:
+                        self.audio.prepare_group(self.groups[binding.group])
+            self.reply(ARMED, {'key_codes': getattr(self.listener, 'key_codes', {})}, flag)
+            self.push_stats()
+        elif kind == DISARM:
+            self.listener.stop_listening()
+        elif kind == FIRE:
+            self.listener.fire(data['index'], data['is_down'])
+        elif kind == DEVICE and self.audio is not None:
+            device_id = data['device_id']
+            if device_id is None:
+                success, msg = self.audio.load_default_device()
+            else:
+                success, msg = self.audio.set_device(device_id)
+            if not success:
+                logging.error("Hook helper could not set device %s: %s", device_id, msg)
+        elif kind == STOP:
+            self.stats_timer.stop()
+            self.listener.stop_listening()
+            if self.audio is not None:
+                self.audio.shutdown()
+            from PyQt6.QtCore import QCoreApplication
+            QCoreApplication.quit()
+
+
+def _helper_main(sock, backend, devices, mutes, setup, mute_apps=None):
+    import os
+    import app_log
+    app_log.setup(os.path.expanduser(HELPER_LOG))
+    if setup:
+        module, func = setup.split(':')
+        getattr(importlib.import_module(module), func)()
+    from PyQt6.QtCore import QCoreApplication
+    app = QCoreApplication(["phantom-ptt-hook"])
+    helper = _Helper(sock, backend, devices, mutes, mute_apps)
+    threading.Thread(target=helper.read_commands, name="hook-commands", daemon=True).start()
+    app.exec()
+    sock.close()
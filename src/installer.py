@@ -4,9 +4,12 @@ import shutil
 import subprocess
 
 APP_NAME = "PhantomPTT"
-INSTALL_DIR = os.path.join(os.getenv('APPDATA'), APP_NAME)
 EXE_NAME = "PhantomPTT.exe"
 
+def install_dir():
+    # Resolved on use: APPDATA only exists on Windows and nothing here runs elsewhere
+    return os.path.join(os.getenv('APPDATA') or os.path.expanduser("~"), APP_NAME)
+
 def is_installed():
     # Check if we are running from the install dir
     # This logic assumes we are frozen (PyInstaller). 
@@ -14,7 +17,7 @@ def is_installed():
     
     if getattr(sys, 'frozen', False):
         current_exe = sys.executable
-        return current_exe.startswith(INSTALL_DIR)
+        return current_exe.startswith(install_dir())
     else:
         # Dev mode usually
         return True
@@ -27,11 +30,12 @@ def install(force=False):
         print("Not running as frozen exe, skipping self-install.")
         return
 
-    if not os.path.exists(INSTALL_DIR):
-        os.makedirs(INSTALL_DIR)
+    target_dir = install_dir()
+    if not os.path.exists(target_dir):
+        os.makedirs(target_dir)
 
     current_exe = sys.executable
-    target_exe = os.path.join(INSTALL_DIR, EXE_NAME)
+    target_exe = os.path.join(target_dir, EXE_NAME)
 
     try:
         if current_exe != target_exe:
@@ -52,7 +56,7 @@ def create_shortcut(target_path):
     shortcut_path = os.path.join(desktop, f"{APP_NAME}.lnk")
     
     # Create VBS script to generate shortcut
-    vbs_path = os.path.join(INSTALL_DIR, "create_shortcut.vbs")
+    vbs_path = os.path.join(install_dir(), "create_shortcut.vbs")
     vbs_content = f"""
     Set oWS = WScript.CreateObject("WScript.Shell")
     sLinkFile = "{shortcut_path}"
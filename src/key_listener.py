@@ -1,5 +1,19 @@
-import keyboard
-from PyQt6.QtCore import QObject, pyqtSignal
+import time
+import logging
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from latency import now_ns, recorder
+import session_trace
+
+# `keyboard` is imported on first use: loading it pulls in the OS hook backend,
+# which isn't needed until a hotkey is armed. Benchmarks put a stand-in here.
+keyboard = None
+
+def _keyboard():
+    global keyboard
+    if keyboard is None:
+        import keyboard as kb
+        keyboard = kb
+    return keyboard
 
 class KeyListener(QObject):
     on_press = pyqtSignal()
@@ -15,6 +29,7 @@ class KeyListener(QObject):
         Sets the hotkey to listen for.
         Example: 'cntrl+alt+p' or 'num 0'
         """
+        keyboard = _keyboard()
         if self.hotkey:
             try:
                 keyboard.remove_hotkey(self.handle_event)
@@ -58,65 +73,353 @@ class KeyListener(QObject):
 # This implies customized complex hotkeys.
 # I will implement a Listener that accepts a key string, and detects down/up.
 
+# Distinct modifier keys across all bindings; the dispatch table has 2**N rows per key
+MAX_MODIFIERS = 10
+
+# A trigger whose key-up never reached us (lock screen, UAC prompt, the hook
+# timing out) stays held. While anything is held, the key state the OS side
+# keeps is asked every STUCK_CHECK_MS, and a trigger it has reported up for
+# STUCK_RELEASE_MS is released; the wait lets an up that is still on its way
+# to the hook arrive first.
+STUCK_RELEASE_MS = 500
+STUCK_CHECK_MS = 250
+
+class Binding:
+    def __init__(self, hotkey, action="ptt", device_id=None, group=None):
+        self.hotkey = hotkey
+        self.action = action
+        self.device_id = device_id
+        self.group = group
+        # precise handling for "ctrl+shift+v" -> modifiers=['ctrl', 'shift'], trigger='v'
+        parts = hotkey.lower().split('+')
+        self.trigger = parts[-1].strip()
+        self.modifiers = [m.strip() for m in parts[:-1]]
+        self.mask = 0
+        self.index = 0  # position in the listener's bindings
+
+    def mute_state(self, is_down):
+        """Mute state to apply: push-to-talk opens the mic while held, push-to-mute closes it."""
+        return is_down if self.action == "ptm" else not is_down
+
+    def target(self, groups):
+        """What AudioController.set_mute takes for this binding: its group's ids, or its device."""
+        if self.group:
+            return groups.get(self.group, self.device_id)
+        return self.device_id
+
+    @classmethod
+    def from_config(cls, data):
+        if isinstance(data, str):
+            return cls(data)
+        return cls(data["hotkey"], data.get("action", "ptt"), data.get("device_id"), data.get("group"))
+
+    def to_config(self):
+        return {"hotkey": self.hotkey, "action": self.action,
+                "device_id": self.device_id, "group": self.group}
+
+    def __repr__(self):
+        return f"Binding({self.hotkey!r}, {self.action!r}, {self.device_id!r})"
+
+def compile_bindings(bindings, key_to_scan_codes):
+    """
+    Builds the dispatch table for a set of bindings.
+
+    Returns (table, mod_bits): mod_bits maps a modifier scan code to its bit, and
+    table maps a trigger scan code to a list indexed by the modifier bitmask that
+    holds the binding to fire in that state (the most specific one whose modifiers
+    are all held), or None. A key event is then one dict get and one list index,
+    however many bindings there are.
+    """
+    names = []
+    for b in bindings:
+        for mod in b.modifiers:
+            if mod not in names:
+                names.append(mod)
+    if len(names) > MAX_MODIFIERS:
+        raise ValueError(f"Too many distinct modifier keys ({len(names)} > {MAX_MODIFIERS})")
+
+    name_bits = {}
+    mod_bits = {}
+    for i, name in enumerate(names):
+        name_bits[name] = 1 << i
+        for code in key_to_scan_codes(name):
+            # Left/right variants share a bit: releasing either clears it
+            mod_bits[code] = mod_bits.get(code, 0) | (1 << i)
+
+    states = 1 << len(names)
+    table = {}
+    for b in bindings:
+        b.mask = 0
+        for mod in b.modifiers:
+            b.mask |= name_bits[mod]
+        weight = bin(b.mask).count('1')
+        for code in key_to_scan_codes(b.trigger):
+            row = table.setdefault(code, [None] * states)
+            for state in range(states):
+                if state & b.mask != b.mask:
+                    continue
+                current = row[state]
+                # First binding in config order wins a tie
+                if current is None or bin(current.mask).count('1') < weight:
+                    row[state] = b
+    return table, mod_bits
+
+def compile_chords(bindings):
+    """
+    For each modifier bitmask, the tuple of bindings (with modifiers) whose
+    modifiers are all held in it. Equal tuples are one object, so the hook can
+    spot a change with `is`.
+    """
+    states = 1 << max((b.mask.bit_length() for b in bindings), default=0)
+    shared = {}
+    chords = []
+    for state in range(states):
+        held = tuple(b for b in bindings if b.mask and state & b.mask == b.mask)
+        chords.append(shared.setdefault(held, held))
+    return chords
+
 class PTTListener(QObject):
+    # Kept for simple consumers: any binding went down / came up
     pressed = pyqtSignal()
     released = pyqtSignal()
+    # (binding, is_down, monotonic stamp in ns) - carries its own data across threads
+    binding_event = pyqtSignal(object, bool, object)
+    # (bindings,) whose modifiers are now all held, () once none are. Emitted from
+    # the hook thread; connect with DirectConnection to use the time before the
+    # trigger arrives (AudioController.prearm)
+    chord_held = pyqtSignal(object)
     
     def __init__(self):
         super().__init__()
-        self.target_hotkey = None
-        self.trigger_key = None
-        self.modifiers = []
+        self.bindings = []
         self.active = False
         self._hook = None
+        self._table = {}
+        self._mod_bits = {}
+        # Held modifiers as a bitmask, maintained from the same hook
+        self._mod_state = 0
+        # Modifier bitmask -> bindings whose modifiers it holds, and the current one
+        self._chords = [()]
+        self._chord = ()
+        self._emit_chords = False
+        # Trigger scan code -> binding it fired (None if it fired nothing)
+        self._held = {}
+        # Monotonic stamp of the last press/release we emitted, read by the receiver
+        self.last_event_ns = 0
+        # Hook counters (the hook runs with suppress=True, keep it cheap).
+        # Dropped repeats return before the timing and are only counted.
+        self.dropped_repeats = 0
+        self.hook_calls = 0
+        self.hook_ns = 0
+        self._emit_plain = True
+        # Key state as the OS side sees it, code -> bool; set by _prepare
+        self._is_pressed = None
+        # Held trigger code -> stamp of the first check that found it up
+        self._up_since = {}
+        # 0 turns the check off
+        self.stuck_release_ms = STUCK_RELEASE_MS
+        self.stuck_releases = 0
+        self._watchdog = QTimer(self)
+        self._watchdog.setInterval(STUCK_CHECK_MS)
+        self._watchdog.timeout.connect(self.check_stuck)
+        # Queued onto our own thread when emitted from the hook thread
+        self.binding_event.connect(self._on_hold_change)
 
-    def start_listening(self, hotkey_str):
+    def start_listening(self, bindings):
+        """Accepts a hotkey string or a list of binding dicts / strings."""
         self.stop_listening()
-        self.target_hotkey = hotkey_str
-        
-        if hotkey_str:
-            try:
-                # Parse the key combo
-                # precise handling for "ctrl+shift+v" -> modifiers=['ctrl', 'shift'], trigger='v'
-                parts = hotkey_str.lower().split('+')
-                self.trigger_key = parts[-1].strip()
-                self.modifiers = [m.strip() for m in parts[:-1]]
-                
-                # We hook ONLY the trigger key with suppression.
-                # This prevents "5" from typing if "5" is the trigger.
-                # For "ctrl+5", "5" is suppressed.
-                self._hook = keyboard.hook_key(self.trigger_key, self._on_key_event, suppress=True)
-            except Exception as e:
-                print(f"Error hooking key: {e}")
-                # Fallback? If hooking fails (e.g. bad key name), we can't do much.
-                pass
+        keyboard = _keyboard()
+        if isinstance(bindings, str):
+            bindings = [bindings] if bindings else []
+
+        try:
+            if not self._prepare(bindings, keyboard.key_to_scan_codes, keyboard.is_pressed):
+                return
+            # One suppressing hook for everything: bound triggers are swallowed,
+            # every other key (modifiers included) is let through.
+            self._hook = keyboard.hook(self._on_key_event, suppress=True)
+        except Exception as e:
+            print(f"Error hooking key: {e}")
+            # Fallback? If hooking fails (e.g. bad key name), we can't do much.
+            self.stop_listening()
+            raise
+
+    def _prepare(self, bindings, key_to_scan_codes, is_pressed):
+        """Compiles the bindings for _on_key_event; False if there are none."""
+        self.bindings = [Binding.from_config(b) for b in bindings]
+        if not self.bindings:
+            return False
+        self._table, self._mod_bits = compile_bindings(self.bindings, key_to_scan_codes)
+        # The key codes let a trace replay compile the same table on another machine
+        self.key_codes = {}
+        for i, b in enumerate(self.bindings):
+            b.index = i
+            for name in b.modifiers + [b.trigger]:
+                self.key_codes[name] = list(key_to_scan_codes(name))
+        trace = session_trace.active
+        if trace is not None:
+            trace.meta(bindings=[b.to_config() for b in self.bindings],
+                       key_codes=self.key_codes, listener=type(self).__name__)
+
+        self._is_pressed = is_pressed
+        # Seed with anything already held, then follow the hook
+        self._mod_state = 0
+        for code, bit in self._mod_bits.items():
+            if is_pressed(code):
+                self._mod_state |= bit
+
+        self._chords = compile_chords(self.bindings)
+        self._chord = self._chords[self._mod_state]
+
+        # Skip emitting the plain signals when nobody listens to them
+        self._emit_plain = bool(self.receivers(self.pressed) or self.receivers(self.released))
+        self._emit_chords = bool(self.receivers(self.chord_held))
+        return True
 
     def stop_listening(self):
         if self._hook:
-            keyboard.unhook(self._hook)
+            _keyboard().unhook(self._hook)
             self._hook = None
         self.active = False
-            
+        self._held = {}
+        self._up_since = {}
+        self._watchdog.stop()
+        self._table = {}
+        self._mod_bits = {}
+        if self._chord:
+            self.chord_held.emit(())  # drop any pre-arm
+        self._chords = [()]
+        self._chord = ()
+
+    def close(self):
+        # The helper process variant (hook_helper.HookHelper) has more to tear down
+        self.stop_listening()
+
+    def fire(self, index, is_down):
+        """
+        Binding `index` goes down / up as if its hotkey had (control socket), through
+        the same binding_event. Any thread; False if there is no such binding.
+        """
+        bindings = self.bindings
+        if not 0 <= index < len(bindings):
+            return False
+        self.binding_event.emit(bindings[index], is_down, now_ns())
+        return True
+
     def _on_key_event(self, event):
-        # Event handler for the specific (suppressed) trigger key
-        
-        # Check modifiers
-        # validation: all modifiers must be pressed
-        modifiers_ok = True
-        for mod in self.modifiers:
-            if not keyboard.is_pressed(mod):
-                modifiers_ok = False
-                break
-        
-        if event.event_type == 'down':
-            if modifiers_ok and not self.active:
+        stamp = now_ns()
+        code = event.scan_code
+        down = event.event_type == 'down'
+
+        bit = self._mod_bits.get(code, 0)
+        if bit:
+            if down:
+                self._mod_state |= bit
+            else:
+                self._mod_state &= ~bit
+            chord = self._chords[self._mod_state]
+            if chord is not self._chord:
+                self._chord = chord
+                if self._emit_chords:
+                    self.chord_held.emit(chord)
+
+        row = self._table.get(code)
+        trace = session_trace.active
+        if trace is not None and (bit or row is not None):
+            trace.key(code, down)
+        if row is None:
+            return True  # not a trigger, let it through
+
+        if down:
+            if code in self._held:
+                # OS auto-repeat while held, nothing to do
+                self.dropped_repeats += 1
+                return False
+            binding = row[self._mod_state & ~bit]
+            self._held[code] = binding
+            # If no binding matches the held modifiers, we still suppressed the key.
+            # This is a trade-off: the trigger key is dedicated to PTT while this app is listening.
+            if binding is not None:
                 self.active = True
-                self.pressed.emit()
-            # If modifiers NOT ok, we still suppressed the key. 
-            # This is a trade-off: The trigger key is dedicated to PTT while this app is listening.
-            
-        elif event.event_type == 'up':
-            if self.active:
-                self.active = False
+                self._stamp(event, stamp)
+                self.binding_event.emit(binding, True, stamp)
+                if self._emit_plain:
+                    self.pressed.emit()
+        else:
+            binding = self._held.pop(code, None)
+            if binding is not None:
+                self.active = any(b is not None for b in self._held.values())
+                self._stamp(event, stamp)
+                self.binding_event.emit(binding, False, stamp)
+                if self._emit_plain:
+                    self.released.emit()
+
+        self.hook_calls += 1
+        self.hook_ns += now_ns() - stamp
+        return False
+
+    def _on_hold_change(self, binding, is_down, stamp):
+        if not self.stuck_release_ms:
+            return
+        if self._held:
+            if not self._watchdog.isActive():
+                self._watchdog.start()
+        else:
+            self._watchdog.stop()
+
+    def check_stuck(self):
+        """Releases held triggers the OS has reported up for stuck_release_ms."""
+        now = now_ns()
+        limit = self.stuck_release_ms * 1_000_000
+        held = list(self._held)
+        self._up_since = {code: t for code, t in self._up_since.items() if code in held}
+        for code in held:
+            try:
+                down = self._is_pressed(code)
+            except Exception:
+                down = True  # can't tell; leave it to the key-up
+            if down:
+                self._up_since.pop(code, None)
+                continue
+            if now - self._up_since.setdefault(code, now) < limit:
+                continue
+            del self._up_since[code]
+            # The hook thread may pop it at the same moment; only one of us gets it
+            binding = self._held.pop(code, None)
+            if binding is None:
+                continue
+            self.stuck_releases += 1
+            self.active = any(b is not None for b in self._held.values())
+            logging.warning("Key %r is up but its release never arrived, releasing", binding.hotkey)
+            self.binding_event.emit(binding, False, now)
+            if self._emit_plain:
                 self.released.emit()
+        if not self._held:
+            self._watchdog.stop()
+
+    def _stamp(self, event, stamp):
+        self.last_event_ns = stamp
+        # event.time is the OS timestamp on the wall clock
+        recorder.record('hook', time.time_ns() - int(event.time * 1e9))
+
+    def hook_stats(self):
+        return {
+            'hook_calls': self.hook_calls,
+            'dropped_repeats': self.dropped_repeats,
+            'stuck_releases': self.stuck_releases,
+            'hook_avg_us': self.hook_ns / 1000 / max(1, self.hook_calls),
+        }
 
+def create_listener(backend="keyboard", devices=None, isolated=False, mutes=False, mute_apps=None):
+    """
+    PTTListener for the configured backend: "keyboard" (any OS) or "evdev" (Linux).
+    `isolated` runs it in a helper process (HookHelper), which with `mutes` also
+    applies the mutes (to `mute_apps`' streams if given).
+    """
+    if isolated:
+        from hook_helper import HookHelper
+        return HookHelper(backend, devices, mutes, mute_apps=mute_apps)
+    if backend == "evdev":
+        from evdev_listener import EvdevListener
+        return EvdevListener(devices)
+    return PTTListener()
@@ -0,0 +1,89 @@
+import time
+from bisect import bisect_left
+
+# Monotonic stamps for the PTT pipeline. Stages, in order:
+#   hook    - OS key event time -> PTTListener._on_key_event (wall clock, the only one)
+#   signal  - _on_key_event -> MainWindow press/release slot
+#   queue   - slot -> audio worker picks the command up
+#   backend - backend.set_mute call
+#   total   - _on_key_event -> mute applied
+now_ns = time.monotonic_ns
+
+# 1-2-5 bucket edges from 1us to 10s, in ns
+BUCKET_EDGES = [m * 10 ** e for e in range(3, 10) for m in (1, 2, 5)] + [10 ** 10]
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket histogram. record() is a bisect and two adds, no locks: a racing
+    update may lose a count, which is fine for diagnostics.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_EDGES) + 1)
+        self.total = 0
+        self.max_ns = 0
+
+    def record(self, ns):
+        self.counts[bisect_left(BUCKET_EDGES, ns)] += 1
+        self.total += 1
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, p):
+        """Upper bucket edge below which p% of samples fall (capped at the max seen)."""
+        if not self.total:
+            return 0
+        wanted = self.total * p / 100.0
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= wanted:
+                edge = BUCKET_EDGES[i] if i < len(BUCKET_EDGES) else self.max_ns
+                return min(edge, self.max_ns)
+        return self.max_ns
+
+
+class LatencyRecorder:
+    def __init__(self):
+        self.backend = "none"
+        self.histograms = {}
+
+    def histogram(self, stage, backend=None):
+        key = (stage, backend or self.backend)
+        hist = self.histograms.get(key)
+        if hist is None:
+            hist = self.histograms[key] = LatencyHistogram()
+        return hist
+
+    def record(self, stage, ns, backend=None):
+        if ns >= 0:
+            self.histogram(stage, backend).record(ns)
+
+    def summary(self):
+        rows = []
+        for (stage, backend), hist in sorted(self.histograms.items()):
+            rows.append({
+                'stage': stage,
+                'backend': backend,
+                'count': hist.total,
+                'p50_us': hist.percentile(50) / 1000,
+                'p95_us': hist.percentile(95) / 1000,
+                'p99_us': hist.percentile(99) / 1000,
+                'max_us': hist.max_ns / 1000,
+            })
+        return rows
+
+    def format_table(self):
+        lines = [f"{'stage':<8} {'backend':<20} {'n':>6} {'p50us':>9} {'p95us':>9} {'p99us':>9} {'maxus':>9}"]
+        for r in self.summary():
+            lines.append(f"{r['stage']:<8} {r['backend']:<20} {r['count']:>6} {r['p50_us']:>9.0f} "
+                         f"{r['p95_us']:>9.0f} {r['p99_us']:>9.0f} {r['max_us']:>9.0f}")
+        return "\n".join(lines)
+
+    def reset(self):
+        self.histograms.clear()
+
+
+# Process-wide recorder, like config's module-level helpers
+recorder = LatencyRecorder()
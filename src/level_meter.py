@@ -0,0 +1,166 @@
+import subprocess
+import threading
+import logging
+import numpy as np
+
+# Capture format: 16 kHz mono s16le is plenty for a level meter
+RATE = 16000
+BLOCK = 320          # samples per block, 20 ms
+HISTORY = 50         # blocks kept in the ring, 1 s
+SCALE = np.float32(1 / 32768)
+
+
+class ParecStream:
+    """Raw PCM from a PulseAudio source through `parec`, as a readinto() stream."""
+
+    def __init__(self, device=None):
+        cmd = ['parec', '--raw', '--format=s16le', f'--rate={RATE}', '--channels=1',
+               '--latency-msec=20', '--client-name=phantom-ptt-meter']
+        if device is not None and device != 'default':
+            cmd.append(f'--device={device}')
+        self.proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    def readinto(self, buffer):
+        return self.proc.stdout.readinto(buffer)
+
+    def interrupt(self):
+        # Any thread, doesn't wait: parec exits and the reader sees the end
+        if self.proc.poll() is None:
+            self.proc.terminate()
+
+    def close(self):
+        if self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(1.0)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        self.proc.stdout.close()
+
+
+class _Run:
+    """
+    One start() of a LevelMeter: its stop flag, stream and buffers. A thread
+    still finishing an earlier run only ever writes that run's buffers.
+    """
+
+    def __init__(self, block, history):
+        self.stopped = threading.Event()
+        self.stream = None
+        self.ring = np.zeros(block * history, dtype=np.float32)
+        self.slots = [self.ring[i * block:(i + 1) * block] for i in range(history)]
+        self.slot = 0
+        self.pcm = np.zeros(block, dtype=np.int16)
+        self.pcm_bytes = memoryview(self.pcm).cast('B')
+        self.tails = [self.pcm_bytes[i:] for i in range(self.pcm_bytes.nbytes)]
+
+
+class LevelMeter:
+    """
+    Input level of a capture stream, measured on its own thread.
+
+    `open_stream()` returns an object with readinto(buffer) (s16le mono PCM at RATE,
+    0 at the end) and close(). Each BLOCK of samples is scaled straight into its slot
+    of a float32 ring buffer and its RMS and peak (0..1) computed with numpy; all
+    arrays and views are made when the run starts, so a block allocates none.
+    `rms`/`peak` hold the latest block for whoever polls them (VisualsWidget, once
+    per frame), `ring` the latest run's last HISTORY blocks.
+
+    stop() returns at once: it tells the capture thread to finish and interrupts
+    the stream if it can (parec exits); the thread closes the stream itself.
+    Each start() gets its own run, so a thread still finishing an earlier one
+    can't be revived by it, nor write into the new one's buffers.
+    """
+
+    def __init__(self, open_stream, block=BLOCK, history=HISTORY):
+        self.open_stream = open_stream
+        self.block = block
+        self.history = history
+        # Buffers of the run started last (kept after it stops, for window_rms)
+        self._last = _Run(block, history)
+        self.ring = self._last.ring
+        self.rms = 0.0
+        self.peak = 0.0
+        self.blocks = 0
+        self._run_lock = threading.Lock()
+        self._current = None  # the _Run started last, None when stopped
+
+    @property
+    def running(self):
+        return self._current is not None
+
+    def start(self):
+        with self._run_lock:
+            if self._current is not None:
+                return
+            run = self._current = self._last = _Run(self.block, self.history)
+            self.ring = run.ring
+        threading.Thread(target=self._run, args=(run,), name="level-meter", daemon=True).start()
+
+    def stop(self):
+        with self._run_lock:
+            run, self._current = self._current, None
+        if run is None:
+            return
+        run.stopped.set()
+        interrupt = getattr(run.stream, 'interrupt', None)
+        if interrupt:
+            interrupt()
+        self.rms = self.peak = 0.0
+
+    def window_rms(self):
+        """RMS over the whole ring (the last HISTORY blocks)."""
+        return float(np.sqrt(np.dot(self.ring, self.ring) / self.ring.size))
+
+    def _run(self, run):
+        try:
+            stream = self.open_stream()
+        except Exception as e:
+            logging.error("Level meter could not open capture: %s", e)
+            self._finished(run)
+            return
+        run.stream = stream
+        try:
+            # stop() may have come while we were opening, before there was a
+            # stream to interrupt; the flag catches that too
+            while not run.stopped.is_set():
+                if not self._fill(stream, run):
+                    break
+                self.process_block(run)
+        except (OSError, ValueError) as e:
+            if not run.stopped.is_set():
+                logging.error("Level meter capture failed: %s", e)
+        finally:
+            stream.close()
+            self._finished(run)
+
+    def _finished(self, run):
+        # Ended on its own (parec exited): not running any more, start() may try again
+        with self._run_lock:
+            if self._current is run:
+                self._current = None
+            if self._current is None:
+                self.rms = self.peak = 0.0  # a last block may have landed after stop()
+
+    def _fill(self, stream, run=None):
+        run = run or self._last
+        filled, size = 0, run.pcm_bytes.nbytes
+        while filled < size:
+            n = stream.readinto(run.tails[filled])
+            if not n:
+                return False
+            filled += n
+        return True
+
+    def process_block(self, run=None):
+        """Measures the run's block in pcm; the capture thread calls this per block."""
+        run = run or self._last
+        slot = run.slots[run.slot]
+        np.multiply(run.pcm, SCALE, out=slot)
+        run.slot = (run.slot + 1) % len(run.slots)
+        peak = max(float(slot.max()), -float(slot.min()))
+        rms = float(np.sqrt(np.dot(slot, slot) / self.block))
+        if run is self._last:
+            # A run that has been replaced keeps quiet
+            self.peak, self.rms = peak, rms
+        self.blocks += 1
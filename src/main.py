@@ -1,13 +1,51 @@
 import sys
-from PyQt6.QtWidgets import QApplication
-from ui.main_window import MainWindow
-import installer
+import argparse
 
 def main():
+    if getattr(sys, 'frozen', False):
+        # The frozen exe is also what the key hook helper process runs
+        import multiprocessing
+        multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Phantom PTT")
+    parser.add_argument("--headless", action="store_true",
+                        help="run PTT without a window (servers, kiosks)")
+    parser.add_argument("--tray", action="store_true",
+                        help="start in the system tray; the window is only built while open")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="record the session's key, signal and mute timings to FILE "
+                             "(replay with benchmarks/replay_trace.py)")
+    args, qt_args = parser.parse_known_args()
+
+    # One log for every mode; only here, so importing the modules doesn't touch logging
+    import app_log
+    app_log.setup()
+
+    if args.trace:
+        import session_trace
+        session_trace.start(args.trace)
+
+    if args.headless:
+        # No widgets, no visuals: QtCore only
+        from headless import run
+        sys.exit(run([sys.argv[0]] + qt_args))
+
     # Attempt install if running as frozen exe
-    installer.install()
+    if getattr(sys, 'frozen', False):
+        import installer
+        installer.install()
+
+    if args.tray:
+        from ui.tray import run
+        sys.exit(run([sys.argv[0]] + qt_args))
+
+    from PyQt6.QtWidgets import QApplication
+    from ui.main_window import MainWindow
+
+    from headless import handle_signals
 
-    app = QApplication(sys.argv)
+    app = QApplication([sys.argv[0]] + qt_args)
+    # Ctrl+C and SIGTERM quit, as in the other modes
+    signals = handle_signals(app)
     
     # Apply global styling here or in the window
     
@@ -0,0 +1,102 @@
+"""
+Drives a running Phantom PTT through its control socket.
+
+    python src/pttctl.py toggle [N]     # latched: stays down until toggled again
+    python src/pttctl.py hold [N]       # down until Ctrl+C or stdin closes, then up
+    python src/pttctl.py state
+    python src/pttctl.py device KEY
+    python src/pttctl.py watch          # print state changes until Ctrl+C
+
+Several commands can be given at once, separated by commas:
+    python src/pttctl.py press , state
+
+A `press` only lasts as long as the connection, so on its own it is released
+again as soon as pttctl exits; use `hold` or `toggle` from the command line.
+"""
+import sys
+import socket
+import argparse
+from control_server import default_path
+
+
+class ControlClient:
+    """Blocking client; request() sends one line and returns the reply line."""
+
+    def __init__(self, path=None, timeout=2.0):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path or default_path())
+        self.file = self.sock.makefile('rb')
+
+    def send(self, line):
+        self.sock.sendall(line.encode() + b"\n")
+
+    def read_line(self):
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("control socket closed")
+        return line.decode().rstrip("\n")
+
+    def request(self, line):
+        self.send(line)
+        # Replies come in order; skip events if this connection subscribed
+        while True:
+            reply = self.read_line()
+            if not reply.startswith("event "):
+                return reply
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Phantom PTT control")
+    parser.add_argument("--socket", help=f"default: {default_path()}")
+    parser.add_argument("command", nargs="+")
+    args = parser.parse_args()
+
+    try:
+        client = ControlClient(args.socket)
+    except OSError as e:
+        print(f"Phantom PTT not reachable: {e}", file=sys.stderr)
+        return 2
+
+    commands = " ".join(args.command).split(",")
+    status = 0
+    try:
+        for command in (c.strip() for c in commands):
+            verb, _, arg = command.partition(" ")
+            if verb == "hold":
+                reply = client.request(f"press {arg}".strip())
+                print(reply, flush=True)
+                if reply.startswith("err"):
+                    status = 1
+                    continue
+                try:
+                    sys.stdin.read()  # until EOF
+                except KeyboardInterrupt:
+                    pass
+                command = f"release {arg}".strip()
+            elif command == "watch":
+                client.sock.settimeout(None)
+                print(client.request("subscribe"), flush=True)
+                try:
+                    while True:
+                        print(client.read_line(), flush=True)
+                except KeyboardInterrupt:
+                    break
+            reply = client.request(command)
+            print(reply)
+            if reply.startswith("err"):
+                status = 1
+    except OSError as e:
+        # The app quit (or dropped us) mid-command or while watching
+        print(f"Phantom PTT connection lost: {e}", file=sys.stderr)
+        status = 2
+    client.close()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import threading
+import logging
+
+
+class PulseEventWatcher:
+    """
+    Runs PulseAudio subscribe events on a dedicated connection in a daemon thread.
+
+    pulsectl forbids any call on a connection that is inside event_listen(), so the
+    watcher never shares the backend's connection. Handlers are called as
+    handler(pulse, event) from the watcher thread, *outside* the listen loop, so they
+    may use the passed `pulse` for follow-up queries (it is the watcher's own
+    connection, never the one used on the PTT hot path).
+    """
+
+    def __init__(self, facilities=('source', 'server'), client_name='phantom-ptt-events'):
+        self.facilities = facilities
+        self.client_name = client_name
+        self.handlers = []
+        self._pending = []
+        self._pulse = None
+        self._running = False
+        self._thread = None
+
+    def add_handler(self, handler):
+        self.handlers.append(handler)
+
+    def start(self):
+        if self._thread:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="pulse-events", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._pulse:
+            try:
+                self._pulse.event_listen_stop()
+            except Exception:
+                pass
+
+    def _on_event(self, ev):
+        import pulsectl
+        self._pending.append(ev)
+        # Leave event_listen() so handlers are allowed to query the server
+        raise pulsectl.PulseLoopStop
+
+    def _run(self):
+        try:
+            import pulsectl
+            with pulsectl.Pulse(self.client_name) as pulse:
+                self._pulse = pulse
+                pulse.event_mask_set(*self.facilities)
+                pulse.event_callback_set(self._on_event)
+                while self._running:
+                    pulse.event_listen()
+                    events, self._pending = self._pending, []
+                    for ev in events:
+                        self.dispatch(pulse, ev)
+        except Exception as e:
+            logging.error("Pulse event watcher stopped: %s", e)
+        finally:
+            self._pulse = None
+
+    def dispatch(self, pulse, ev):
+        for handler in self.handlers:
+            try:
+                handler(pulse, ev)
+            except Exception as e:
+                logging.error("Pulse event handler failed on %s/%s: %s", ev.facility, ev.t, e)
@@ -0,0 +1,59 @@
+import threading
+import queue
+import logging
+from concurrent.futures import Future
+
+
+class PulseFanout:
+    """
+    A few threads that each own a pulse connection, for issuing calls side by side.
+
+    pulsectl calls are synchronous round trips and a connection can't be shared
+    between threads, so muting N sources one after another costs N round trips.
+    Jobs submitted here run as fn(pulse, *args) on whichever thread is free and
+    the round trips overlap. Connections are opened when the pool starts, not on
+    the first press.
+    """
+
+    def __init__(self, connect, size):
+        self.connect = connect
+        self.size = size
+        self._jobs = queue.SimpleQueue()
+        self._threads = []
+        for i in range(size):
+            t = threading.Thread(target=self._run, name=f"pulse-fanout-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, fn, *args):
+        future = Future()
+        self._jobs.put((future, fn, args))
+        return future
+
+    def stop(self):
+        for _ in self._threads:
+            self._jobs.put(None)
+
+    def _run(self):
+        pulse = None
+        try:
+            pulse = self.connect()
+        except Exception as e:
+            logging.error("Fan-out connection failed: %s", e)
+
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            future, fn, args = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if pulse is None:
+                    raise RuntimeError("no pulse connection")
+                future.set_result(fn(pulse, *args))
+            except Exception as e:
+                future.set_exception(e)
+
+        if pulse is not None and hasattr(pulse, 'close'):
+            pulse.close()
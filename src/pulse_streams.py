@@ -0,0 +1,129 @@
+import threading
+
+# Stream properties an application is recognised by
+APP_KEYS = ('application.name', 'application.process.binary', 'application.id')
+
+
+class CaptureStreams:
+    """
+    Capture streams (pulse source-outputs) of chosen applications, indexed by app,
+    for muting those apps' mic input instead of the whole source.
+
+    `apps` are matched case-insensitively against a stream's application name,
+    process binary or id. load() lists the server's streams once; after that
+    apply_event() keeps the index current from the event watcher, at most one
+    source_output_info per event, so a press never lists streams.
+
+    mute() and the watcher both mute streams (a new stream of a muted app is
+    muted as it appears); `lock` keeps them from interleaving.
+    """
+
+    def __init__(self, apps):
+        self.apps = {a.lower() for a in apps}
+        self.lock = threading.Lock()
+        self._by_app = {}   # app -> {stream index: stream}
+        self._app_of = {}   # stream index -> app, for the streams we keep
+        self._removed = set()  # indexes removed by events while load() was listing
+        self._loading = False
+        self.desired = None # mute state last asked for
+        self.issued = 0
+        self.skipped = 0
+        self.corrected = 0
+
+    def match(self, stream):
+        props = stream.proplist
+        for key in APP_KEYS:
+            value = props.get(key)
+            if value and value.lower() in self.apps:
+                return value.lower()
+        return None
+
+    def load(self, pulse):
+        # Events keep arriving while the list is on its way. Merge the listing
+        # into the index instead of replacing it: a stream added meanwhile is
+        # kept, and one removed meanwhile isn't brought back from the listing.
+        with self.lock:
+            self._loading = True
+            self._removed = set()
+        streams = []
+        try:
+            streams = pulse.source_output_list()
+        finally:
+            with self.lock:
+                self._loading = False
+                for stream in streams:
+                    if stream.index not in self._app_of and stream.index not in self._removed:
+                        self._add(stream)
+                self._removed = set()
+
+    def _add(self, stream):
+        app = self.match(stream)
+        if app is not None:
+            self._by_app.setdefault(app, {})[stream.index] = stream
+            self._app_of[stream.index] = app
+        return app
+
+    def _remove(self, index):
+        app = self._app_of.pop(index, None)
+        if app is not None:
+            streams = self._by_app[app]
+            del streams[index]
+            if not streams:
+                del self._by_app[app]
+
+    def apply_event(self, pulse, ev):
+        """A source_output event, on the watcher thread with its own connection."""
+        if ev.t == 'remove':
+            with self.lock:
+                self._remove(ev.index)
+                if self._loading:
+                    self._removed.add(ev.index)
+            return
+        if ev.t == 'change' and ev.index not in self._app_of:
+            return  # not an app of ours, and a stream doesn't change app
+        try:
+            stream = pulse.source_output_info(ev.index)
+        except Exception:
+            return  # closed again already, its remove event follows
+        with self.lock:
+            self._remove(ev.index)
+            if self._add(stream) is None or self.desired is None:
+                return
+            if bool(stream.mute) != self.desired:
+                # A new stream while muted (the app rejoined a call), or one
+                # unmuted from outside
+                if self._mute_one(pulse, stream, self.desired) is None:
+                    self.corrected += 1
+
+    def mute(self, pulse, is_muted):
+        """Mutes or unmutes every stream of the apps; raises with the ones that failed."""
+        errors = []
+        with self.lock:
+            self.desired = is_muted
+            for streams in self._by_app.values():
+                for stream in streams.values():
+                    error = self._mute_one(pulse, stream, is_muted)
+                    if error:
+                        errors.append(error)
+        if errors:
+            raise RuntimeError("capture streams " + ", ".join(errors))
+
+    def _mute_one(self, pulse, stream, is_muted):
+        if bool(stream.mute) == is_muted:
+            self.skipped += 1
+            return None
+        try:
+            pulse.source_output_mute(stream.index, is_muted)
+        except Exception as e:
+            # Usually closed just now; the remove event drops it from the index
+            return f"{stream.index}: {e}"
+        stream.mute = is_muted
+        self.issued += 1
+        return None
+
+    def summary(self):
+        with self.lock:
+            return {app: len(streams) for app, streams in self._by_app.items()}
+
+    def __len__(self):
+        return len(self._app_of)
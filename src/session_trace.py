@@ -0,0 +1,154 @@
+import json
+import queue
+import struct
+import threading
+import time
+from latency import now_ns
+
+# Session traces: what a PTT session saw, for replaying it later
+# (benchmarks/replay_trace.py). Append-only binary file:
+#
+#   MAGIC, then fixed 16-byte records <t_ns u64, kind u8, flags u8, code u16, arg u32>
+#   t_ns   monotonic ns since the trace started
+#   KEY    code = scan code, flags = 1 down / 0 up (bound triggers and modifiers only;
+#          other keys are never written, a trace is not a keylogger)
+#   SIGNAL code = binding index, flags = is_down, arg = hook -> slot latency ns
+#   MUTE   code = target (0 selected device, 1 one device, n group of n),
+#          flags = is_muted | 2 if it failed, arg = backend call duration ns
+#   META   arg = length of the JSON that follows, padded to whole records
+#          (bindings and key codes, written whenever the hotkeys are armed)
+MAGIC = b"PTTTRC01"
+RECORD = struct.Struct('<QBBHI')
+KEY, SIGNAL, MUTE, META = 1, 2, 3, 4
+ARG_MAX = 2 ** 32 - 1
+CHUNK_RECORDS = 4096
+FLUSH_INTERVAL = 1.0  # seconds; a partial chunk is written at least this often
+
+# The running recorder, if any; hooks check this and do nothing when it is None
+active = None
+
+
+class TraceRecorder:
+    """
+    Packs records into a preallocated chunk under a lock (a pack_into and an add);
+    full chunks go to a writer thread, so no hook ever waits on the disk. The
+    writer also writes out a partial chunk every `flush_interval` seconds, so a
+    session that hangs or is killed loses at most that much.
+    """
+
+    def __init__(self, path, chunk_records=CHUNK_RECORDS, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.t0 = now_ns()
+        self.records = 0
+        self._chunk_size = chunk_records * RECORD.size
+        self._buf = bytearray(self._chunk_size)
+        self._pos = 0
+        self._lock = threading.Lock()
+        self._chunks = queue.SimpleQueue()
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+        self._writer = threading.Thread(target=self._write_loop, name="trace-writer", daemon=True)
+        self._writer.start()
+
+    def _add(self, kind, flags, code, arg):
+        t = now_ns() - self.t0
+        with self._lock:
+            RECORD.pack_into(self._buf, self._pos, t, kind, flags, code, arg)
+            self._pos += RECORD.size
+            self.records += 1
+            if self._pos == self._chunk_size:
+                self._chunks.put(self._buf)
+                self._buf = bytearray(self._chunk_size)
+                self._pos = 0
+
+    def key(self, code, down):
+        self._add(KEY, down, code, 0)
+
+    def signal(self, index, is_down, latency_ns):
+        self._add(SIGNAL, is_down, index, max(0, min(latency_ns, ARG_MAX)))
+
+    def mute(self, target, is_muted, failed, duration_ns):
+        self._add(MUTE, is_muted | (2 if failed else 0), target, max(0, min(duration_ns, ARG_MAX)))
+
+    def meta(self, **info):
+        data = json.dumps(info).encode()
+        padded = data + b' ' * (-len(data) % RECORD.size)
+        with self._lock:
+            # Flush what we have so the blob lands right after its header record
+            self._chunks.put(self._buf[:self._pos])
+            self._buf = bytearray(self._chunk_size)
+            self._pos = 0
+            self._chunks.put(RECORD.pack(now_ns() - self.t0, META, 0, 0, len(data)) + padded)
+            self.records += 1
+
+    def close(self):
+        with self._lock:
+            self._chunks.put(self._buf[:self._pos])
+            self._pos = 0
+            self._chunks.put(None)
+        self._writer.join()
+        self._file.close()
+
+    def _write_loop(self):
+        while True:
+            try:
+                chunk = self._chunks.get(timeout=self.flush_interval)
+            except queue.Empty:
+                # Queued rather than written here, so it lands after any full
+                # chunk put in the meantime
+                with self._lock:
+                    if self._pos:
+                        self._chunks.put(bytes(self._buf[:self._pos]))
+                        self._pos = 0
+                continue
+            if chunk is None:
+                return
+            self._file.write(chunk)
+            self._file.flush()  # out of our buffer: survives the process being killed
+
+
+def start(path):
+    global active
+    stop()
+    active = TraceRecorder(path)
+    return active
+
+def stop():
+    global active
+    recorder, active = active, None
+    if recorder is not None:
+        recorder.close()
+
+def read_trace(path):
+    """Yields (t_ns, kind, flags, code, arg); META records come as (t_ns, META, 0, 0, dict)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a PTT trace")
+    view = memoryview(data)[len(MAGIC):]
+    pos, end = 0, len(view) - len(view) % RECORD.size
+    while pos < end:
+        t, kind, flags, code, arg = RECORD.unpack_from(view, pos)
+        pos += RECORD.size
+        if kind == META:
+            blob = bytes(view[pos:pos + arg])
+            pos += arg + (-arg % RECORD.size)
+            yield t, META, 0, 0, json.loads(blob)
+        else:
+            yield t, kind, flags, code, arg
+
+def describe(path):
+    """Record counts and latency summaries of a trace, for a quick look."""
+    counts = {KEY: 0, SIGNAL: 0, MUTE: 0, META: 0}
+    signal_ns, mute_ns, last = [], [], 0
+    for t, kind, flags, code, arg in read_trace(path):
+        counts[kind] += 1
+        last = t
+        if kind == SIGNAL:
+            signal_ns.append(arg)
+        elif kind == MUTE:
+            mute_ns.append(arg)
+    return {'duration_s': last / 1e9, 'keys': counts[KEY], 'signals': counts[SIGNAL],
+            'mutes': counts[MUTE], 'arms': counts[META],
+            'signal_ns': sorted(signal_ns), 'mute_ns': sorted(mute_ns)}
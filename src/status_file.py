@@ -0,0 +1,214 @@
+import os
+import sys
+import mmap
+import time
+import struct
+import logging
+import threading
+
+# Live PTT state in a small memory-mapped file, for overlays and tally lights
+# that poll it: a read is a few loads from shared memory, no syscall, nothing
+# to parse. Fixed layout, little-endian, 128 bytes:
+#
+#    0  4s   magic b"PTTS"
+#    4  u16  layout version
+#    6  u16  record size
+#    8  u64  sequence: odd while the app is writing, +2 per update
+#   16  u8   transmitting (1 = mic open)
+#   17  u8   running (0 once the app has exited)
+#   18  i16  binding that made the last transition, -1 = none yet
+#   20  u32  pid of the app
+#   24  u64  last transition, CLOCK_MONOTONIC ns (time.monotonic_ns() here)
+#   32  u64  transitions since the app started
+#   40  88s  active device name, UTF-8, NUL padded
+#
+# Seqlock: the writer makes the sequence odd, writes the fields, makes it even
+# again. A reader copies the fields between two loads of the sequence and
+# retries unless both are the same even value. The file is reused across
+# restarts (same inode), so a reader's mapping stays valid.
+STATUS_NAME = "phantom-ptt.status"
+MAGIC = b"PTTS"
+VERSION = 1
+SEQ = struct.Struct("<Q")
+SEQ_OFFSET = 8
+HEADER = struct.Struct("<4sHH")
+FIELDS = struct.Struct("<BBhIQQ88s")
+FIELDS_OFFSET = 16
+SIZE = FIELDS_OFFSET + FIELDS.size  # 128
+DEVICE_LEN = 88
+
+
+def default_path():
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return os.path.join(runtime, STATUS_NAME)
+    return os.path.expanduser("~/." + STATUS_NAME.replace("-", "_"))
+
+
+def _device_bytes(name):
+    data = (name or "").encode("utf-8")[:DEVICE_LEN]
+    # Don't leave half a character at the cut
+    return data.decode("utf-8", "ignore").encode("utf-8")
+
+
+class StatusWriter:
+    """
+    Writes the status record; publish() from any thread. Each update is two
+    stores of the sequence and one of the fields into the mapping, no syscall.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        self.map = None
+        self.transmitting = False
+        self.binding = -1
+        self.device = b""
+        self.changed_ns = 0
+        self.transitions = 0
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def open(self):
+        """Maps the file, creating it if needed; False (and logged) if it can't."""
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if os.fstat(fd).st_size != SIZE:
+                    os.ftruncate(fd, SIZE)
+                self.map = mmap.mmap(fd, SIZE)
+            finally:
+                os.close(fd)  # the mapping keeps the file
+        except (OSError, ValueError) as e:
+            logging.error("Status file %s: %s", self.path, e)
+            return False
+        if self.map[:4] == MAGIC:
+            # Carry on from the last run, so readers never see the sequence go back
+            seq = SEQ.unpack_from(self.map, SEQ_OFFSET)[0]
+            self._seq = seq + (seq & 1)
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, SIZE)
+        self._write(running=True)
+        return True
+
+    def publish(self, transmitting=None, device=None, binding=None):
+        """Updates the given fields; a change of `transmitting` is a transition."""
+        with self._lock:
+            if self.map is None:
+                return
+            if transmitting is not None and transmitting != self.transmitting:
+                self.transmitting = transmitting
+                self.changed_ns = time.monotonic_ns()
+                self.transitions += 1
+            if binding is not None:
+                self.binding = binding
+            if device is not None:
+                self.device = _device_bytes(device)
+            self._write(running=True)
+
+    def _write(self, running):
+        self._seq += 1
+        SEQ.pack_into(self.map, SEQ_OFFSET, self._seq)
+        FIELDS.pack_into(self.map, FIELDS_OFFSET, self.transmitting, running, self.binding,
+                         os.getpid(), self.changed_ns, self.transitions, self.device)
+        self._seq += 1
+        SEQ.pack_into(self.map, SEQ_OFFSET, self._seq)
+
+    def close(self):
+        """Marks the record not running; the file stays for the next start."""
+        with self._lock:
+            if self.map is None:
+                return
+            self.transmitting = False
+            self._write(running=False)
+            self.map.close()
+            self.map = None
+
+
+def create_writer(setting):
+    """Opened StatusWriter for the "status_file" setting (true or a path), None if off or failed."""
+    if not setting:
+        return None
+    writer = StatusWriter(setting if isinstance(setting, str) else None)
+    return writer if writer.open() else None
+
+
+class StatusReader:
+    """
+    Reads the record from another process. read() returns a dict, or None if the
+    app is mid-update for longer than `spins` tries. changed() only compares the
+    sequence, for loops that poll often and read rarely.
+    """
+
+    def __init__(self, path=None, spins=1000):
+        self.path = path or default_path()
+        self.spins = spins
+        with open(self.path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), SIZE, access=mmap.ACCESS_READ)
+        magic, version, size = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION or size != SIZE:
+            self.map.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} status file")
+        self.seq = None
+        self.retries = 0  # reads that caught the app mid-update
+
+    def changed(self):
+        seq = SEQ.unpack_from(self.map, SEQ_OFFSET)[0]
+        return seq != self.seq
+
+    def read(self):
+        for _ in range(self.spins):
+            before = SEQ.unpack_from(self.map, SEQ_OFFSET)[0]
+            if not before & 1:
+                fields = FIELDS.unpack_from(self.map, FIELDS_OFFSET)
+                if SEQ.unpack_from(self.map, SEQ_OFFSET)[0] == before:
+                    break
+            self.retries += 1
+        else:
+            return None
+        self.seq = before
+        transmitting, running, binding, pid, changed_ns, transitions, device = fields
+        return {"seq": before, "transmitting": bool(transmitting), "running": bool(running),
+                "binding": binding if binding >= 0 else None, "pid": pid,
+                "changed_ns": changed_ns, "transitions": transitions,
+                "device": device.rstrip(b"\0").decode("utf-8", "replace")}
+
+    def close(self):
+        self.map.close()
+
+
+def _read_settled(reader):
+    # read() gives up while the app is mid-update (it may have been preempted
+    # there); give it the CPU and try again rather than report nothing
+    while True:
+        record = reader.read()
+        if record is not None:
+            return record
+        time.sleep(0.001)
+
+
+def main():
+    """python src/status_file.py [--watch] [--path P]: prints the record."""
+    import json
+    import argparse
+    parser = argparse.ArgumentParser(description="Phantom PTT status file")
+    parser.add_argument("--path", help=f"default: {default_path()}")
+    parser.add_argument("--watch", action="store_true", help="print every change until Ctrl+C")
+    args = parser.parse_args()
+    try:
+        reader = StatusReader(args.path)
+    except (OSError, ValueError) as e:
+        print(f"No status: {e}", file=sys.stderr)
+        return 2
+    try:
+        print(json.dumps(_read_settled(reader)), flush=True)
+        while args.watch:
+            time.sleep(0.01)
+            if reader.changed():
+                print(json.dumps(_read_settled(reader)), flush=True)
+    except KeyboardInterrupt:
+        pass
+    reader.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QPushButton
+from PyQt6.QtCore import QTimer
+from latency import recorder
+
+class LatencyPanel(QWidget):
+    """Debug window showing the per-stage PTT latency histograms."""
+
+    def __init__(self, parent=None, extra_stats=None, dump_log=None):
+        super().__init__(parent)
+        # Callable returning more lines to show under the table
+        self.extra_stats = extra_stats
+        # Callable writing the recent log records to a file, returning its path
+        self.dump_log = dump_log
+        self.setWindowTitle("Phantom PTT - Latency")
+        self.resize(620, 260)
+        self.setStyleSheet("background: rgb(20, 20, 20); color: white;")
+
+        layout = QVBoxLayout(self)
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setStyleSheet("font-family: monospace; font-size: 11px; border: 1px solid gray;")
+        layout.addWidget(self.text)
+
+        buttons = QHBoxLayout()
+        btn_reset = QPushButton("RESET")
+        btn_reset.setStyleSheet("background: white; color: black; font-weight: bold; padding: 3px;")
+        btn_reset.clicked.connect(self.reset)
+        buttons.addStretch()
+        if dump_log:
+            btn_dump = QPushButton("DUMP LOG")
+            btn_dump.setStyleSheet("background: white; color: black; font-weight: bold; padding: 3px;")
+            btn_dump.clicked.connect(self.dump)
+            buttons.addWidget(btn_dump)
+        buttons.addWidget(btn_reset)
+        layout.addLayout(buttons)
+
+        # Only poll while the panel is on screen
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+
+    def refresh(self):
+        text = recorder.format_table()
+        if self.extra_stats:
+            text += "\n\n" + self.extra_stats()
+        self.text.setPlainText(text)
+
+    def reset(self):
+        recorder.reset()
+        self.refresh()
+
+    def dump(self):
+        try:
+            path = self.dump_log()
+        except OSError as e:
+            path = f"failed: {e}"
+        self.setWindowTitle(f"Phantom PTT - Latency (log dumped to {path})")
+
+    def showEvent(self, event):
+        self.refresh()
+        self.timer.start(1000)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
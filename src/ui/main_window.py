@@ -1,50 +1,103 @@
 from PyQt6.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout, 
                              QWidget, QLabel, QLineEdit, QPushButton, QMessageBox, QComboBox) # Added QComboBox
-from PyQt6.QtCore import Qt, pyqtSlot
+from PyQt6.QtCore import Qt, pyqtSlot, pyqtSignal
 from PyQt6.QtGui import QIcon
 from ui.visuals import VisualsWidget
-from audio_manager import AudioController
-from key_listener import PTTListener
-import os
 import logging
+import threading
 import config
-
-# Setup logging
-log_path = os.path.expanduser("~/.phantom_ptt_debug.log")
-logging.basicConfig(filename=log_path, level=logging.INFO, 
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+import app_log
+from headless import HeadlessPTT
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    # Emitted from the audio worker thread, delivered queued on the GUI thread
+    mute_done = pyqtSignal(bool, object, object)
+    device_event = pyqtSignal(str, object)              # DeviceRegistry kind, device
+    meter_ready = pyqtSignal(object, object)            # device id, LevelMeter
+    device_set = pyqtSignal(object, object, object)     # (dev_id, name, save), result, error
+    remote_device = pyqtSignal(object)                  # dev_id, from the control socket thread
+
+    def __init__(self, core=None):
         super().__init__()
         self.setWindowTitle("Phantom PTT")
         self.resize(600, 450) # Taller for combo box
-        
-        logging.info("App Started")
-        
-        # Core Logic
-        self.audio = AudioController()
-        self.listener = PTTListener()
-        self.listener.pressed.connect(self.on_ptt_press)
-        self.listener.released.connect(self.on_ptt_release)
-        
-        self.devices = []
-        
-        # Load Config
-        self.app_config = config.load_config()
-        logging.info(f"Loaded Config: {self.app_config}")
-        self.current_hotkey = self.app_config.get("hotkey", "num 0")
-        
-        # Setup UI
+
+        # The PTT work (listener, audio controller, control socket, status file)
+        # is done by a HeadlessPTT core; this window shows it and edits it. In
+        # tray mode `core` is the TrayPTT, which outlives the window: it is built
+        # when opened and destroyed when closed. Otherwise the window runs its own.
+        self.owns_core = core is None
+        if core is None:
+            logging.info("App Started")
+            # Saves are written behind, off the GUI thread; app_config is the store's dict
+            core = HeadlessPTT(config_store=config.ConfigStore())
+            logging.info("Loaded Config: %s", core.app_config)
+            # The hook is armed before any widget is built; the audio backend
+            # connects on its own thread and devices fill in once it is up
+            core.arm()
+            core.start_services()
+        else:
+            self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.core = core
+        self.config_store = core.config_store
+        self.app_config = core.app_config
+        # The input edits the first binding; any further ones come from the config file
+        self.bindings = core.bindings
+        self.groups = core.groups
+        self.audio = core.audio
+        self.listener = core.listener
+        self.current_hotkey = self.bindings[0]["hotkey"]
+
+        self.mute_done.connect(self.on_mute_done)
+        self.device_event.connect(self.on_device_event)
+        self.device_set.connect(self.on_device_set)
+        self.remote_device.connect(self.on_remote_device)
+        self.meter_ready.connect(self.on_meter_ready)
+        self.latency_panel = None
+        # Kept so unsubscribe() gets the same object back
+        self._device_listener = self.device_event.emit
+        self._attach(core)
+        if self.owns_core:
+            self.refresh_devices()
+
+    @property
+    def armed_ns(self):
+        return self.core.armed_ns
+
+    def _attach(self, core):
+        # The core may already be running (tray); pick up its current state
+        self.listener.binding_event.connect(self.show_binding_event)
+        self.audio.devices.subscribe(self._device_listener)
+        core.view = self
+
         self.stack_ui()
-        
-        # Initialize
-        self.refresh_devices()
         self.hotkey_input.setText(self.current_hotkey)
-        self.apply_hotkey()
+        if core.arm_error is not None or core.armed_ns is not None:
+            self._show_armed(core.arm_error)  # else the helper hasn't answered yet
+        if core.muted is not None:
+            self._show_muted(core.muted)
+        self.combo_dev.blockSignals(True)
+        for dev in self.audio.devices.devices():
+            self.combo_dev.addItem(dev['name'], dev['id'])
+        self.combo_dev.setCurrentIndex(self.combo_dev.findData(core.device_id))
+        self.combo_dev.blockSignals(False)
+        if core.device_id is not None:
+            self.device_label.setText(f"Active: {(core.device_name or '')[:30]}")
+            self._attach_meter(core.device_id)
+
+    def _detach(self):
+        # Let go of the core; in tray mode it keeps running
+        self.core.view = None
+        self.listener.binding_event.disconnect(self.show_binding_event)
+        self.audio.devices.unsubscribe(self._device_listener)
+        self.visuals.set_level_meter(None)
+        if self.latency_panel:
+            self.latency_panel.close()
+            self.latency_panel.deleteLater()
+            self.latency_panel = None
 
     def stack_ui(self):
-        self.visuals = VisualsWidget()
+        self.visuals = VisualsWidget(low_power=self.app_config.get("low_power", False))
         self.setCentralWidget(self.visuals)
         
         layout = QVBoxLayout(self.visuals)
@@ -91,6 +144,11 @@ class MainWindow(QMainWindow):
         c_layout.addWidget(lbl_key)
         c_layout.addWidget(self.hotkey_input)
         c_layout.addWidget(btn_apply)
+
+        btn_latency = QPushButton("LATENCY")
+        btn_latency.setStyleSheet("background: transparent; color: gray; font-family: monospace; font-size: 10px;")
+        btn_latency.clicked.connect(self.show_latency_panel)
+        c_layout.addWidget(btn_latency)
         
         layout.addWidget(controls)
         
@@ -107,26 +165,67 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.device_label)
         
     def refresh_devices(self):
+        # One full enumeration in the background; after that, backends that report
+        # hot-plug (Linux) keep the list current through device_event
         logging.info("Refreshing devices...")
-        self.devices = self.audio.get_input_devices()
-        
+        self.audio.refresh_devices(
+            lambda devices, error: error and self.device_event.emit('error', error))
+
+    @pyqtSlot(str, object)
+    def on_device_event(self, kind, device):
+        if kind == 'error':
+            self.device_label.setText(f"Error: {device}")
+            logging.error("Failed to list devices: %s", device)
+        elif kind == 'reset':
+            self._fill_devices(device)
+        elif kind == 'add':
+            self.combo_dev.blockSignals(True)
+            self.combo_dev.addItem(device['name'], device['id'])
+            self.combo_dev.blockSignals(False)
+            logging.info("Device added: %s [%s]", device['name'], device['id'])
+            # The saved device coming back (replugged, server restarted) takes over
+            # again. Any other device only if none was ever active: after the active
+            # mic is unplugged, PTT is not moved to whatever is plugged in next.
+            saved_key = self.app_config.get("device_key")
+            if device['key'] == saved_key or self.core.device_id is None:
+                self._select_device(device['id'])
+        else:
+            index = self.combo_dev.findData(device['id'])
+            if index < 0:
+                return
+            if kind == 'update':
+                self.combo_dev.setItemText(index, device['name'])
+            elif kind == 'remove':
+                was_current = index == self.combo_dev.currentIndex()
+                self.combo_dev.blockSignals(True)
+                self.combo_dev.removeItem(index)
+                if was_current:
+                    # Don't silently move PTT to another mic
+                    self.combo_dev.setCurrentIndex(-1)
+                    self.device_label.setText(f"Disconnected: {device['name'][:30]}")
+                self.combo_dev.blockSignals(False)
+                logging.info("Device removed: %s [%s]", device['name'], device['id'])
+
+    def _fill_devices(self, devices):
         self.combo_dev.blockSignals(True) # Prevent triggering on_user_device_change
         self.combo_dev.clear()
-        
-        saved_id = self.app_config.get("device_id")
-        target_index = 0
-        
-        for i, dev in enumerate(self.devices):
+        for dev in devices:
             self.combo_dev.addItem(dev['name'], dev['id'])
-            # Log for debug
-            # logging.info(f"Examining Dev: {dev['name']} ID: {dev['id']} vs Saved: {saved_id}")
-            if saved_id is not None and str(dev['id']) == str(saved_id):
-                target_index = i
-                logging.info(f"Found match at index {i}")
-            
-        self.combo_dev.setCurrentIndex(target_index)
         self.combo_dev.blockSignals(False)
         
+        # Saved device by its stable key, falling back to the id older configs kept
+        saved = self.audio.devices.resolve(self.app_config.get("device_key"), self.app_config.get("device_id"))
+        if saved is not None:
+            logging.info("Found saved device %s", saved['name'])
+        self._select_device(saved['id'] if saved else (devices[0]['id'] if devices else None))
+
+    def _select_device(self, dev_id):
+        index = self.combo_dev.findData(dev_id)
+        if index < 0:
+            return
+        self.combo_dev.blockSignals(True)
+        self.combo_dev.setCurrentIndex(index)
+        self.combo_dev.blockSignals(False)
         # Apply without saving (load phase)
         self._activate_device(save=False)
 
@@ -139,18 +238,46 @@ class MainWindow(QMainWindow):
         
         dev_id = self.combo_dev.currentData()
         name = self.combo_dev.currentText()
-        logging.info(f"Activating device: {name} [{dev_id}] Save={save}")
+        logging.info("Activating device: %s [%s] Save=%s", name, dev_id, save)
         
-        success, msg = self.audio.set_device(dev_id)
+        request = (dev_id, name, save)
+        self.audio.set_device_async(
+            dev_id, lambda result, error: self.device_set.emit(request, result, error))
+
+    @pyqtSlot(object, object, object)
+    def on_device_set(self, request, result, error):
+        dev_id, name, save = request
+        success, msg = result if result else (False, error)
         if success:
              self.device_label.setText(f"Active: {name[:30]}")
-             if save:
-                 self.app_config["device_id"] = dev_id
-                 config.save_config(self.app_config)
-                 logging.info("Config saved.")
+             self._attach_meter(dev_id)
+             self.core.device_active(dev_id, name, save)
         else:
              self.device_label.setText(f"Error: {msg}")
-             logging.error(f"Failed to set device: {msg}")
+             logging.error("Failed to set device: %s", msg)
+
+    def _attach_meter(self, dev_id):
+        opener = self.audio.level_stream(dev_id)
+        if opener is None:
+            self.visuals.set_level_meter(None)
+            return
+        # numpy takes ~100 ms to import; build the meter off the GUI thread
+        threading.Thread(target=self._build_meter, args=(dev_id, opener), daemon=True).start()
+
+    def _build_meter(self, dev_id, opener):
+        try:
+            from level_meter import LevelMeter
+        except ImportError:
+            return  # numpy missing, no meter
+        try:
+            self.meter_ready.emit(dev_id, LevelMeter(opener))
+        except RuntimeError:
+            pass  # window closed meanwhile (tray mode)
+
+    @pyqtSlot(object, object)
+    def on_meter_ready(self, dev_id, meter):
+        if dev_id == self.combo_dev.currentData():
+            self.visuals.set_level_meter(meter)
 
     def apply_hotkey(self):
         key = self.hotkey_input.text()
@@ -158,28 +285,64 @@ class MainWindow(QMainWindow):
             return
             
         self.current_hotkey = key
+        self.bindings[0]["hotkey"] = key
         # Save to config
-        self.app_config["hotkey"] = self.current_hotkey
-        config.save_config(self.app_config)
+        self.config_store.update(bindings=self.bindings)
         
         self.device_label.setText(f"Target: {self.combo_dev.currentText()}")
         
-        # Init Listener
-        try:
-            self.listener.start_listening(self.current_hotkey)
+        # Init Listener; the core shows the outcome here once it is known
+        self.core.arm()
+
+    def _show_armed(self, error):
+        if error is None:
             self.status_label.setText("SYSTEM ARMED - READY")
             self.status_label.setStyleSheet("color: #00ffff;")
-        except Exception as e:
-            self.status_label.setText(f"KEY ERROR: {e}")
-
-    @pyqtSlot()
-    def on_ptt_press(self):
-        self.status_label.setText("<<< TRANSMITTING >>>")
-        self.status_label.setStyleSheet("color: red; font-weight: bold;")
-        self.audio.set_mute(False) # Unmute
-
-    @pyqtSlot()
-    def on_ptt_release(self):
-        self.status_label.setText("--- MUTED ---")
-        self.status_label.setStyleSheet("color: gray;")
-        self.audio.set_mute(True) # Mute
+        else:
+            self.status_label.setText(f"KEY ERROR: {error}")
+
+    @pyqtSlot(object, bool, object)
+    def show_binding_event(self, binding, is_down, stamp):
+        # The core applies the mute, this only shows it
+        self._show_muted(binding.mute_state(is_down))
+
+    def _show_muted(self, is_muted):
+        if is_muted:
+            self.status_label.setText("--- MUTED ---")
+            self.status_label.setStyleSheet("color: gray;")
+        else:
+            self.status_label.setText("<<< TRANSMITTING >>>")
+            self.status_label.setStyleSheet("color: red; font-weight: bold;")
+
+    @pyqtSlot(bool, object, object)
+    def on_mute_done(self, is_muted, error, results):
+        # Forwarded by the core, which has logged and published it
+        if error:
+            self.device_label.setText(f"Mute Error: {error}")
+
+    @pyqtSlot(object)
+    def on_remote_device(self, dev_id):
+        index = self.combo_dev.findData(dev_id)
+        if index >= 0 and index != self.combo_dev.currentIndex():
+            self.combo_dev.setCurrentIndex(index)  # saved, as if picked by hand
+
+    def show_latency_panel(self):
+        if self.latency_panel is None:
+            from ui.latency_panel import LatencyPanel
+            self.latency_panel = LatencyPanel(extra_stats=self.render_stats, dump_log=app_log.dump_recent)
+        self.latency_panel.show()
+        self.latency_panel.raise_()
+
+    def render_stats(self):
+        mutes = ", ".join(f"{k} {v}" for k, v in self.audio.mute_stats().items())
+        return (f"visuals: {self.visuals.frames_per_minute()} frames in the last minute, "
+                f"{self.visuals.frames_rendered} total\n"
+                f"mutes: {mutes}, stuck keys released {self.listener.stuck_releases}")
+
+    def closeEvent(self, event):
+        if self.owns_core:
+            logging.info("visuals: %s frames rendered", self.visuals.frames_rendered)
+        self._detach()
+        if self.owns_core:
+            self.core.stop()
+        super().closeEvent(event)
@@ -0,0 +1,112 @@
+import gc
+import sys
+import ctypes
+import logging
+from PyQt6.QtWidgets import QApplication, QSystemTrayIcon, QMenu
+from PyQt6.QtCore import Qt, pyqtSlot
+from PyQt6.QtGui import QIcon, QPixmap, QPainter, QColor
+import config
+from headless import HeadlessPTT, handle_signals
+
+# Icon colour by mute state, as the window's status line: armed, muted, transmitting
+ICON_COLORS = {None: "#00ffff", True: "gray", False: "red"}
+
+def _dot_icon(color):
+    pixmap = QPixmap(32, 32)
+    pixmap.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.setBrush(QColor(color))
+    painter.drawEllipse(4, 4, 24, 24)
+    painter.end()
+    return QIcon(pixmap)
+
+def _trim_heap():
+    # glibc keeps freed memory (the frame images, widget trees) in its arenas;
+    # hand it back so closing the window actually shrinks the process
+    if not sys.platform.startswith("linux"):
+        return
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass  # not glibc (musl)
+
+class TrayPTT(HeadlessPTT):
+    """
+    Tray mode: the headless core plus a tray icon. MainWindow (and with it the
+    visuals, their render thread and the level meter) exists only while it is
+    open: it is built on Open and destroyed, not hidden, on close.
+    """
+
+    def __init__(self):
+        super().__init__(config_store=config.ConfigStore())
+        self.window = None
+        self.icons = {state: _dot_icon(color) for state, color in ICON_COLORS.items()}
+        self.tray = QSystemTrayIcon(self.icons[None])
+        self.tray.setToolTip("Phantom PTT")
+        self.menu = QMenu()
+        self.menu.addAction("Open", self.open_window)
+        self.menu.addSeparator()
+        self.menu.addAction("Quit", QApplication.quit)
+        self.tray.setContextMenu(self.menu)
+        self.tray.activated.connect(self.on_tray_activated)
+
+    def start(self):
+        if not super().start():
+            return False
+        self.tray.show()
+        if not QSystemTrayIcon.isSystemTrayAvailable():
+            # Nothing to click on; the window is the only way in
+            logging.warning("No system tray available, opening the window")
+            self.open_window()
+        return True
+
+    @pyqtSlot(object, bool, object)
+    def on_binding_event(self, binding, is_down, stamp):
+        super().on_binding_event(binding, is_down, stamp)
+        self.tray.setIcon(self.icons[self.muted])
+        self.tray.setToolTip("Phantom PTT - " + ("muted" if self.muted else "TRANSMITTING"))
+
+    def on_tray_activated(self, reason):
+        if reason != QSystemTrayIcon.ActivationReason.Trigger:
+            return
+        if self.window is None:
+            self.open_window()
+        else:
+            self.window.close()
+
+    def open_window(self):
+        if self.window is None:
+            from ui.main_window import MainWindow
+            self.window = MainWindow(core=self)
+            self.window.destroyed.connect(self._window_destroyed)
+            self.window.show()
+        self.window.raise_()
+        self.window.activateWindow()
+
+    def _window_destroyed(self):
+        self.window = None
+        # Widgets hold reference cycles through their slots; free them now, not
+        # whenever the collector next runs
+        gc.collect()
+        _trim_heap()
+
+    def stop(self):
+        if self.window is not None:
+            self.window.close()
+        self.tray.hide()
+        super().stop()
+
+def run(argv):
+    app = QApplication(argv)
+    # Closing the window only goes back to the tray
+    app.setQuitOnLastWindowClosed(False)
+    tray = TrayPTT()
+    if not tray.start():
+        return 1
+
+    signals = handle_signals(app)
+    code = app.exec()
+    tray.stop()
+    return code
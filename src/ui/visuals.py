@@ -1,172 +1,404 @@
 import math
+import time
+import atexit
+import threading
+from collections import deque
 from PyQt6.QtWidgets import QWidget
-from PyQt6.QtCore import QTimer, Qt, QRectF, QPointF
-from PyQt6.QtGui import QPainter, QColor, QPen, QBrush, QPolygonF, QPainterPath
+from PyQt6.QtCore import Qt, QRect, QRectF, QPointF, QEvent, pyqtSignal
+from PyQt6.QtGui import QPainter, QColor, QPen, QBrush, QPolygonF, QImage, QRegion
+
+# Animation speed in units per second, so it looks the same at any frame rate
+GRID_SPEED = 60     # grid offset units (wraps at 100)
+CUBE_SPEED = 120    # degrees
+
+# Cube geometry. All 360 rotation states are built once into _cube_lut.
+CUBE_POINTS = [
+    (-1, -1, -1), (1, -1, -1), (1, 1, -1), (-1, 1, -1),
+    (-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)
+]
+# Fill faces to make it "Matte White Cube" not just wireframe
+CUBE_FACES = [
+     (0, 1, 2, 3), (4, 5, 6, 7), # Back, Front
+     (0, 1, 5, 4), (2, 3, 7, 6), # Bottom, Top?
+     (1, 2, 6, 5), (0, 3, 7, 4)  # Sides
+]
+CUBE_SCALE = 60
+# Half size of the box the cube can occupy: scale * sqrt(2) plus the pen
+CUBE_EXTENT = 90
+
+GRID_STEP = 100
+
+_cube_lut = None
+
+def cube_polygons(angle):
+    """Face polygons around (0, 0) for a rotation of `angle` degrees about X."""
+    global _cube_lut
+    if _cube_lut is None:
+        _cube_lut = [_build_cube(deg) for deg in range(360)]
+    return _cube_lut[int(angle) % 360]
+
+def _build_cube(deg):
+    rad = math.radians(deg)
+    cos_a = math.cos(rad)
+    sin_a = math.sin(rad)
+    points = []
+    for x, y, z in CUBE_POINTS:
+        # Rotate around X axis, y' = y*cos - z*sin (z' only matters for depth)
+        # Simple Projection (orthographic-ish)
+        points.append(QPointF(x * CUBE_SCALE, (y * cos_a - z * sin_a) * CUBE_SCALE))
+    return [QPolygonF([points[i] for i in face]) for face in CUBE_FACES]
+
+def pre_tinted(color, tint):
+    """
+    Colour that, drawn with its own alpha over an already tinted backdrop, gives the
+    same pixels as drawing `color` first and the tint over everything afterwards.
+    Lets the tint live in the cached static layer instead of a full fill per frame.
+    """
+    a = tint.alphaF()
+    return QColor.fromRgbF(
+        color.redF() * (1 - a) + tint.redF() * a,
+        color.greenF() * (1 - a) + tint.greenF() * a,
+        color.blueF() * (1 - a) + tint.blueF() * a,
+        color.alphaF())
+
+# Input level -> cube fill alpha, in steps (brushes are built once)
+LEVEL_STEPS = 16
+LEVEL_FLOOR_DB = -60
+LEVEL_DECAY = 0.85  # per frame, so a burst fades instead of blinking
+
+# Frame rates: (window focused, window in the background). Hidden/minimized = 0.
+NORMAL_FPS = (60, 10)
+LOW_POWER_FPS = (24, 2)
+
+class FrameRenderer:
+    """
+    Draws VisualsWidget's animation on its own thread, at its own frame rate,
+    into two QImages: it draws the back one while the GUI thread blits the front
+    one, then swaps them. The GUI thread only ever does that one image draw.
+
+    Each image keeps the frame it last held, so a new frame only redraws the
+    moving parts of both (the scrolling line strips and the cube box). When the
+    GUI thread is busy, frames are dropped rather than queued: at most one
+    frame_ready is pending, and the regions changed meanwhile pile up for it.
+    """
+
+    def __init__(self, widget, on_frame):
+        self.widget = widget      # style, geometry and drawing helpers
+        self.on_frame = on_frame  # called on this thread when a frame is ready
+        self.lock = threading.Lock()
+        self.front = None
+        self._back = None
+        self._front_ys = None     # line positions of the frame each image holds
+        self._back_ys = None
+        self._front_size = None   # (w, h, dpr) each image was made for
+        self._back_size = None
+        self._static = None
+        self._static_size = None
+        self._size = None         # (w, h, dpr) to draw at
+        self._pending = QRegion()
+        self._signalled = False
+        self.fps = 0
+        self.frames_rendered = 0
+        self._wake = threading.Event()
+        self._thread = None
+        self._stopped = False
+
+    def set_fps(self, fps):
+        """0 pauses the thread (hidden, minimized)."""
+        self.fps = fps
+        if fps and self._thread is None and not self._stopped:
+            self._thread = threading.Thread(target=self._run, name="visuals-render", daemon=True)
+            self._thread.start()
+            # A frame being drawn while Qt is torn down at exit would crash
+            atexit.register(self.stop)
+        self._wake.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(1.0)
+            atexit.unregister(self.stop)
+        # The widget is gone (or going); don't keep its frames alive
+        with self.lock:
+            self.front = self._back = self._static = None
+
+    def resize(self, w, h, dpr):
+        self._size = (w, h, dpr)
+        self._wake.set()
+
+    def take_region(self):
+        """Region changed since the last call; the GUI thread calls this on frame_ready."""
+        with self.lock:
+            region, self._pending = self._pending, QRegion()
+            self._signalled = False
+        return region
+
+    def _run(self):
+        next_t = time.monotonic()
+        while not self._stopped:
+            fps = self.fps
+            if not fps or self._size is None:
+                self._wake.wait()
+                self._wake.clear()
+                next_t = time.monotonic()
+                continue
+            now = time.monotonic()
+            if now < next_t:
+                self._wake.wait(next_t - now)
+                self._wake.clear()
+                continue
+            # Fell behind: skip ahead instead of bursting to catch up
+            next_t = max(next_t + 1 / fps, now)
+            self.render(now)
+
+    def render(self, now):
+        """Draws the frame for monotonic time `now` and makes it the front image."""
+        w, h, dpr = size = self._size
+        widget = self.widget
+        if self._back is None or self._back_size != size:
+            self._back = self._new_image(w, h, dpr)
+            self._back_ys = None
+            self._back_size = size
+        if self._static is None or self._static_size != size:
+            self._static_size = size
+            self._static = widget.draw_static(self._new_image(w, h, dpr), w, h)
+
+        t = now - widget._t0
+        grid_offset = (t * GRID_SPEED) % 100
+        angle = (t * CUBE_SPEED) % 360
+        meter = widget.level_meter
+        if meter is not None:
+            rms = meter.rms
+            db = 20 * math.log10(rms) if rms > 0 else LEVEL_FLOOR_DB
+            widget.level = max(min(1.0, 1 - db / LEVEL_FLOOR_DB), widget.level * LEVEL_DECAY)
+        ys = line_positions(h, grid_offset)
+        cube = cube_rect(w, h)
+
+        painter = QPainter(self._back)
+        if self._back_ys is not None:
+            # Only what moved since the frame this image still holds
+            painter.setClipRegion(strips_region(w, self._back_ys + ys).united(cube))
+        painter.drawImage(0, 0, self._static)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        # A 1px rect covers the same pixels as a 1px antialiased pen on y,
+        # and fills are far cheaper than stroked lines.
+        for y in ys:
+            painter.fillRect(QRectF(0, y - 0.5, w, 1), widget.line_fill)
+        widget.draw_cube(painter, w, h, angle, meter is not None)
+        painter.end()
+
+        with self.lock:
+            if self._front_size == size and self._front_ys is not None:
+                changed = strips_region(w, self._front_ys + ys).united(cube)
+            else:
+                changed = QRegion(0, 0, w, h)
+            self.front, self._back = self._back, self.front
+            self._front_ys, self._back_ys = ys, self._front_ys
+            self._front_size, self._back_size = size, self._front_size
+            self._pending = self._pending.united(changed)
+            signal = not self._signalled
+            self._signalled = True
+            self.frames_rendered += 1
+        if signal:
+            try:
+                self.on_frame()
+            except RuntimeError:
+                pass  # widget deleted while this frame was drawn
+
+    @staticmethod
+    def _new_image(w, h, dpr):
+        image = QImage(max(1, int(w * dpr)), max(1, int(h * dpr)), QImage.Format.Format_ARGB32_Premultiplied)
+        image.setDevicePixelRatio(dpr)
+        return image
+
+
+def line_positions(h, grid_offset):
+    """y of each scrolling grid line."""
+    if h <= 0:
+        return []
+    return [int((y + grid_offset) % h) for y in range(0, h, GRID_STEP)]
+
+def strips_region(w, ys):
+    region = QRegion()
+    for y in set(ys):
+        region = region.united(QRect(0, y - 2, w, 5))
+    return region
+
+def cube_rect(w, h):
+    cx = w // 2
+    cy = h // 2
+    return QRect(cx - CUBE_EXTENT, cy - CUBE_EXTENT, 2 * CUBE_EXTENT, 2 * CUBE_EXTENT)
+
 
 class VisualsWidget(QWidget):
-    def __init__(self, parent=None):
+    # From the render thread, delivered queued: a new front image is ready
+    frame_ready = pyqtSignal()
+
+    def __init__(self, parent=None, low_power=False):
         super().__init__(parent)
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_animation)
-        self.timer.start(16)  # ~60 FPS
-        
-        self.grid_offset = 0
-        self.angle_x = 0
-        self.angle_y = 0 # Keeping Y static or slow for better look, prompt said "X axis endlessly"
-        
+        self.active_fps, self.background_fps = LOW_POWER_FPS if low_power else NORMAL_FPS
+        # Drawing happens on the renderer's thread, started by _reschedule()
+        # once we are actually on screen
+        self.renderer = FrameRenderer(self, self.frame_ready.emit)
+        self.frame_ready.connect(self._on_frame_ready)
+        self.destroyed.connect(self.renderer.stop)
+        self._t0 = time.monotonic()
+        self._filtered_window = None
+        # Paint timestamps for frames_per_minute(), ~1 minute at 60 FPS
+        self._frame_times = deque(maxlen=3600)
+        self.frames_rendered = 0
+
         # Style constants
         self.bg_color = QColor(20, 20, 20) # Matte Black
         self.grid_color = QColor(255, 255, 255, 100) # White transparent
         self.cube_color = QColor(240, 240, 240) # Matte White
         self.tint_color = QColor(0, 100, 255, 90) # 35% Blue roughly (90/255)
+        self.line_color = QColor(255, 255, 255, 50)
+
+        # Colours for the moving parts, pre-tinted (see pre_tinted)
+        self.line_fill = pre_tinted(self.line_color, self.tint_color)
+        self.cube_pen = QPen(pre_tinted(self.cube_color, self.tint_color))
+        self.cube_pen.setWidth(2) # Matte white wireframe
+        self.cube_brush = QBrush(pre_tinted(QColor(255, 255, 255, 20), self.tint_color)) # Slight fill
+        # The fill brightens with the mic level when a LevelMeter is attached
+        self.level_brushes = [QBrush(pre_tinted(QColor(255, 255, 255, 20 + i * 10), self.tint_color))
+                              for i in range(LEVEL_STEPS)]
+        self.level_meter = None
+        self.level = 0.0  # updated by the render thread
+
+    def _on_frame_ready(self):
+        self.update(self.renderer.take_region())
+
+    def set_level_meter(self, meter):
+        """Shows `meter`'s level on the cube. Runs only while we are on screen."""
+        if self.level_meter is not None:
+            self.level_meter.stop()
+        self.level_meter = meter
+        self.level = 0.0
+        self._reschedule()
+
+    # --- Frame scheduling ---
+    def set_low_power(self, enabled):
+        self.active_fps, self.background_fps = LOW_POWER_FPS if enabled else NORMAL_FPS
+        self._reschedule()
+
+    def _target_fps(self):
+        win = self.window()
+        if not self.isVisible() or win.isMinimized():
+            return 0
+        handle = win.windowHandle()
+        if handle is not None and not handle.isExposed():
+            return 0  # fully covered, on platforms that report it
+        return self.active_fps if win.isActiveWindow() else self.background_fps
+
+    def _reschedule(self):
+        fps = self._target_fps()
+        if fps == 0:
+            self.renderer.set_fps(0)
+            if self.level_meter is not None:
+                self.level_meter.stop()
+            return
+        if self.level_meter is not None:
+            self.level_meter.start()
+        self.renderer.resize(self.width(), self.height(), self.devicePixelRatioF())
+        self.renderer.set_fps(fps)
+
+    def frames_per_minute(self):
+        cutoff = time.monotonic() - 60
+        return sum(1 for t in self._frame_times if t >= cutoff)
 
-    def update_animation(self):
-        self.grid_offset = (self.grid_offset + 1) % 100
-        self.angle_x = (self.angle_x + 2) % 360
-        self.update()
+    def showEvent(self, event):
+        # Minimize / focus changes arrive at the top-level window, watch it
+        win = self.window()
+        if win is not self._filtered_window:
+            if self._filtered_window is not None:
+                self._filtered_window.removeEventFilter(self)
+            if win is not self:
+                win.installEventFilter(self)
+            self._filtered_window = win
+        super().showEvent(event)
+        self._reschedule()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.renderer.set_fps(0)
+        if self.level_meter is not None:
+            self.level_meter.stop()
+
+    def changeEvent(self, event):
+        if event.type() in (QEvent.Type.WindowStateChange, QEvent.Type.ActivationChange):
+            self._reschedule()
+        super().changeEvent(event)
+
+    def eventFilter(self, obj, event):
+        if event.type() in (QEvent.Type.WindowStateChange, QEvent.Type.ActivationChange):
+            self._reschedule()
+        return False
+
+    def resizeEvent(self, event):
+        self.renderer.resize(self.width(), self.height(), self.devicePixelRatioF())
+        super().resizeEvent(event)
 
     def paintEvent(self, event):
+        self.frames_rendered += 1
+        self._frame_times.append(time.monotonic())
+        if not self.renderer.fps:
+            # Re-exposed after being covered: Qt repaints us, pick the renderer back up
+            self._reschedule()
+
+        # Qt clips the painter to the dirty region, so only what changed since
+        # the last frame we showed is copied
         painter = QPainter(self)
+        with self.renderer.lock:
+            front = self.renderer.front
+            if front is not None:
+                painter.drawImage(0, 0, front)
+            else:
+                painter.fillRect(self.rect(), self.bg_color)  # first frame not drawn yet
+
+    # --- Drawing, on the render thread ---
+    def draw_static(self, image, w, h):
+        """Background, fan lines, static grid and tint, drawn once per size."""
+        painter = QPainter(image)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
-        # 1. Background
-        painter.fillRect(self.rect(), self.bg_color)
-        
-        # 2. Animated Grid (Perspective)
-        self.draw_grid(painter)
-        
-        # 3. Spinning Cube
-        self.draw_cube(painter)
-        
-        # 4. Blue Tint Overlay
-        painter.fillRect(self.rect(), self.tint_color)
+        painter.fillRect(0, 0, w, h, self.bg_color)
+        self.draw_grid(painter, w, h)
+        # Tint last; everything drawn per frame uses pre-tinted colours
+        painter.fillRect(0, 0, w, h, self.tint_color)
+        painter.end()
+        return image
 
-    def draw_grid(self, painter):
-        w = self.width()
-        h = self.height()
+    def draw_grid(self, painter, w, h):
+        """Static part of the grid: perspective fan and vertical lines."""
         cx = w / 2
-        cy = h / 2
         
         pen = QPen(self.grid_color)
         pen.setWidthF(1.5)
         painter.setPen(pen)
         
-        # Simple perspective grid
-        # Horizontal lines moving down
-        # We simulate 3D mostly by spacing lines logarithmically or just linear for retro look
-        # Let's do a simple 3D projection of a floor
-        
         horizon_y = h * 0.3 # Horizon line
         
         # Draw vertical lines (fan out)
         for i in range(-10, 11):
             x_base = cx + i * 100
             painter.drawLine(int(cx), int(horizon_y), int(x_base), h)
-            
-        # Draw horizontal lines (moving)
-        # We map z-depth to screen y
-        for i in range(20):
-            # z goes from far to near
-            # offset makes it move
-            z = (i * 100 - self.grid_offset * 10) % 2000
-            if z < 10: continue
-            
-            # Project z to y
-            # Simple projection: y = cy + (H / z) ?? No, y = horizon + (scale / z)
-            # Let's just do linear interpolation for the "Retro Grid" look 
-            # where lines get further apart as they come closer? 
-            # Actually, standard retro grid is: lines are horizontal.
-            
-            # Let's simpler approach:
-            # Just parallel lines that accelerate?
-            # Let's do proper projection.
-            scale = 300
-            # z=0 is camera, z=large is far. 
-            # Let's say floor is at y=100 relative to camera
-            # projected_y = y * (focal_length / z)
-            
-            # Let's fake it:
-            relative_y = (z / 2000) * (h - horizon_y)
-            screen_y = horizon_y + relative_y
-            
-            # This doesn't look like infinite scrolling.
-            # Rework:
-            pass
         
         # RETRO GRID IMPLEMENTATION v2
-        # Vertical lines
-        painter.setPen(QPen(QColor(255, 255, 255, 50), 1))
-        for x in range(0, w, 100):
+        # Vertical lines (the horizontal ones scroll and are drawn per frame)
+        painter.setPen(QPen(self.line_color, 1))
+        for x in range(0, w, GRID_STEP):
             painter.drawLine(x, 0, x, h)
-            
-        # Horizontal lines
-        for y in range(0, h, 100):
-            y_pos = (y + self.grid_offset) % h
-            painter.drawLine(0, int(y_pos), w, int(y_pos))
 
-
-    def draw_cube(self, painter):
-        w = self.width()
-        h = self.height()
-        cx = w / 2
-        cy = h / 2
-        size = 100
-        
-        # Cube vertices
-        points = [
-            (-1, -1, -1), (1, -1, -1), (1, 1, -1), (-1, 1, -1),
-            (-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)
-        ]
-        
-        rotated_points = []
-        rad = math.radians(self.angle_x)
-        cos_a = math.cos(rad)
-        sin_a = math.sin(rad)
-        
-        for x, y, z in points:
-            # Rotate around X axis
-            # y' = y*cos - z*sin
-            # z' = y*sin + z*cos
-            ry = y * cos_a - z * sin_a
-            rz = y * sin_a + z * cos_a
-            rx = x 
-            
-            # Simple Projection (orthographic-ish or gentle perspective)
-            scale = 60
-            px = cx + rx * scale
-            py = cy + ry * scale
-            rotated_points.append((px, py))
-            
-        # Draw Edges
-        edges = [
-            (0,1), (1,2), (2,3), (3,0), # Back face
-            (4,5), (5,6), (6,7), (7,4), # Front face
-            (0,4), (1,5), (2,6), (3,7)  # Connecting
-        ]
-        
-        pen = QPen(self.cube_color)
-        pen.setWidth(2) # Matte white wireframe
-        painter.setPen(pen)
-        
-        # Fill faces to make it "Matte White Cube" not just wireframe
-        # We need a proper painter path for faces
-        faces = [
-             (0, 1, 2, 3), (4, 5, 6, 7), # Back, Front
-             (0, 1, 5, 4), (2, 3, 7, 6), # Bottom, Top?
-             (1, 2, 6, 5), (0, 3, 7, 4)  # Sides
-        ]
-        
-        # Sort faces by Depth (Painter's algorithm) would be needed for solid cube
-        # For this task, a nice wireframe with slight opacity fill looks "cool animated"
-        # The prompt says "Matte white 3d cube". Solid suggests hidden surface removal.
-        # But X-axis spin means we see all sides eventually.
-        
-        brush = QBrush(QColor(255, 255, 255, 20)) # Slight fill
-        painter.setBrush(brush)
-        
+    def draw_cube(self, painter, w, h, angle, metered):
+        painter.save()
+        painter.translate(w / 2, h / 2)
+        painter.setPen(self.cube_pen)
+        if metered:
+            painter.setBrush(self.level_brushes[min(LEVEL_STEPS - 1, int(self.level * LEVEL_STEPS))])
+        else:
+            painter.setBrush(self.cube_brush)
         # Just draw all faces (transparency allows seeing through, fits "Hacker" aesthetic)
-        for face in faces:
-            poly = QPolygonF()
-            for idx in face:
-                poly.append(QPointF(*rotated_points[idx]))
+        for poly in cube_polygons(angle):
             painter.drawPolygon(poly)
+        painter.restore()